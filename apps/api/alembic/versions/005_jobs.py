@@ -0,0 +1,44 @@
+"""Add background jobs table
+
+Revision ID: 005_jobs
+Revises: 004_dream_handicap
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '005_jobs'
+down_revision = '004_dream_handicap'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('job_type', sa.String(50), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='queued'),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('progress', sa.Float(), server_default='0'),
+        sa.Column('progress_detail', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), server_default='3'),
+        sa.Column('run_after', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    # Worker claim query and per-user status polling
+    op.create_index('ix_jobs_status_run_after', 'jobs', ['status', 'run_after'])
+    op.create_index('ix_jobs_user_id_created_at', 'jobs', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_table('jobs')
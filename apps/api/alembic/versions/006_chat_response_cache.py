@@ -0,0 +1,31 @@
+"""Add chat response cache table
+
+Revision ID: 006_chat_response_cache
+Revises: 005_jobs
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '006_chat_response_cache'
+down_revision = '005_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'chat_response_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('hits', sa.Integer(), server_default='0'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
+        sa.Column('last_used_at', sa.DateTime(), server_default=sa.text('now()')),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_chat_response_cache_last_used_at', 'chat_response_cache', ['last_used_at'])
+
+
+def downgrade():
+    op.drop_table('chat_response_cache')
@@ -0,0 +1,40 @@
+"""Add composite indexes for the hot query paths
+
+Revision ID: 007_hot_path_indexes
+Revises: 006_chat_response_cache
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+# revision identifiers
+revision = '007_hot_path_indexes'
+down_revision = '006_chat_response_cache'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns) - each matches a router filter + ordering
+INDEXES = [
+    ('ix_sessions_user_id_session_date', 'sessions', ['user_id', 'session_date']),
+    ('ix_shots_session_id_shot_number', 'shots', ['session_id', 'shot_number']),
+    ('ix_coach_reports_user_id_created_at', 'coach_reports', ['user_id', 'created_at']),
+    ('ix_coach_reports_session_id', 'coach_reports', ['session_id']),
+    ('ix_chat_messages_user_id_created_at', 'chat_messages', ['user_id', 'created_at']),
+    ('ix_session_logs_session_id', 'session_logs', ['session_id']),
+    ('ix_tee_times_user_id_tee_time', 'tee_times', ['user_id', 'tee_time']),
+    ('ix_friend_links_user_id_status', 'friend_links', ['user_id', 'status']),
+    ('ix_friend_links_friend_id', 'friend_links', ['friend_id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY so existing tables stay writable while indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""Extend list indexes with the primary key for keyset pagination
+
+Revision ID: 008_keyset_indexes
+Revises: 007_hot_path_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+# revision identifiers
+revision = '008_keyset_indexes'
+down_revision = '007_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (old index, new index, table, columns) - the id tie-breaker lets a cursor
+# seek straight to (sort value, id) instead of filtering within a sort value
+INDEXES = [
+    ('ix_sessions_user_id_session_date', 'ix_sessions_user_id_session_date_id',
+     'sessions', ['user_id', 'session_date', 'id']),
+    ('ix_shots_session_id_shot_number', 'ix_shots_session_id_shot_number_id',
+     'shots', ['session_id', 'shot_number', 'id']),
+    ('ix_coach_reports_user_id_created_at', 'ix_coach_reports_user_id_created_at_id',
+     'coach_reports', ['user_id', 'created_at', 'id']),
+    ('ix_chat_messages_user_id_created_at', 'ix_chat_messages_user_id_created_at_id',
+     'chat_messages', ['user_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for old, new, table, columns in INDEXES:
+            op.create_index(new, table, columns, postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(old, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for old, new, table, columns in reversed(INDEXES):
+            op.create_index(old, table, columns[:-1], postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(new, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,46 @@
+"""Add rollup columns and indexes to metric snapshots
+
+Revision ID: 009_metric_snapshot_rollups
+Revises: 008_keyset_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '009_metric_snapshot_rollups'
+down_revision = '008_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('metric_snapshots', sa.Column('session_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('sessions.id'), nullable=True))
+    op.add_column('metric_snapshots', sa.Column('session_count', sa.Integer(), server_default='1'))
+    op.add_column('metric_snapshots', sa.Column('shot_count', sa.Integer(), server_default='0'))
+    op.add_column('metric_snapshots', sa.Column('stats', postgresql.JSON(), nullable=True))
+    op.add_column('metric_snapshots', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')))
+
+    op.create_index(
+        'ix_metric_snapshots_user_id_snapshot_type_snapshot_date', 'metric_snapshots',
+        ['user_id', 'snapshot_type', 'snapshot_date'],
+    )
+    op.create_index('ix_metric_snapshots_session_id', 'metric_snapshots', ['session_id'], unique=True)
+    op.create_index(
+        'uq_metric_snapshots_period', 'metric_snapshots',
+        ['user_id', 'snapshot_type', 'snapshot_date'],
+        unique=True,
+        postgresql_where=sa.text("snapshot_type != 'session'"),
+    )
+
+
+def downgrade():
+    op.drop_index('uq_metric_snapshots_period', table_name='metric_snapshots')
+    op.drop_index('ix_metric_snapshots_session_id', table_name='metric_snapshots')
+    op.drop_index('ix_metric_snapshots_user_id_snapshot_type_snapshot_date', table_name='metric_snapshots')
+    op.drop_column('metric_snapshots', 'updated_at')
+    op.drop_column('metric_snapshots', 'stats')
+    op.drop_column('metric_snapshots', 'shot_count')
+    op.drop_column('metric_snapshots', 'session_count')
+    op.drop_column('metric_snapshots', 'session_id')
@@ -0,0 +1,32 @@
+"""Store mergeable moments on club stats
+
+Revision ID: 010_club_stats_moments
+Revises: 009_metric_snapshot_rollups
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '010_club_stats_moments'
+down_revision = '009_metric_snapshot_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('club_stats', sa.Column('moments', postgresql.JSON(), nullable=True))
+    # Labels come from Shot.club
+    op.alter_column('club_stats', 'club_label', type_=sa.String(50), existing_nullable=False)
+
+    # One row per user and club, which incremental updates rely on
+    op.drop_index('ix_club_stats_club_label', table_name='club_stats')
+    op.create_index('ix_club_stats_user_id_club_label', 'club_stats', ['user_id', 'club_label'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_club_stats_user_id_club_label', table_name='club_stats')
+    op.create_index('ix_club_stats_club_label', 'club_stats', ['user_id', 'club_label'])
+    op.alter_column('club_stats', 'club_label', type_=sa.String(20), existing_nullable=False)
+    op.drop_column('club_stats', 'moments')
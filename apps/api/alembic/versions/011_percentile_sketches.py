@@ -0,0 +1,36 @@
+"""Add percentile sketches table
+
+Revision ID: 011_percentile_sketches
+Revises: 010_club_stats_moments
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '011_percentile_sketches'
+down_revision = '010_club_stats_moments'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'percentile_sketches',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('handicap_band', sa.String(10), nullable=False),
+        sa.Column('club_label', sa.String(50), nullable=False),
+        sa.Column('metric', sa.String(20), nullable=False),
+        sa.Column('quantiles', postgresql.JSON(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        sa.Column('built_at', sa.DateTime(), server_default=sa.text('now()')),
+    )
+    op.create_index(
+        'ix_percentile_sketches_band_club_metric', 'percentile_sketches',
+        ['handicap_band', 'club_label', 'metric'], unique=True,
+    )
+
+
+def downgrade():
+    op.drop_table('percentile_sketches')
@@ -0,0 +1,23 @@
+"""Add updated_at to coach reports
+
+Revision ID: 012_coach_report_updated_at
+Revises: 011_percentile_sketches
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '012_coach_report_updated_at'
+down_revision = '011_percentile_sketches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('coach_reports', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE coach_reports SET updated_at = created_at")
+
+
+def downgrade():
+    op.drop_column('coach_reports', 'updated_at')
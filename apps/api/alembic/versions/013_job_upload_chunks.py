@@ -0,0 +1,30 @@
+"""Store async import uploads in the database
+
+Revision ID: 013_job_upload_chunks
+Revises: 012_coach_report_updated_at
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '013_job_upload_chunks'
+down_revision = '012_coach_report_updated_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Uploads were spooled to the API host's disk, which workers on other hosts can't read
+    op.create_table(
+        'job_upload_chunks',
+        sa.Column('upload_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('seq', sa.Integer(), primary_key=True),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
+    )
+
+
+def downgrade():
+    op.drop_table('job_upload_chunks')
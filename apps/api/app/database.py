@@ -1,25 +1,110 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import get_settings
+from app.services.metrics import metered_pool
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    echo=settings.debug,
-)
+# Async drivers for the same database, used by the read-heavy async routes
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# Session.info key: statement timeout for the session's transactions (API requests only)
+STATEMENT_TIMEOUT = "statement_timeout_ms"
+
+READ_ONLY_METHODS = ("GET", "HEAD")
+
+
+def _async_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}").render_as_string(
+        hide_password=False
+    )
+
+
+def _engine_options(url: str, pool_class: type[QueuePool], pool_name: str) -> dict:
+    options = {"pool_pre_ping": True, "echo": settings.debug}
+    # SQLite has no server connections to budget; keep its default pool
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=metered_pool(pool_class, pool_name),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    return options
+
+
+def _create_engine(url: str, pool_name: str):
+    return create_engine(url, **_engine_options(url, QueuePool, pool_name))
+
+
+def _create_async_engine(url: str, pool_name: str):
+    return create_async_engine(url, **_engine_options(url, AsyncAdaptedQueuePool, f"{pool_name}_async"))
+
+
+engine = _create_engine(settings.database_url, "primary")
+async_engine = _create_async_engine(settings.async_database_url or _async_url(settings.database_url), "primary")
+
+# GET requests read from the replica when one is configured
+if settings.replica_database_url:
+    replica_engine = _create_engine(settings.replica_database_url, "replica")
+    async_replica_engine = _create_async_engine(
+        settings.async_replica_database_url or _async_url(settings.replica_database_url), "replica"
+    )
+else:
+    replica_engine, async_replica_engine = engine, async_engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+# Rows are serialized after the request's last query, so don't expire them on commit
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, autoflush=False, expire_on_commit=False)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    db = SessionLocal()
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    # SET LOCAL ends with the transaction, so the pooled connection goes back unchanged
+    timeout_ms = session.info.get(STATEMENT_TIMEOUT)
+    if timeout_ms and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def _request_session(factory):
+    db = factory()
+    db.info[STATEMENT_TIMEOUT] = settings.db_statement_timeout_ms
+    return db
+
+
+def get_db(request: Request):
+    """Request session: the replica for GET/HEAD, the primary for everything else."""
+    factory = ReplicaSessionLocal if request.method in READ_ONLY_METHODS else SessionLocal
+    db = _request_session(factory)
     try:
         yield db
     finally:
         db.close()
+
+
+def get_primary_db():
+    """Request session on the primary, for GETs that write or must read their own writes."""
+    db = _request_session(SessionLocal)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db(request: Request):
+    factory = AsyncReplicaSessionLocal if request.method in READ_ONLY_METHODS else AsyncSessionLocal
+    async with _request_session(factory) as db:
+        yield db
@@ -1,16 +1,38 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import exc
 from app.config import get_settings
-from app.routers import auth, sessions, logs, connectors, coach, courses, friends, equipment
+from app.database import engine, async_engine
+from app.routers import auth, sessions, logs, connectors, coach, courses, friends, equipment, jobs, exports, trends
+from app.services.compression import CompressionMiddleware
+from app.services.jobs import start_worker, stop_worker
+from app.services.llm import close_http_client
+from app.services.metrics import MetricsMiddleware, instrument_engine, render_metrics, require_scrape_access
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background job worker shares the process unless run separately
+    if settings.run_job_worker:
+        await start_worker()
+    yield
+    await stop_worker()
+    await close_http_client()
+    await async_engine.dispose()
+
+
 app = FastAPI(
     title="StrikeLab API",
     description="Golf performance lab API - Get Dialed In.",
     version="0.1.0",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    lifespan=lifespan,
 )
 
 # CORS
@@ -20,8 +42,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],  # pagination metadata, cache validators
 )
 
+# Gzip / brotli for large bodies; inside the metrics middleware, so it counts bytes actually sent
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_bytes,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+# Per-route latency, query and response size metrics (outermost, so it times everything)
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Statement timeouts and exhausted connection pools are overload, not bugs
+QUERY_CANCELED = "57014"  # PostgreSQL SQLSTATE, raised by statement_timeout
+overload_log = logging.getLogger("strikelab.overload")
+
+
+@app.exception_handler(exc.DBAPIError)
+async def statement_timeout_handler(request: Request, error: exc.DBAPIError):
+    if getattr(error.orig, "pgcode", None) != QUERY_CANCELED:
+        raise error
+    overload_log.warning("Statement timeout on %s %s", request.method, request.url.path)
+    return JSONResponse(status_code=503, content={"detail": "Request took too long, please retry"})
+
+
+@app.exception_handler(exc.TimeoutError)
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError):
+    overload_log.warning("Database pool exhausted on %s %s", request.method, request.url.path)
+    return JSONResponse(
+        status_code=503, content={"detail": "Server busy, please retry"}, headers={"Retry-After": "1"},
+    )
+
+
 # Routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(sessions.router, prefix="/sessions", tags=["Sessions"])
@@ -31,6 +90,9 @@ app.include_router(coach.router, prefix="/coach", tags=["Coach"])
 app.include_router(courses.router, prefix="/courses", tags=["Courses"])
 app.include_router(friends.router, prefix="/friends", tags=["Friends"])
 app.include_router(equipment.router, prefix="/equipment", tags=["Equipment"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(exports.router, prefix="/export", tags=["Export"])
+app.include_router(trends.router, prefix="/trends", tags=["Trends"])
 
 
 @app.get("/")
@@ -46,3 +108,14 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(require_scrape_access)],
+)
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -2,10 +2,11 @@ from app.models.user import User, FriendLink, Invite
 from app.models.session import Session
 from app.models.shot import Shot
 from app.models.log import SessionLogTemplate, SessionLog
-from app.models.coach import CoachReport, ChatMessage
+from app.models.coach import CoachReport, ChatMessage, ChatResponseCache
 from app.models.course import Course, TeeTime
 from app.models.training import TrainingPlan, Drill, SwingVideo, SwingAnalysis, MetricSnapshot
-from app.models.equipment import UserBag, UserClub, ClubStats
+from app.models.equipment import UserBag, UserClub, ClubStats, PercentileSketch
+from app.models.job import Job, JobUploadChunk
 
 __all__ = [
     "User",
@@ -17,6 +18,7 @@ __all__ = [
     "SessionLog",
     "CoachReport",
     "ChatMessage",
+    "ChatResponseCache",
     "Course",
     "TeeTime",
     "TrainingPlan",
@@ -27,4 +29,7 @@ __all__ = [
     "UserBag",
     "UserClub",
     "ClubStats",
+    "PercentileSketch",
+    "Job",
+    "JobUploadChunk",
 ]
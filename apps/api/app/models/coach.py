@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Index, String, Integer, DateTime, ForeignKey, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -8,6 +8,10 @@ from app.database import Base
 
 class CoachReport(Base):
     __tablename__ = "coach_reports"
+    __table_args__ = (
+        Index("ix_coach_reports_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_coach_reports_session_id", "session_id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"), nullable=False)
@@ -48,6 +52,7 @@ class CoachReport(Base):
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # versions the report's ETag
     
     # Relationships
     session = relationship("Session", back_populates="coach_reports")
@@ -55,6 +60,9 @@ class CoachReport(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -68,3 +76,17 @@ class ChatMessage(Base):
     # {"session_id": "...", "shot_ids": [...], "report_id": "..."}
     
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ChatResponseCache(Base):
+    """Cached coach replies for repeat questions (database-backed chat cache store)"""
+    __tablename__ = "chat_response_cache"
+    
+    # sha256 of normalized message + player context + language
+    key = Column(String(64), primary_key=True)
+    response = Column(Text, nullable=False)
+    
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)  # LRU eviction order
+    expires_at = Column(DateTime, nullable=False)
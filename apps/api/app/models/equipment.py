@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Index, String, Integer, Float, DateTime, ForeignKey, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -71,13 +71,17 @@ class UserClub(Base):
 class ClubStats(Base):
     """Aggregated statistics for a specific club"""
     __tablename__ = "club_stats"
+    __table_args__ = (
+        Index("ix_club_stats_user_id", "user_id"),
+        Index("ix_club_stats_user_id_club_label", "user_id", "club_label", unique=True),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     club_id = Column(UUID(as_uuid=True), ForeignKey("user_clubs.id"), nullable=True)
     
     # Club identification (can work without linked club)
-    club_label = Column(String(20), nullable=False)
+    club_label = Column(String(50), nullable=False)  # matches Shot.club
     
     # Shot counts
     total_shots = Column(Integer, default=0)
@@ -113,8 +117,32 @@ class ClubStats(Base):
     distance_percentile = Column(Integer, nullable=True)
     accuracy_percentile = Column(Integer, nullable=True)
     
+    # Mergeable sufficient statistics behind the columns above (see services.club_stats)
+    # {"shots": 120, "good": 84, "metrics": {"carry_distance": [count, sum, sum_sq], ...}}
+    moments = Column(JSON, nullable=True)
+    
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", backref="club_stats")
     club = relationship("UserClub", backref="stats")
+
+
+class PercentileSketch(Base):
+    """Quantiles of a ClubStats metric across one handicap band, for peer percentiles"""
+    __tablename__ = "percentile_sketches"
+    __table_args__ = (
+        Index("ix_percentile_sketches_band_club_metric", "handicap_band", "club_label", "metric", unique=True),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    
+    handicap_band = Column(String(10), nullable=False)  # "0-5", "5-10", ... or "all"
+    club_label = Column(String(50), nullable=False)
+    metric = Column(String(20), nullable=False)  # distance, accuracy
+    
+    # Sorted values at the 0th, 1st, ... 100th percentile
+    quantiles = Column(JSON, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    
+    built_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, Index, String, Integer, Float, DateTime, ForeignKey, Text, JSON, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class Job(Base):
+    """Background work item (imports, report generation) processed by the job worker"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_user_id_created_at", "user_id", "created_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    
+    job_type = Column(String(50), nullable=False)  # csv_import, coach_report
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    
+    # Handler input and output
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    # Progress (0.0 - 1.0) with optional detail, e.g. {"shots_imported": 12000}
+    progress = Column(Float, default=0.0)
+    progress_detail = Column(JSON, nullable=True)
+    
+    # Retry bookkeeping
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class JobUploadChunk(Base):
+    """A piece of an upload waiting for its job; in the database so a worker on any host can read it"""
+    __tablename__ = "job_upload_chunks"
+    
+    upload_id = Column(UUID(as_uuid=True), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
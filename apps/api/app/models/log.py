@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, Text, JSON
+from sqlalchemy import Column, Index, String, Integer, DateTime, ForeignKey, Boolean, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -51,6 +51,9 @@ class SessionLogTemplate(Base):
 
 class SessionLog(Base):
     __tablename__ = "session_logs"
+    __table_args__ = (
+        Index("ix_session_logs_session_id", "session_id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"), nullable=True)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Index, String, Integer, Float, DateTime, ForeignKey, Boolean, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -8,6 +8,9 @@ from app.database import Base
 
 class Shot(Base):
     __tablename__ = "shots"
+    __table_args__ = (
+        Index("ix_shots_session_id_shot_number_id", "session_id", "shot_number", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"), nullable=False)
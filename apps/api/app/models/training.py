@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, Text, JSON
+from sqlalchemy import Column, Index, String, Integer, Float, DateTime, ForeignKey, Boolean, Text, JSON, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -162,14 +162,32 @@ class SwingAnalysis(Base):
 class MetricSnapshot(Base):
     """Track metric trends over time for dashboard and comparison"""
     __tablename__ = "metric_snapshots"
+    __table_args__ = (
+        Index("ix_metric_snapshots_user_id_snapshot_type_snapshot_date", "user_id", "snapshot_type", "snapshot_date"),
+        Index("ix_metric_snapshots_session_id", "session_id", unique=True),
+        # One rollup row per user and period
+        Index(
+            "uq_metric_snapshots_period",
+            "user_id", "snapshot_type", "snapshot_date",
+            unique=True,
+            postgresql_where=text("snapshot_type != 'session'"),
+            sqlite_where=text("snapshot_type != 'session'"),
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"), nullable=True)  # session snapshots only
     
-    # Snapshot date (usually end of session or weekly rollup)
+    # Snapshot date (session date, or start of the week/month for rollups)
     snapshot_date = Column(DateTime, nullable=False)
     snapshot_type = Column(String(20), default="session")  # session, weekly, monthly
     
+    # Rollup inputs: AnalysisAccumulator state, mergeable across sessions
+    session_count = Column(Integer, default=1)
+    shot_count = Column(Integer, default=0)
+    stats = Column(JSON, nullable=True)
+    
     # Scores
     strike_score = Column(Float, nullable=True)
     face_control_score = Column(Float, nullable=True)
@@ -188,3 +206,4 @@ class MetricSnapshot(Base):
     handicap_estimate = Column(Float, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
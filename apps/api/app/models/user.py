@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Index, String, Float, DateTime, ForeignKey, Boolean, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -50,6 +50,10 @@ class User(Base):
 
 class FriendLink(Base):
     __tablename__ = "friend_links"
+    __table_args__ = (
+        Index("ix_friend_links_user_id_status", "user_id", "status"),
+        Index("ix_friend_links_friend_id", "friend_id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import Optional
 import secrets
 
 from app.database import get_db
@@ -15,31 +17,31 @@ from app.schemas.user import (
     InviteResponse,
 )
 from app.services.auth import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     get_current_user,
+    get_current_principal,
+    cache_principal,
     decode_token,
+    Principal,
 )
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=Token)
-def register(data: UserCreate, db: Session = Depends(get_db)):
-    # Check if email exists
-    existing = db.query(User).filter(User.email == data.email).first()
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Create user
+def _find_user(db: Session, email: str) -> Optional[User]:
+    user = db.query(User).filter(User.email == email).first()
+    # Hand the connection back before waiting on bcrypt; the user stays loaded, detached
+    db.close()
+    return user
+
+
+def _create_user(db: Session, data: UserCreate, password_hash: str) -> User:
     user = User(
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=password_hash,
         display_name=data.display_name,
         language=data.language,
         units=data.units,
@@ -47,6 +49,25 @@ def register(data: UserCreate, db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
+    return user
+
+
+# register and login are async so that waiting on bcrypt holds no request
+# thread; their short queries run in the threadpool
+
+@router.post("/register", response_model=Token)
+async def register(data: UserCreate, db: Session = Depends(get_db)):
+    # Check if email exists
+    existing = await run_in_threadpool(_find_user, db, data.email)
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # Create user
+    password_hash = await hash_password_async(data.password)
+    user = await run_in_threadpool(_create_user, db, data, password_hash)
     
     # Generate tokens
     access_token = create_access_token({"sub": str(user.id)})
@@ -60,14 +81,15 @@ def register(data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def login(data: UserLogin, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, data.email)
     
-    if not user or not verify_password(data.password, user.password_hash):
+    if not user or not await verify_password_async(data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
+    cache_principal(user)  # the client's next requests skip the users lookup
     
     access_token = create_access_token({"sub": str(user.id)})
     refresh_token = create_refresh_token({"sub": str(user.id)})
@@ -111,7 +133,7 @@ def refresh_token(data: TokenRefresh, db: Session = Depends(get_db)):
 def create_invite(
     data: InviteCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     invite = Invite(
         creator_id=current_user.id,
@@ -131,7 +153,7 @@ def create_invite(
 def accept_invite(
     token: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     invite = db.query(Invite).filter(
         Invite.token == token,
@@ -173,7 +195,7 @@ def accept_invite(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: Principal = Depends(get_current_principal)):
     return UserResponse.model_validate(current_user)
 
 
@@ -195,5 +217,6 @@ def update_me(
     
     db.commit()
     db.refresh(current_user)
+    cache_principal(current_user)  # replaces the cached profile in this process
     
     return UserResponse.model_validate(current_user)
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional
+import json
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, get_async_db, SessionLocal
 from app.models.session import Session as SessionModel
 from app.models.coach import CoachReport, ChatMessage
 from app.schemas.coach import (
@@ -13,49 +17,97 @@ from app.schemas.coach import (
     ChatMessageCreate,
     ChatMessageResponse,
 )
-from app.services.auth import get_current_user
-from app.services.coach_engine import CoachEngine
+from app.schemas.job import JobEnqueuedResponse
+from app.services.auth import Principal, get_current_principal
+from app.services.coach_engine import CoachEngine, ChatPrompt
+from app.services.http_cache import (
+    PRIVATE_REVALIDATE,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_cache_headers,
+)
+from app.services.jobs import enqueue_job
+from app.services.pagination import TotalMode, keyset_rows_async, count_rows_async, set_page_headers
+from app.services.serialization import (
+    LeanJSONResponse,
+    parse_fields,
+    project_columns,
+    rows_to_dicts,
+    schema_columns,
+    shape,
+    shape_item,
+)
 
 router = APIRouter()
 
+# List endpoints select just the response columns and skip per-row validation
+REPORT_COLUMNS = schema_columns(CoachReportResponse, CoachReport)
+MESSAGE_COLUMNS = schema_columns(ChatMessageResponse, ChatMessage)
+
 
 @router.get("/reports", response_model=list[CoachReportResponse])
-def list_reports(
+async def list_reports(
     session_id: Optional[UUID] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    total: TotalMode = "none",
+    fields: Optional[str] = None,
+    exclude_none: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    query = db.query(CoachReport).filter(CoachReport.user_id == current_user.id)
+    """`fields` is a comma-separated subset of the report fields; `exclude_none` drops null values."""
+    projection = parse_fields(CoachReportResponse, fields)
+    columns = project_columns(REPORT_COLUMNS, projection, CoachReport.id, CoachReport.created_at)
+    query = select(*columns).where(CoachReport.user_id == current_user.id)
     
     if session_id:
-        query = query.filter(CoachReport.session_id == session_id)
+        query = query.where(CoachReport.session_id == session_id)
     
-    reports = query.order_by(CoachReport.created_at.desc()).all()
-    return [CoachReportResponse.model_validate(r) for r in reports]
+    reports, next_cursor = await keyset_rows_async(db, query, CoachReport.created_at, CoachReport.id, cursor, limit)
+    response = LeanJSONResponse(shape(rows_to_dicts(reports), projection, exclude_none))
+    set_page_headers(response, next_cursor, await count_rows_async(db, query, total))
+    return response
 
 
 @router.get("/reports/{report_id}", response_model=CoachReportResponse)
-def get_report(
+async def get_report(
     report_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    fields: Optional[str] = None,
+    exclude_none: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    report = db.query(CoachReport).filter(
+    projection = parse_fields(CoachReportResponse, fields)
+    version = (await db.execute(select(CoachReport.updated_at).where(
         CoachReport.id == report_id,
         CoachReport.user_id == current_user.id
-    ).first()
+    ))).first()
     
+    if version is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    etag = make_etag("report", report_id, version.updated_at, projection and sorted(projection), exclude_none)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_REVALIDATE)
+    
+    report = await db.scalar(select(CoachReport).where(CoachReport.id == report_id))
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return CoachReportResponse.model_validate(report)
+    payload = CoachReportResponse.model_validate(report).model_dump()
+    response = LeanJSONResponse(shape_item(payload, projection, exclude_none))
+    set_cache_headers(response, etag, PRIVATE_REVALIDATE)
+    return response
 
 
 @router.post("/report", response_model=CoachReportResponse)
 def generate_report(
     data: CoachReportCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # Verify session ownership
     session = db.query(SessionModel).filter(
@@ -78,57 +130,139 @@ def generate_report(
     return CoachReportResponse.model_validate(report)
 
 
+@router.post("/report/async", response_model=JobEnqueuedResponse, status_code=202)
+def generate_report_async(
+    data: CoachReportCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    # Verify session ownership before queueing
+    session = db.query(SessionModel).filter(
+        SessionModel.id == data.session_id,
+        SessionModel.user_id == current_user.id
+    ).first()
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    job = enqueue_job(
+        db,
+        user_id=current_user.id,
+        job_type="coach_report",
+        payload={"session_id": str(session.id), "language": data.language},
+    )
+    return JobEnqueuedResponse(job_id=job.id, status=job.status)
+
+
 @router.get("/chat", response_model=list[ChatMessageResponse])
-def get_chat_history(
+async def get_chat_history(
     session_id: Optional[UUID] = None,
-    limit: int = 50,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    total: TotalMode = "none",
+    fields: Optional[str] = None,
+    exclude_none: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    query = db.query(ChatMessage).filter(ChatMessage.user_id == current_user.id)
+    """`fields` is a comma-separated subset of the message fields; `exclude_none` drops null values."""
+    projection = parse_fields(ChatMessageResponse, fields)
+    columns = project_columns(MESSAGE_COLUMNS, projection, ChatMessage.id, ChatMessage.created_at)
+    query = select(*columns).where(ChatMessage.user_id == current_user.id)
     
     if session_id:
-        query = query.filter(ChatMessage.session_id == session_id)
+        query = query.where(ChatMessage.session_id == session_id)
     
-    messages = query.order_by(ChatMessage.created_at.desc()).limit(limit).all()
-    return [ChatMessageResponse.model_validate(m) for m in reversed(messages)]
+    # Newest page first; the cursor walks back to older messages
+    messages, next_cursor = await keyset_rows_async(db, query, ChatMessage.created_at, ChatMessage.id, cursor, limit)
+    response = LeanJSONResponse(shape(rows_to_dicts(reversed(messages)), projection, exclude_none))
+    set_page_headers(response, next_cursor, await count_rows_async(db, query, total))
+    return response
+
+
+def _start_chat(data: ChatMessageCreate, user: Principal) -> ChatPrompt:
+    # Own short-lived session: a request session would hold its pooled
+    # connection through the LLM call, which can take the whole timeout budget
+    db = SessionLocal()
+    try:
+        # Save user message
+        user_message = ChatMessage(
+            user_id=user.id,
+            session_id=data.session_id,
+            role="user",
+            content=data.content,
+            context=data.context,
+        )
+        db.add(user_message)
+        db.commit()
+        
+        return CoachEngine().build_chat_prompt(
+            message=data.content,
+            context=data.context,
+            user_id=user.id,
+            db=db,
+            language=user.language or "en",
+        )
+    finally:
+        db.close()
+
+
+def _save_reply(data: ChatMessageCreate, user_id: UUID, content: str) -> ChatMessageResponse:
+    db = SessionLocal()
+    try:
+        assistant_message = ChatMessage(
+            user_id=user_id,
+            session_id=data.session_id,
+            role="assistant",
+            content=content,
+        )
+        db.add(assistant_message)
+        db.commit()
+        db.refresh(assistant_message)
+        return ChatMessageResponse.model_validate(assistant_message)
+    finally:
+        db.close()
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
 
 
 @router.post("/chat", response_model=ChatMessageResponse)
-def send_chat(
+async def send_chat(
     data: ChatMessageCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    # Save user message
-    user_message = ChatMessage(
-        user_id=current_user.id,
-        session_id=data.session_id,
-        role="user",
-        content=data.content,
-        context=data.context,
-    )
-    db.add(user_message)
-    db.commit()
+    # Database work stays off the event loop, and no connection is held while the LLM call is awaited
+    prompt = await run_in_threadpool(_start_chat, data, current_user)
+    response_content = await CoachEngine().generate_chat_response(prompt)
     
-    # Generate AI response (stub)
-    engine = CoachEngine()
-    response_content = engine.generate_chat_response(
-        message=data.content,
-        context=data.context,
-        user_id=current_user.id,
-        db=db,
-    )
+    return await run_in_threadpool(_save_reply, data, current_user.id, response_content)
+
+
+@router.post("/chat/stream")
+async def stream_chat(
+    data: ChatMessageCreate,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Server-sent events: a `token` event per chunk as the coach replies, then a
+    `done` event carrying the saved assistant message.
+    """
+    prompt = await run_in_threadpool(_start_chat, data, current_user)
+    user_id = current_user.id
     
-    # Save assistant response
-    assistant_message = ChatMessage(
-        user_id=current_user.id,
-        session_id=data.session_id,
-        role="assistant",
-        content=response_content,
-    )
-    db.add(assistant_message)
-    db.commit()
-    db.refresh(assistant_message)
+    async def events():
+        chunks = []
+        async for token in CoachEngine().stream_chat_response(prompt):
+            chunks.append(token)
+            yield _sse("token", json.dumps({"content": token}))
+        
+        assistant_message = await run_in_threadpool(_save_reply, data, user_id, "".join(chunks))
+        yield _sse("done", assistant_message.model_dump_json())
     
-    return ChatMessageResponse.model_validate(assistant_message)
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
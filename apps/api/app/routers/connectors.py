@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlalchemy.orm import Session
 from uuid import UUID
+from typing import Optional, Any
 
 from app.database import get_db
-from app.models.user import User
 from app.schemas.connector import ConnectorResponse, ImportResponse
-from app.services.auth import get_current_user
+from app.services.auth import Principal, get_current_principal
+from app.services.connectors import (
+    TrackManConnector,
+    TopgolfConnector,
+    ForesightConnector,
+    save_normalized_session,
+)
 
 router = APIRouter()
 
@@ -48,10 +54,17 @@ CONNECTORS = [
     },
 ]
 
+# Parsers for connectors that can import a raw session export
+CONNECTOR_PARSERS = {
+    "trackman": TrackManConnector,
+    "topgolf": TopgolfConnector,
+    "foresight": ForesightConnector,
+}
+
 
 @router.get("", response_model=list[ConnectorResponse])
 def list_connectors(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # In a real implementation, we'd check connection status from DB
     return [
@@ -71,7 +84,7 @@ def list_connectors(
 def connect_connector(
     connector_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     connector = next((c for c in CONNECTORS if c["id"] == connector_id), None)
     
@@ -93,7 +106,7 @@ def connect_connector(
 def disconnect_connector(
     connector_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # Stub: Would remove connection from DB
     return {"message": f"Disconnected from connector {connector_id}"}
@@ -102,8 +115,9 @@ def disconnect_connector(
 @router.post("/import/connector/{connector_id}", response_model=ImportResponse)
 def import_from_connector(
     connector_id: str,
+    payload: Optional[dict[str, Any]] = Body(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     connector = next((c for c in CONNECTORS if c["id"] == connector_id), None)
     
@@ -116,6 +130,26 @@ def import_from_connector(
             detail="Use /sessions/import/csv endpoint for CSV imports"
         )
     
+    # Import a raw session export pushed by the client
+    if payload and connector_id in CONNECTOR_PARSERS:
+        try:
+            normalized = CONNECTOR_PARSERS[connector_id]().parse_raw(payload)
+        except (ValueError, TypeError, AttributeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid {connector['name']} data: {e}")
+        
+        if not normalized.shots:
+            return ImportResponse(
+                success=False,
+                errors=[f"No shots found in {connector['name']} data"],
+            )
+        
+        session = save_normalized_session(normalized, user_id=current_user.id, db=db)
+        return ImportResponse(
+            success=True,
+            session_id=str(session.id),
+            shots_imported=len(normalized.shots),
+        )
+    
     # Stub: Would fetch data from connector API
     return ImportResponse(
         success=True,
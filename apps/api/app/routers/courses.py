@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from uuid import UUID
 from typing import Optional
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, get_async_db
 from app.models.course import Course, TeeTime
 from app.schemas.course import (
     CourseCreate,
@@ -12,7 +13,7 @@ from app.schemas.course import (
     TeeTimeCreate,
     TeeTimeResponse,
 )
-from app.services.auth import get_current_user
+from app.services.auth import Principal, get_current_principal
 
 router = APIRouter()
 
@@ -20,19 +21,20 @@ router = APIRouter()
 # === TEE TIMES (must come before /{course_id} to avoid route conflicts) ===
 
 @router.get("/tee-times", response_model=list[TeeTimeResponse])
-def list_tee_times(
+async def list_tee_times(
     upcoming_only: bool = True,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     from datetime import datetime
     
-    query = db.query(TeeTime).filter(TeeTime.user_id == current_user.id)
+    # Courses are loaded up front; async sessions can't lazy-load tt.course
+    query = select(TeeTime).where(TeeTime.user_id == current_user.id).options(selectinload(TeeTime.course))
     
     if upcoming_only:
-        query = query.filter(TeeTime.tee_time >= datetime.utcnow())
+        query = query.where(TeeTime.tee_time >= datetime.utcnow())
     
-    tee_times = query.order_by(TeeTime.tee_time).all()
+    tee_times = (await db.scalars(query.order_by(TeeTime.tee_time))).all()
     
     responses = []
     for tt in tee_times:
@@ -48,7 +50,7 @@ def list_tee_times(
 def create_tee_time(
     data: TeeTimeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     tee_time = TeeTime(
         user_id=current_user.id,
@@ -69,7 +71,7 @@ def create_tee_time(
 def delete_tee_time(
     tee_time_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     tee_time = db.query(TeeTime).filter(
         TeeTime.id == tee_time_id,
@@ -123,7 +125,7 @@ def get_course(
 def create_course(
     data: CourseCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     course = Course(**data.model_dump())
     db.add(course)
@@ -3,15 +3,14 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List, Optional
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, get_primary_db
 from app.models.equipment import UserBag, UserClub, ClubStats
 from app.schemas.equipment import (
     BagCreate, BagUpdate, BagResponse, BagListResponse,
     ClubCreate, ClubUpdate, ClubResponse,
     ClubStatsResponse, QuickAddClub
 )
-from app.services.auth import get_current_user
+from app.services.auth import Principal, get_current_principal
 
 router = APIRouter()
 
@@ -21,7 +20,7 @@ router = APIRouter()
 @router.get("/bags", response_model=List[BagListResponse])
 def list_bags(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """List all bags for the current user"""
     bags = db.query(UserBag).filter(UserBag.user_id == current_user.id).all()
@@ -43,7 +42,7 @@ def list_bags(
 def get_bag(
     bag_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get a specific bag with all clubs"""
     bag = db.query(UserBag).filter(
@@ -61,7 +60,7 @@ def get_bag(
 def create_bag(
     data: BagCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Create a new bag"""
     # Check if this should be the primary bag
@@ -99,7 +98,7 @@ def update_bag(
     bag_id: UUID,
     data: BagUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update a bag"""
     bag = db.query(UserBag).filter(
@@ -124,7 +123,7 @@ def update_bag(
 def delete_bag(
     bag_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete a bag and all its clubs"""
     bag = db.query(UserBag).filter(
@@ -147,7 +146,7 @@ def delete_bag(
 def list_clubs(
     bag_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """List all clubs in a bag"""
     # Verify bag ownership
@@ -171,7 +170,7 @@ def add_club(
     bag_id: UUID,
     data: ClubCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Add a club to a bag"""
     # Verify bag ownership
@@ -205,7 +204,7 @@ def update_club(
     club_id: UUID,
     data: ClubUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Update a club"""
     club = db.query(UserClub).join(UserBag).filter(
@@ -230,7 +229,7 @@ def update_club(
 def delete_club(
     club_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete a club from a bag"""
     club = db.query(UserClub).join(UserBag).filter(
@@ -254,7 +253,7 @@ def quick_add_clubs(
     bag_id: UUID,
     clubs: List[QuickAddClub],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Quickly add multiple clubs to a bag"""
     # Verify bag ownership
@@ -302,7 +301,7 @@ def quick_add_clubs(
 @router.get("/stats", response_model=List[ClubStatsResponse])
 def get_club_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get aggregated stats for all clubs"""
     stats = db.query(ClubStats).filter(
@@ -316,7 +315,7 @@ def get_club_stats(
 def get_club_stats_by_label(
     club_label: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get stats for a specific club type"""
     stats = db.query(ClubStats).filter(
@@ -334,8 +333,8 @@ def get_club_stats_by_label(
 
 @router.get("/my-bag", response_model=BagResponse)
 def get_primary_bag(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_primary_db),  # creates the bag on first use
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Get the user's primary bag"""
     bag = db.query(UserBag).filter(
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from uuid import UUID
+from typing import Optional
+
+from app.database import ReplicaSessionLocal
+from app.services.auth import Principal, get_current_principal
+from app.services.shot_export import (
+    EXPORT_FORMATS,
+    ExportError,
+    ShotExportFilter,
+    check_format,
+    resolve_columns,
+    stream_shots,
+)
+
+router = APIRouter()
+
+
+@router.get("/shots")
+def export_shots(
+    format: str = "ndjson",
+    columns: Optional[str] = None,
+    club: Optional[list[str]] = Query(None),
+    session_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Stream the user's shots across sessions as NDJSON, CSV, Arrow IPC or Parquet.
+    
+    `columns` is a comma-separated projection; `club` may be repeated.
+    """
+    try:
+        check_format(format)
+        projection = resolve_columns(columns)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    filters = ShotExportFilter(
+        user_id=current_user.id,
+        clubs=club,
+        session_id=session_id,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    
+    def body():
+        # Own session: the request's is closed before the body finishes streaming.
+        # It is also exempt from the request statement timeout, as the export is one long query
+        db = ReplicaSessionLocal()
+        try:
+            yield from stream_shots(db, format, projection, filters)
+        finally:
+            db.close()
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="strikelab-shots.{extension}"'},
+    )
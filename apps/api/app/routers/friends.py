@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import literal, select, union_all
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.database import get_db
 from app.models.user import User, FriendLink
-from app.schemas.user import FriendResponse
-from app.services.auth import get_current_user
+from app.schemas.user import FriendResponse, FriendCompareResponse, LeaderboardEntry
+from app.services.auth import Principal, get_current_principal
+from app.services.player_summary import LeaderboardMetric, get_summaries, rank_summaries, summary_query
 
 router = APIRouter()
 
@@ -13,33 +15,54 @@ router = APIRouter()
 @router.get("", response_model=list[FriendResponse])
 def list_friends(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    # Get all friend links where user is involved
-    friend_links = db.query(FriendLink).filter(
+    # Accepted friend links joined to the friend's user row in one query
+    rows = db.query(User, FriendLink.status).join(
+        FriendLink, FriendLink.friend_id == User.id
+    ).filter(
         FriendLink.user_id == current_user.id,
         FriendLink.status == "accepted"
     ).all()
     
-    friends = []
-    for link in friend_links:
-        friend_user = db.query(User).filter(User.id == link.friend_id).first()
-        if friend_user:
-            friends.append(FriendResponse(
-                id=friend_user.id,
-                display_name=friend_user.display_name,
-                handicap_index=friend_user.handicap_index,
-                status=link.status,
-            ))
+    return [
+        FriendResponse(
+            id=friend_user.id,
+            display_name=friend_user.display_name,
+            handicap_index=friend_user.handicap_index,
+            status=status,
+        )
+        for friend_user, status in rows
+    ]
+
+
+@router.get("/leaderboard", response_model=list[LeaderboardEntry])
+def friends_leaderboard(
+    metric: LeaderboardMetric = "strike_score",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Rank the user and all accepted friends by a summary metric."""
+    members = union_all(
+        select(FriendLink.friend_id).where(
+            FriendLink.user_id == current_user.id,
+            FriendLink.status == "accepted",
+        ),
+        select(literal(current_user.id, User.id.type)),
+    )
+    summaries = [row._asdict() for row in summary_query(db, members)]
     
-    return friends
+    return [
+        LeaderboardEntry(**entry, is_you=entry["id"] == current_user.id)
+        for entry in rank_summaries(summaries, metric)
+    ]
 
 
 @router.delete("/{friend_id}")
 def remove_friend(
     friend_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # Remove both directions of friend link
     db.query(FriendLink).filter(
@@ -57,11 +80,11 @@ def remove_friend(
     return {"message": "Friend removed"}
 
 
-@router.get("/compare/{friend_id}")
+@router.get("/compare/{friend_id}", response_model=FriendCompareResponse)
 def compare_with_friend(
     friend_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # Verify friendship
     friend_link = db.query(FriendLink).filter(
@@ -73,23 +96,11 @@ def compare_with_friend(
     if not friend_link:
         raise HTTPException(status_code=404, detail="Friend not found")
     
-    friend = db.query(User).filter(User.id == friend_id).first()
+    summaries = get_summaries(db, [current_user.id, friend_id])
+    if friend_id not in summaries:
+        raise HTTPException(status_code=404, detail="Friend not found")
     
-    # Get comparison metrics (stub)
-    # In real implementation, would aggregate from MetricSnapshots
-    return {
-        "user": {
-            "display_name": current_user.display_name,
-            "handicap": current_user.handicap_index,
-            "strike_score": 78,  # Stub data
-            "driver_carry": 245,
-            "seven_iron_carry": 165,
-        },
-        "friend": {
-            "display_name": friend.display_name,
-            "handicap": friend.handicap_index,
-            "strike_score": 82,  # Stub data
-            "driver_carry": 252,
-            "seven_iron_carry": 172,
-        },
-    }
+    return FriendCompareResponse(
+        user=summaries[current_user.id],
+        friend=summaries[friend_id],
+    )
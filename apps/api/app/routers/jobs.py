@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from uuid import UUID
+from typing import Optional
+
+from app.database import get_primary_db  # jobs are polled right after they're enqueued; skip replica lag
+from app.models.job import Job
+from app.schemas.job import JobResponse
+from app.services.auth import Principal, get_current_principal
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[JobResponse])
+def list_jobs(
+    status: Optional[str] = None,
+    limit: int = 20,
+    db: Session = Depends(get_primary_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    query = db.query(Job).filter(Job.user_id == current_user.id)
+    
+    if status:
+        query = query.filter(Job.status == status)
+    
+    jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+    return [JobResponse.model_validate(j) for j in jobs]
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: UUID,
+    db: Session = Depends(get_primary_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    job = db.query(Job).filter(
+        Job.id == job_id,
+        Job.user_id == current_user.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobResponse.model_validate(job)
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional
 
 from app.database import get_db
-from app.models.user import User
 from app.models.log import SessionLogTemplate, SessionLog
 from app.schemas.log import (
     SessionLogTemplateCreate,
@@ -12,13 +12,16 @@ from app.schemas.log import (
     SessionLogCreate,
     SessionLogResponse,
 )
-from app.services.auth import get_current_user
+from app.services.auth import Principal, get_current_principal
+from app.services.http_cache import PUBLIC_SHORT, etag_matches, make_etag, not_modified, set_cache_headers
 
 router = APIRouter()
 
 
 @router.get("/templates", response_model=list[SessionLogTemplateResponse])
 def list_templates(
+    request: Request,
+    response: Response,
     language: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
@@ -27,7 +30,16 @@ def list_templates(
     if language:
         query = query.filter(SessionLogTemplate.language == language)
     
+    # Templates are added and edited, never deleted, so count + latest edit versions the list
+    count, last_updated = query.with_entities(
+        func.count(SessionLogTemplate.id), func.max(SessionLogTemplate.updated_at)
+    ).one()
+    etag = make_etag("templates", language, count, last_updated)
+    if etag_matches(request, etag):
+        return not_modified(etag, PUBLIC_SHORT)
+    
     templates = query.order_by(SessionLogTemplate.is_default.desc()).all()
+    set_cache_headers(response, etag, PUBLIC_SHORT)
     return [SessionLogTemplateResponse.model_validate(t) for t in templates]
 
 
@@ -35,7 +47,7 @@ def list_templates(
 def create_template(
     data: SessionLogTemplateCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     template = SessionLogTemplate(
         name=data.name,
@@ -57,7 +69,7 @@ def create_template(
 def get_session_log(
     session_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     log = db.query(SessionLog).filter(
         SessionLog.session_id == session_id,
@@ -74,7 +86,7 @@ def get_session_log(
 def submit_log(
     data: SessionLogCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # Check if log already exists for this session
     if data.session_id:
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from datetime import datetime
 from uuid import UUID
 from typing import Optional
 import csv
 import io
 
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, get_async_db
 from app.models.session import Session as SessionModel
 from app.models.shot import Shot
 from app.schemas.session import (
@@ -16,73 +19,164 @@ from app.schemas.session import (
     ShotResponse,
     ShotUpdate,
 )
-from app.services.auth import get_current_user
-from app.services.connectors.csv_importer import CSVImporter
+from app.schemas.job import JobEnqueuedResponse
+from app.services.auth import Principal, get_current_principal
+from app.services.connectors.csv_importer import CSVImporter, DecodedLineReader
+from app.services.http_cache import (
+    PRIVATE_REVALIDATE,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_cache_headers,
+)
+from app.services.pagination import TotalMode, keyset_rows_async, count_rows_async, set_page_headers
+from app.services.serialization import (
+    LeanJSONResponse,
+    parse_fields,
+    project_columns,
+    rows_to_dicts,
+    schema_columns,
+    shape,
+    shape_item,
+)
+from app.services.club_stats import remove_session_club_stats, update_shot_club_stats
+from app.services.session_stats import refresh_session_stats
+from app.services.trends import remove_session_snapshot
+from app.services.jobs import enqueue_job, store_upload
 
 router = APIRouter()
 
+# List endpoints select just the response columns and skip per-row validation
+SESSION_COLUMNS = schema_columns(SessionResponse, SessionModel)
+SHOT_COLUMNS = schema_columns(ShotResponse, Shot)
+
+
+async def _shot_counts(db: AsyncSession, session_ids: list[UUID]) -> dict[UUID, int]:
+    """Count shots per session without loading the shot rows."""
+    if not session_ids:
+        return {}
+    rows = await db.execute(
+        select(Shot.session_id, func.count(Shot.id)).where(
+            Shot.session_id.in_(session_ids)
+        ).group_by(Shot.session_id)
+    )
+    return dict(rows.all())
+
+
+async def _session_version(db: AsyncSession, session_id: UUID, user_id: UUID) -> datetime:
+    """The session's updated_at (bumped by every change to it or its shots); 404 if not the user's."""
+    version = await db.execute(select(SessionModel.updated_at).where(
+        SessionModel.id == session_id,
+        SessionModel.user_id == user_id
+    ))
+    row = version.first()
+    
+    if row is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return row.updated_at
+
 
 @router.get("", response_model=SessionListResponse)
-def list_sessions(
+async def list_sessions(
     session_type: Optional[str] = None,
-    limit: int = 50,
-    offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    offset: int = 0,  # legacy paging, ignored when a cursor is given
+    total: TotalMode = "exact",
+    fields: Optional[str] = None,
+    exclude_none: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    query = db.query(SessionModel).filter(SessionModel.user_id == current_user.id)
+    """`fields` is a comma-separated subset of the session fields; `exclude_none` drops null values."""
+    projection = parse_fields(SessionResponse, fields)
+    columns = project_columns(SESSION_COLUMNS, projection, SessionModel.id, SessionModel.session_date)
+    query = select(*columns).where(SessionModel.user_id == current_user.id)
     
     if session_type:
-        query = query.filter(SessionModel.session_type == session_type)
+        query = query.where(SessionModel.session_type == session_type)
     
-    total = query.count()
-    sessions = query.order_by(SessionModel.session_date.desc()).offset(offset).limit(limit).all()
+    total_count = await count_rows_async(db, query, total)
+    if offset and not cursor:
+        sessions = (await db.execute(query.order_by(
+            SessionModel.session_date.desc(), SessionModel.id.desc()
+        ).offset(offset).limit(limit))).all()
+        next_cursor = None
+    else:
+        sessions, next_cursor = await keyset_rows_async(
+            db, query, SessionModel.session_date, SessionModel.id, cursor, limit
+        )
     
-    # Add shot counts
-    session_responses = []
-    for session in sessions:
-        response = SessionResponse.model_validate(session)
-        response.shot_count = len(session.shots)
-        session_responses.append(response)
+    session_responses = rows_to_dicts(sessions)
+    if projection is None or "shot_count" in projection:
+        # Add shot counts with one aggregated query for the whole page
+        shot_counts = await _shot_counts(db, [session.id for session in sessions])
+        for response in session_responses:
+            response["shot_count"] = shot_counts.get(response["id"], 0)
     
-    return SessionListResponse(sessions=session_responses, total=total)
+    return LeanJSONResponse({
+        "sessions": shape(session_responses, projection, exclude_none),
+        "total": total_count,
+        "next_cursor": next_cursor,
+    })
 
 
 @router.get("/{session_id}", response_model=SessionResponse)
-def get_session(
+async def get_session(
     session_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    fields: Optional[str] = None,
+    exclude_none: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    session = db.query(SessionModel).filter(
-        SessionModel.id == session_id,
-        SessionModel.user_id == current_user.id
-    ).first()
+    projection = parse_fields(SessionResponse, fields)
+    version = await _session_version(db, session_id, current_user.id)
+    etag = make_etag("session", session_id, version, projection and sorted(projection), exclude_none)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_REVALIDATE)
     
+    session = await db.scalar(select(SessionModel).where(SessionModel.id == session_id))
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    response = SessionResponse.model_validate(session)
-    response.shot_count = len(session.shots)
+    session_response = SessionResponse.model_validate(session)
+    session_response.shot_count = (await _shot_counts(db, [session.id])).get(session.id, 0)
+    response = LeanJSONResponse(shape_item(session_response.model_dump(), projection, exclude_none))
+    set_cache_headers(response, etag, PRIVATE_REVALIDATE)
     return response
 
 
 @router.get("/{session_id}/shots", response_model=list[ShotResponse])
-def get_session_shots(
+async def get_session_shots(
     session_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    total: TotalMode = "none",
+    fields: Optional[str] = None,
+    exclude_none: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    session = db.query(SessionModel).filter(
-        SessionModel.id == session_id,
-        SessionModel.user_id == current_user.id
-    ).first()
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    """`fields` is a comma-separated subset of the shot fields; `exclude_none` drops null values."""
+    projection = parse_fields(ShotResponse, fields)
+    version = await _session_version(db, session_id, current_user.id)
+    etag = make_etag(
+        "shots", session_id, version, limit, cursor, total, projection and sorted(projection), exclude_none
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, PRIVATE_REVALIDATE)
     
-    shots = db.query(Shot).filter(Shot.session_id == session_id).order_by(Shot.shot_number).all()
-    return [ShotResponse.model_validate(shot) for shot in shots]
+    columns = project_columns(SHOT_COLUMNS, projection, Shot.id, Shot.shot_number)
+    query = select(*columns).where(Shot.session_id == session_id)
+    shots, next_cursor = await keyset_rows_async(
+        db, query, Shot.shot_number, Shot.id, cursor, limit, descending=False
+    )
+    response = LeanJSONResponse(shape(rows_to_dicts(shots), projection, exclude_none))
+    set_page_headers(response, next_cursor, await count_rows_async(db, query, total))
+    set_cache_headers(response, etag, PRIVATE_REVALIDATE)
+    return response
 
 
 @router.patch("/{session_id}/shots/{shot_id}", response_model=ShotResponse)
@@ -91,7 +185,7 @@ def update_shot(
     shot_id: UUID,
     data: ShotUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     # Verify session ownership
     session = db.query(SessionModel).filter(
@@ -112,9 +206,20 @@ def update_shot(
     
     # Update fields
     update_data = data.model_dump(exclude_unset=True)
+    was_mishit = shot.is_mishit
+    stats_changed = "is_mishit" in update_data and update_data["is_mishit"] != was_mishit
     for key, value in update_data.items():
         setattr(shot, key, value)
     
+    # The session's updated_at versions its shots too (ETags of the GET routes)
+    session.updated_at = datetime.utcnow()
+    
+    # Mishit flags feed the session analysis and club stats, so keep them current
+    if stats_changed:
+        db.flush()
+        refresh_session_stats(session, db)
+        update_shot_club_stats(shot, session.user_id, was_mishit, db)
+    
     db.commit()
     db.refresh(shot)
     
@@ -125,7 +230,7 @@ def update_shot(
 def delete_session(
     session_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     session = db.query(SessionModel).filter(
         SessionModel.id == session_id,
@@ -135,6 +240,8 @@ def delete_session(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    remove_session_snapshot(session, db)
+    remove_session_club_stats(session, db)
     db.delete(session)
     db.commit()
     
@@ -147,17 +254,17 @@ async def import_csv(
     session_name: str = Form(""),
     session_type: str = Form("range"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
     
-    content = await file.read()
-    
+    # Stream the upload in chunks off the event loop instead of buffering it
     try:
         importer = CSVImporter()
-        result = importer.import_csv(
-            content.decode('utf-8'),
+        result = await run_in_threadpool(
+            importer.import_stream,
+            DecodedLineReader(file.file),
             user_id=current_user.id,
             session_name=session_name or file.filename,
             session_type=session_type,
@@ -166,3 +273,33 @@ async def import_csv(
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/import/csv/async", response_model=JobEnqueuedResponse, status_code=202)
+async def import_csv_async(
+    file: UploadFile = File(...),
+    session_name: str = Form(""),
+    session_type: str = Form("range"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    
+    # The request ends before the import runs, possibly on another host, so keep the upload in the database
+    upload_id, total_bytes = await run_in_threadpool(store_upload, db, file.file)
+    
+    job = await run_in_threadpool(
+        enqueue_job,
+        db,
+        current_user.id,
+        "csv_import",
+        {
+            "upload_id": str(upload_id),
+            "filename": file.filename,
+            "total_bytes": total_bytes,
+            "session_name": session_name or file.filename,
+            "session_type": session_type,
+        },
+    )
+    return JobEnqueuedResponse(job_id=job.id, status=job.status)
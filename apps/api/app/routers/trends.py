@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Literal
+
+from app.database import get_db
+from app.schemas.training import MetricSnapshotResponse, TrendResponse
+from app.services.auth import Principal, get_current_principal
+from app.services.trends import get_trend
+
+router = APIRouter()
+
+
+@router.get("", response_model=TrendResponse)
+def get_trends(
+    period: Literal["session", "weekly", "monthly"] = "monthly",
+    periods: int = Query(12, ge=1, le=260),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Scores per week, month or session over the last `periods`, read from the rollups."""
+    snapshots = get_trend(db, current_user.id, period, periods)
+    return TrendResponse(
+        period=period,
+        points=[MetricSnapshotResponse.model_validate(s) for s in snapshots],
+    )
@@ -8,6 +8,9 @@ from app.schemas.user import (
     InviteCreate,
     InviteResponse,
     FriendResponse,
+    PlayerSummary,
+    FriendCompareResponse,
+    LeaderboardEntry,
 )
 from app.schemas.session import (
     SessionCreate,
@@ -39,6 +42,8 @@ from app.schemas.training import (
     TrainingPlanCreate,
     TrainingPlanResponse,
     DrillResponse,
+    MetricSnapshotResponse,
+    TrendResponse,
 )
 from app.schemas.connector import (
     ConnectorResponse,
@@ -56,6 +61,10 @@ from app.schemas.equipment import (
     ClubStatsResponse,
     QuickAddClub,
 )
+from app.schemas.job import (
+    JobResponse,
+    JobEnqueuedResponse,
+)
 
 __all__ = [
     "UserCreate",
@@ -67,6 +76,9 @@ __all__ = [
     "InviteCreate",
     "InviteResponse",
     "FriendResponse",
+    "PlayerSummary",
+    "FriendCompareResponse",
+    "LeaderboardEntry",
     "SessionCreate",
     "SessionResponse",
     "SessionListResponse",
@@ -88,6 +100,8 @@ __all__ = [
     "TrainingPlanCreate",
     "TrainingPlanResponse",
     "DrillResponse",
+    "MetricSnapshotResponse",
+    "TrendResponse",
     "ConnectorResponse",
     "CSVImportRequest",
     "ImportResponse",
@@ -100,4 +114,6 @@ __all__ = [
     "ClubResponse",
     "ClubStatsResponse",
     "QuickAddClub",
+    "JobResponse",
+    "JobEnqueuedResponse",
 ]
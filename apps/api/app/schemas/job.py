@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Optional, Any
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    job_type: str
+    status: str
+    progress: Optional[float]
+    progress_detail: Optional[dict[str, Any]]
+    result: Optional[dict[str, Any]]
+    error: Optional[str]
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class JobEnqueuedResponse(BaseModel):
+    job_id: UUID
+    status: str
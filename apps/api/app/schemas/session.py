@@ -101,4 +101,5 @@ class SessionResponse(BaseModel):
 
 class SessionListResponse(BaseModel):
     sessions: list[SessionResponse]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page
@@ -54,3 +54,25 @@ class TrainingPlanResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class MetricSnapshotResponse(BaseModel):
+    snapshot_date: datetime
+    snapshot_type: str
+    session_id: Optional[UUID]
+    session_count: Optional[int]
+    shot_count: Optional[int]
+    strike_score: Optional[float]
+    face_control_score: Optional[float]
+    distance_control_score: Optional[float]
+    dispersion_score: Optional[float]
+    overall_score: Optional[float]
+    metrics_by_club: Optional[dict[str, Any]]
+
+    class Config:
+        from_attributes = True
+
+
+class TrendResponse(BaseModel):
+    period: str
+    points: list[MetricSnapshotResponse]
@@ -78,3 +78,24 @@ class FriendResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PlayerSummary(BaseModel):
+    id: UUID
+    display_name: str
+    handicap: Optional[float]
+    metrics_month: Optional[datetime]  # month the scores come from
+    strike_score: Optional[float]
+    overall_score: Optional[float]
+    driver_carry: Optional[float]
+    seven_iron_carry: Optional[float]
+
+
+class FriendCompareResponse(BaseModel):
+    user: PlayerSummary
+    friend: PlayerSummary
+
+
+class LeaderboardEntry(PlayerSummary):
+    rank: Optional[int]  # None until the player has the ranked metric
+    is_you: bool
@@ -0,0 +1,241 @@
+"""
+Analytics Backfill for StrikeLab
+
+Recomputes derived analytics for existing data after scoring or analysis
+changes: Session.computed_stats, MetricSnapshot trend rollups, the metrics
+linked to session coach reports, ClubStats and peer percentiles. Report
+prose is left as written.
+
+Users are split into chunks that run in a process pool. Each chunk streams
+its shots through a server-side cursor and writes its results in bulk in
+one transaction. Finished users are recorded in a checkpoint file, so an
+interrupted run picks up where it stopped.
+
+Run with: python -m app.seed.backfill [--workers N] [--chunk-size N] [--dry-run]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+
+from app.database import SessionLocal, engine
+from app.models import Session as SessionModel, Shot, CoachReport, MetricSnapshot
+from app.services.club_stats import rebuild_club_stats
+from app.services.percentiles import rebuild_percentiles
+from app.services.session_stats import build_computed_stats
+from app.services.shot_analysis import AnalysisAccumulator, ShotFrame
+from app.services.trends import SCORE_FIELDS, build_snapshots
+
+STREAM_BATCH = 10000
+UPDATE_BATCH = 5000
+DEFAULT_CHECKPOINT = "backfill_checkpoint.json"
+
+# Sessions listed per score in the dry-run report
+TOP_CHANGES = 5
+# Smaller score differences are float noise from summing shots in a different order
+SCORE_TOLERANCE = 0.01
+
+
+def _init_worker_process() -> None:
+    # Drop pooled connections inherited from the parent process
+    engine.dispose(close=False)
+
+
+def _stream_session_stats(db, user_ids: list[UUID], session_ids: list[UUID]) -> dict[UUID, AnalysisAccumulator]:
+    """Accumulate per-session stats from one server-side cursor over the chunk's shots."""
+    stats = {sid: AnalysisAccumulator() for sid in session_ids}
+    if not session_ids:
+        return stats
+
+    query = select(Shot.session_id, *ShotFrame.COLUMNS).join(
+        SessionModel, SessionModel.id == Shot.session_id
+    ).where(SessionModel.user_id.in_(user_ids)).order_by(Shot.session_id)
+    result = db.execute(query.execution_options(stream_results=True, yield_per=STREAM_BATCH))
+    try:
+        for rows in result.partitions():
+            # A session split across partitions is simply added to twice
+            for session_id, group in itertools.groupby(rows, key=lambda row: row[0]):
+                stats[session_id].add(ShotFrame.from_rows([row[1:] for row in group]))
+    finally:
+        result.close()
+    return stats
+
+
+def _score_changes(old: Optional[dict], new: dict) -> dict[str, float]:
+    old = old or {}
+    return {
+        field: new[field] - old[field]
+        for field in SCORE_FIELDS
+        if new.get(field) is not None and old.get(field) is not None
+        and abs(new[field] - old[field]) >= SCORE_TOLERANCE
+    }
+
+
+def _bulk_update(db, model, rows: list[dict]) -> None:
+    for i in range(0, len(rows), UPDATE_BATCH):
+        # ORM bulk UPDATE by primary key
+        db.execute(update(model), rows[i:i + UPDATE_BATCH])
+
+
+def process_chunk(user_ids: list[UUID], dry_run: bool) -> dict[str, Any]:
+    """Recompute one chunk of users; returns counts and (for dry runs) score changes."""
+    db = SessionLocal()
+    try:
+        sessions = db.query(
+            SessionModel.id, SessionModel.user_id, SessionModel.session_date, SessionModel.computed_stats,
+        ).filter(SessionModel.user_id.in_(user_ids)).order_by(SessionModel.id).all()
+        stats = _stream_session_stats(db, user_ids, [s.id for s in sessions])
+
+        computed = {}
+        changes = []
+        for s in sessions:
+            analysis = stats[s.id].result()
+            computed[s.id] = build_computed_stats(analysis)
+            delta = _score_changes(s.computed_stats, analysis)
+            if delta:
+                changes.append((str(s.id), delta))
+
+        summary = {
+            "users": len(user_ids),
+            "sessions": len(sessions),
+            "shots": sum(acc.shot_count for acc in stats.values()),
+            "changes": changes,
+        }
+        if dry_run:
+            return summary
+
+        # updated_at is set explicitly: it versions the GET routes' ETags
+        now = datetime.utcnow()
+        _bulk_update(db, SessionModel, [
+            {"id": sid, "computed_stats": stats_, "updated_at": now} for sid, stats_ in computed.items()
+        ])
+
+        reports = db.query(CoachReport.id, CoachReport.session_id).filter(
+            CoachReport.user_id.in_(user_ids),
+            CoachReport.report_type == "session",
+        ).all()
+        _bulk_update(db, CoachReport, [
+            {"id": report_id, "linked_metrics": stats[session_id].result(), "updated_at": now}
+            for report_id, session_id in reports
+            if session_id in stats
+        ])
+
+        db.query(MetricSnapshot).filter(
+            MetricSnapshot.user_id.in_(user_ids)
+        ).delete(synchronize_session=False)
+        by_user: dict[UUID, list] = {}
+        for s in sessions:
+            by_user.setdefault(s.user_id, []).append((s.id, s.session_date, stats[s.id]))
+        for user_id, user_sessions in by_user.items():
+            db.add_all(build_snapshots(user_id, user_sessions))
+
+        # Commits everything above together with the club stats
+        rebuild_club_stats(db, user_ids)
+        return summary
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _load_checkpoint(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path) as fh:
+        return set(json.load(fh)["done"])
+
+
+def _save_checkpoint(path: str, done: set[str]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"done": sorted(done)}, fh)
+    os.replace(tmp, path)  # atomic, so a crash never leaves a torn checkpoint
+
+
+def _print_changes(changes: list[tuple[str, dict[str, float]]], sessions: int) -> None:
+    print(f"\n{len(changes)} of {sessions} sessions would change score")
+    for field in SCORE_FIELDS:
+        deltas = [(sid, d[field]) for sid, d in changes if field in d]
+        if not deltas:
+            continue
+        mean_abs = sum(abs(v) for _, v in deltas) / len(deltas)
+        print(f"  {field:<24} {len(deltas):>7} changed  mean |delta| {mean_abs:6.2f}")
+        for sid, delta in sorted(deltas, key=lambda d: -abs(d[1]))[:TOP_CHANGES]:
+            print(f"      {sid}  {delta:+7.2f}")
+
+
+def run_backfill(
+    workers: int = 4,
+    chunk_size: int = 100,
+    dry_run: bool = False,
+    checkpoint: str = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+) -> None:
+    db = SessionLocal()
+    try:
+        user_ids = [uid for (uid,) in db.query(SessionModel.user_id).distinct().order_by(SessionModel.user_id)]
+    finally:
+        db.close()
+
+    done = set() if restart or dry_run else _load_checkpoint(checkpoint)
+    pending = [uid for uid in user_ids if str(uid) not in done]
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    mode = "Dry run over" if dry_run else "Backfilling"
+    print(f"{mode} {len(pending)} users ({len(user_ids) - len(pending)} already done) in {len(chunks)} chunks")
+
+    totals = {"users": 0, "sessions": 0, "shots": 0}
+    changes = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_process) as pool:
+        futures = {pool.submit(process_chunk, chunk, dry_run): chunk for chunk in chunks}
+        for finished, future in enumerate(as_completed(futures), start=1):
+            summary = future.result()
+            for key in totals:
+                totals[key] += summary[key]
+            changes += summary["changes"]
+
+            if not dry_run:
+                done.update(str(uid) for uid in futures[future])
+                _save_checkpoint(checkpoint, done)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {finished}/{len(chunks)} chunks  {totals['users']} users  {totals['sessions']} sessions  "
+                f"{totals['shots']} shots  {totals['shots'] / elapsed:,.0f} shots/sec"
+            )
+
+    if dry_run:
+        _print_changes(changes, totals["sessions"])
+        return
+
+    db = SessionLocal()
+    try:
+        rebuild_percentiles(db)
+    finally:
+        db.close()
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    print(f"\nBackfill complete in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute stored analytics for all users")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--chunk-size", type=int, default=100, help="users per chunk")
+    parser.add_argument("--dry-run", action="store_true", help="report score changes without writing")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="progress file for resuming")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+    run_backfill(args.workers, args.chunk_size, args.dry_run, args.checkpoint, args.restart)
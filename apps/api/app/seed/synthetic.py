@@ -0,0 +1,304 @@
+"""
+Synthetic Data Generator for StrikeLab
+
+Seeds N users x M sessions x K shots for load and scaling tests. Shots are
+drawn from per-club launch profiles scaled by each player's handicap, so
+carries, dispersion and mishit rates look like a real population. Users
+also get session logs, coach reports, a friend graph and tee times.
+
+Rows are written with bulk INSERT / COPY, sessions in parallel worker
+processes. Derived analytics (session stats, trend snapshots, club stats,
+percentiles) are then computed by the analytics backfill. Every account
+shares the password SYNTHETIC_PASSWORD, so benchmarks.load_test can log in.
+
+Point DATABASE_URL at a scratch database.
+
+Run with: python -m app.seed.synthetic --users 1000 --sessions 20 --shots 60
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+import numpy as np
+from sqlalchemy import insert
+
+from app.database import SessionLocal, engine, Base
+from app.models import (
+    User, FriendLink, Session as SessionModel, SessionLog, CoachReport, Course, TeeTime,
+)
+from app.services.auth import hash_password
+from app.services.connectors.base import NormalizedShot
+from app.services.connectors.ingest import batched, bulk_insert_shots
+from app.seed.backfill import _init_worker_process, run_backfill
+
+SYNTHETIC_PASSWORD = "synthetic123"
+
+# Scratch-player launch profile per club:
+# (carry yds, launch deg, spin rpm, smash, total / carry)
+CLUB_PROFILES = {
+    "Driver": (255, 11.5, 2600, 1.48, 1.10),
+    "3 Wood": (235, 12.5, 3600, 1.46, 1.07),
+    "Hybrid": (215, 14.0, 4300, 1.42, 1.05),
+    "4 Iron": (200, 14.5, 4800, 1.39, 1.04),
+    "5 Iron": (190, 15.5, 5300, 1.38, 1.04),
+    "6 Iron": (180, 17.0, 6000, 1.37, 1.03),
+    "7 Iron": (170, 18.5, 6700, 1.35, 1.03),
+    "8 Iron": (160, 20.5, 7500, 1.33, 1.02),
+    "9 Iron": (148, 23.0, 8300, 1.30, 1.02),
+    "PW": (136, 25.0, 9000, 1.27, 1.02),
+    "52 Wedge": (115, 28.0, 9600, 1.22, 1.01),
+    "56 Wedge": (95, 31.0, 10200, 1.18, 1.01),
+}
+CLUBS = list(CLUB_PROFILES)
+
+FEEL_TAGS = ["calm", "focused", "smooth", "rushed", "tense", "tired", "confident", "distracted"]
+FOCUS_AREAS = ["strike", "face control", "tempo", "distance control", "dispersion"]
+COURSE_COUNT = 50
+
+
+def _handicap(rng: random.Random) -> float:
+    return round(min(max(rng.gauss(16, 8), -4), 40), 1)
+
+
+def generate_shots(rng: np.random.Generator, handicap: float, clubs: list[str], count: int) -> list[NormalizedShot]:
+    """A session's shots: carries shrink and spread out, and mishits get likelier, as the handicap rises."""
+    skill = max(handicap, 0.0)
+    club_idx = rng.integers(0, len(clubs), count)
+    profiles = np.array([CLUB_PROFILES[clubs[i]] for i in club_idx])
+    base_carry, launch, spin, smash, rollout = profiles.T
+
+    carry_scale = 1.0 - 0.008 * skill
+    carry = base_carry * carry_scale * (1 + rng.normal(0, 0.03 + 0.0025 * skill, count))
+    mishit = rng.random(count) < 0.02 + 0.008 * skill
+    carry[mishit] *= rng.uniform(0.5, 0.85, mishit.sum())
+
+    face_to_path = rng.normal(0.5, 1.0 + 0.12 * skill, count)
+    offline = rng.normal(0, base_carry * (0.03 + 0.002 * skill), count) + face_to_path * base_carry / 80
+    smash_factor = smash * (1 - 0.002 * skill) * (1 + rng.normal(0, 0.01, count))
+    smash_factor[mishit] *= 0.88
+    ball_speed = carry / 2.2 + rng.normal(0, 1.0, count)
+
+    return [
+        NormalizedShot(
+            shot_number=n + 1,
+            club=clubs[club_idx[n]],
+            carry_distance=round(float(carry[n]), 1),
+            total_distance=round(float(carry[n] * rollout[n]), 1),
+            ball_speed=round(float(ball_speed[n]), 1),
+            club_speed=round(float(ball_speed[n] / smash_factor[n]), 1),
+            smash_factor=round(float(smash_factor[n]), 3),
+            launch_angle=round(float(launch[n] + rng.normal(0, 1.5)), 1),
+            spin_rate=round(float(spin[n] * (1 + rng.normal(0, 0.08))), 0),
+            spin_axis=round(float(face_to_path[n] * 2.5), 1),
+            face_to_path=round(float(face_to_path[n]), 2),
+            offline_distance=round(float(offline[n]), 1),
+            is_mishit=bool(mishit[n]),
+            mishit_type="thin" if mishit[n] else None,
+        )
+        for n in range(count)
+    ]
+
+
+def _insert(db, model, rows: list[dict]) -> None:
+    for batch in batched(rows, 5000):
+        db.execute(insert(model), batch)
+
+
+def seed_chunk(users: list[tuple[UUID, float]], sessions: int, shots: int, days: int, seed: int) -> int:
+    """Sessions, shots, logs and coach reports for one chunk of users; returns shots written."""
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        session_rows, shot_plans, log_rows, report_rows = [], [], [], []
+        for user_id, handicap in users:
+            bag = sorted(rng.sample(CLUBS, rng.randint(6, len(CLUBS))), key=CLUBS.index)
+            for i in range(sessions):
+                when = now - timedelta(days=rng.uniform(0, days))
+                session_id = uuid4()
+                session_rows.append({
+                    "id": session_id,
+                    "user_id": user_id,
+                    "source": rng.choice(["csv", "trackman", "garmin_r10"]),
+                    "session_type": rng.choice(["range", "range", "range", "course", "simulator"]),
+                    "name": f"Session {i + 1}",
+                    "session_date": when,
+                    "created_at": when,
+                })
+                clubs = rng.sample(bag, rng.randint(2, min(6, len(bag))))
+                count = max(1, int(np_rng.poisson(shots)))
+                shot_plans.append((session_id, handicap, clubs, count))
+
+                if rng.random() < 0.4:
+                    log_rows.append({
+                        "id": uuid4(),
+                        "session_id": session_id,
+                        "user_id": user_id,
+                        "energy_level": rng.randint(1, 5),
+                        "mental_state": rng.randint(1, 5),
+                        "feel_tags": rng.sample(FEEL_TAGS, 2),
+                        "routine_discipline": rng.random() < 0.6,
+                        "fatigue_mode": False,
+                        "created_at": when,
+                        "updated_at": when,
+                    })
+                if rng.random() < 0.3:
+                    report_rows.append({
+                        "id": uuid4(),
+                        "session_id": session_id,
+                        "user_id": user_id,
+                        "diagnosis": f"{count} shots across {len(clubs)} clubs.",
+                        "next_best_move": f"Short session focusing on {rng.choice(FOCUS_AREAS)}.",
+                        "report_type": "session",
+                        "language": "en",
+                        "created_at": when,
+                    })
+
+        # Sessions go in before the rows that reference them; all in one transaction
+        _insert(db, SessionModel, session_rows)
+        written = 0
+        for session_id, handicap, clubs, count in shot_plans:
+            written += bulk_insert_shots(db, session_id, generate_shots(np_rng, handicap, clubs, count))
+        _insert(db, SessionLog, log_rows)
+        _insert(db, CoachReport, report_rows)
+        db.commit()
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def seed_users(db, count: int, prefix: str, rng: random.Random) -> list[tuple[UUID, float]]:
+    password_hash = hash_password(SYNTHETIC_PASSWORD)  # one bcrypt hash shared by every account
+    users = [(uuid4(), _handicap(rng)) for _ in range(count)]
+    _insert(db, User, [
+        {
+            "id": user_id,
+            "email": f"{prefix}-{i}@strikelab.golf",
+            "password_hash": password_hash,
+            "display_name": f"Synthetic Golfer {i}",
+            "handicap_index": handicap,
+            "onboarding_completed": True,
+            "language": "en",
+            "units": "yards",
+        }
+        for i, (user_id, handicap) in enumerate(users)
+    ])
+    return users
+
+
+def seed_social(db, users: list[tuple[UUID, float]], friends: int, rng: random.Random) -> tuple[int, int]:
+    """Accepted friend links (both directions) and past and upcoming tee times."""
+    user_ids = [user_id for user_id, _ in users]
+    pairs = set()
+    for user_id in user_ids:
+        for friend_id in rng.sample(user_ids, min(friends // 2, len(user_ids) - 1)):
+            if friend_id != user_id:
+                pairs.add((min(user_id, friend_id), max(user_id, friend_id)))
+    _insert(db, FriendLink, [
+        {"id": uuid4(), "user_id": a, "friend_id": b, "status": "accepted"}
+        for x, y in pairs
+        for a, b in ((x, y), (y, x))
+    ])
+
+    course_ids = [uuid4() for _ in range(COURSE_COUNT)]
+    _insert(db, Course, [
+        {"id": course_id, "name": f"Synthetic GC {i}", "country": "Norway", "par": rng.choice([70, 71, 72])}
+        for i, course_id in enumerate(course_ids)
+    ])
+
+    now = datetime.utcnow()
+    tee_times = [
+        {
+            "id": uuid4(),
+            "user_id": user_id,
+            "course_id": rng.choice(course_ids),
+            "tee_time": now + timedelta(days=rng.uniform(-60, 30)),
+            "focus_areas": rng.sample(FOCUS_AREAS, 2),
+            "booking_source": "manual",
+            "status": "scheduled",
+        }
+        for user_id in user_ids
+        for _ in range(rng.randint(0, 4))
+    ]
+    _insert(db, TeeTime, tee_times)
+    return len(pairs) * 2, len(tee_times)
+
+
+def generate(
+    users: int = 100,
+    sessions: int = 20,
+    shots: int = 60,
+    friends: int = 8,
+    days: int = 365,
+    prefix: str = "synth",
+    workers: int = 4,
+    chunk_size: int = 50,
+    seed: int = 42,
+    analytics: bool = True,
+) -> None:
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    start = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.email == f"{prefix}-0@strikelab.golf").first():
+            print(f"Synthetic users with prefix '{prefix}' already exist. Skipping.")
+            return
+        all_users = seed_users(db, users, prefix, rng)
+        links, tee_times = seed_social(db, all_users, friends, rng)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Created {users} users, {links} friend links and {tee_times} tee times")
+
+    chunks = [all_users[i:i + chunk_size] for i in range(0, len(all_users), chunk_size)]
+    total_shots = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_process) as pool:
+        futures = [
+            pool.submit(seed_chunk, chunk, sessions, shots, days, seed * 100_003 + n)
+            for n, chunk in enumerate(chunks)
+        ]
+        for finished, future in enumerate(as_completed(futures), start=1):
+            total_shots += future.result()
+            elapsed = time.perf_counter() - start
+            print(f"  {finished}/{len(chunks)} chunks  {total_shots} shots  {total_shots / elapsed:,.0f} shots/sec")
+
+    print(f"Loaded {users * sessions} sessions and {total_shots} shots in {time.perf_counter() - start:.1f}s")
+
+    if analytics:
+        run_backfill(workers=workers, chunk_size=chunk_size)
+
+    print("\nSynthetic accounts:")
+    print(f"  Email: {prefix}-0@strikelab.golf ... {prefix}-{users - 1}@strikelab.golf")
+    print(f"  Password: {SYNTHETIC_PASSWORD}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a large synthetic dataset")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=20, help="sessions per user")
+    parser.add_argument("--shots", type=int, default=60, help="mean shots per session")
+    parser.add_argument("--friends", type=int, default=8, help="mean friends per user")
+    parser.add_argument("--days", type=int, default=365, help="spread sessions over this many past days")
+    parser.add_argument("--prefix", default="synth", help="email prefix for the generated accounts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--chunk-size", type=int, default=50, help="users per worker chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-analytics", action="store_true", help="load raw rows only")
+    args = parser.parse_args()
+    generate(
+        args.users, args.sessions, args.shots, args.friends, args.days, args.prefix,
+        args.workers, args.chunk_size, args.seed, not args.skip_analytics,
+    )
@@ -1,27 +1,154 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Optional
+from uuid import UUID
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
 from app.models.user import User
+from app.services.metrics import CounterMetric, GaugeMetric, HistogramMetric, LATENCY_BUCKETS, register
 
 settings = get_settings()
 security = HTTPBearer()
 
+# bcrypt runs here rather than in the request threadpool, so a burst of
+# logins queues behind its own few threads instead of starving other endpoints
+HASH_WORKERS = settings.password_hash_workers or max(1, (os.cpu_count() or 2) // 2)
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+HASH_PENDING = register(GaugeMetric(
+    "strikelab_password_hash_pending", "Password hashes queued or running",
+))
+HASH_WAIT = register(HistogramMetric(
+    "strikelab_password_hash_wait_seconds", "Time a password hash waited for a bcrypt thread",
+    ("operation",), LATENCY_BUCKETS,
+))
+HASH_REJECTED = register(CounterMetric(
+    "strikelab_password_hash_rejected_total", "Password hashes refused because the queue was full",
+    ("operation",),
+))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user's profile, cached so most requests skip the users table."""
+    id: UUID
+    email: str
+    display_name: str
+    handicap_index: Optional[float]
+    goal_handicap: Optional[float]
+    dream_handicap: Optional[float]
+    practice_frequency: Optional[str]
+    onboarding_completed: bool
+    language: str
+    units: str
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            display_name=user.display_name,
+            handicap_index=user.handicap_index,
+            goal_handicap=user.goal_handicap,
+            dream_handicap=user.dream_handicap,
+            practice_frequency=user.practice_frequency,
+            onboarding_completed=bool(user.onboarding_completed),
+            language=user.language,
+            units=user.units,
+            created_at=user.created_at,
+        )
+
+
+class _ExpiringLRU:
+    """Size-bounded LRU whose entries also expire at a wall-clock time."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Verified token -> user id, and user id -> Principal. Per process; the short
+# TTL bounds how long another worker can serve a profile after it changes.
+_verified_tokens = _ExpiringLRU(settings.auth_cache_max_entries)
+_principals = _ExpiringLRU(settings.auth_cache_max_entries)
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    rounds = settings.password_hash_rounds
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    # The work factor is read from the stored hash
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
+async def _run_hash(operation: str, fn, *args):
+    if HASH_PENDING.value() >= settings.password_hash_max_pending:
+        HASH_REJECTED.inc((operation,))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    queued_at = time.perf_counter()
+
+    def timed():
+        HASH_WAIT.observe((operation,), time.perf_counter() - queued_at)
+        return fn(*args)
+
+    HASH_PENDING.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, timed)
+    finally:
+        HASH_PENDING.dec()
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt executor; 503 when too many are already waiting."""
+    return await _run_hash("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt executor; 503 when too many are already waiting."""
+    return await _run_hash("verify", verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
@@ -44,32 +171,70 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    token = credentials.credentials
+def _authenticate(token: str) -> UUID:
+    """User id for a valid access token; skips JWT decoding for recently verified tokens."""
+    user_id = _verified_tokens.get(token)
+    if user_id is not None:
+        return user_id
+
     payload = decode_token(token)
-    
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user_id = payload.get("sub")
-    if not user_id:
+
+    try:
+        user_id = UUID(payload.get("sub"))
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload",
         )
-    
+
+    _verified_tokens.set(token, user_id, min(payload.get("exp", 0), time.time() + settings.auth_cache_ttl_seconds))
+    return user_id
+
+
+def _user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found",
+    )
+
+
+def cache_principal(user: User) -> Principal:
+    """Cache (or replace, after the row changes) a user's profile."""
+    principal = Principal.from_user(user)
+    _principals.set(user.id, principal, time.time() + settings.auth_cache_ttl_seconds)
+    return principal
+
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> Principal:
+    """The authenticated user without a database round-trip while cached."""
+    # Async so that a cache hit never waits for a threadpool slot
+    user_id = _authenticate(credentials.credentials)
+    principal = _principals.get(user_id)
+    if principal is not None:
+        return principal
+
+    async with AsyncSessionLocal() as db:
+        user = await db.scalar(select(User).where(User.id == user_id))
+        if not user:
+            raise _user_not_found()
+        return cache_principal(user)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """The authenticated user's row, for endpoints that modify it."""
+    user_id = _authenticate(credentials.credentials)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    
+        raise _user_not_found()
     return user
@@ -0,0 +1,193 @@
+"""
+Response cache for the coach chat.
+
+Replies are keyed on the normalized question, the player context string the
+LLM would see, the earlier chat turns sent with it and the reply language, so
+repeat questions ("how do I fix my slice?") are answered without calling a
+provider, but never with a reply written for someone else's conversation. Entries expire after a TTL
+and the least recently used are evicted once the store is full.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+from uuid import UUID
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.coach import ChatResponseCache
+from app.services.metrics import CounterMetric, register
+
+settings = get_settings()
+
+# Process-wide numbers, so they go to /metrics rather than any user-facing route
+CACHE_LOOKUPS = register(CounterMetric(
+    "strikelab_chat_cache_lookups_total", "Coach chat cache lookups by result (hit, miss, bypassed)",
+    ("backend", "result"),
+))
+CACHE_STORES = register(CounterMetric(
+    "strikelab_chat_cache_stores_total", "Replies written to the coach chat cache", ("backend",),
+))
+
+# Bump when prompts change so stale replies are not served
+CACHE_VERSION = 2
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a chat message."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", message.lower())).strip()
+
+
+def cache_key(message: str, context_str: str, language: str, history: list[dict]) -> str:
+    """Key for a reply; history is the prior turns the provider sees along with the message."""
+    turns = [[turn["role"], turn["content"]] for turn in history]
+    raw = json.dumps([CACHE_VERSION, language, normalize_message(message), context_str, turns])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryStore:
+    """In-process LRU store. Fast, but per process and lost on restart."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DatabaseStore:
+    """Store shared by every API process, backed by the chat_response_cache table."""
+
+    blocking = True
+    evict_every = 100  # writes between LRU eviction passes
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            entry = db.query(ChatResponseCache).filter(
+                ChatResponseCache.key == key,
+                ChatResponseCache.expires_at > now,
+            ).first()
+            if entry is None:
+                return None
+            entry.hits = (entry.hits or 0) + 1
+            entry.last_used_at = now
+            db.commit()
+            return entry.response
+        finally:
+            db.close()
+
+    def set(self, key: str, response: str, ttl: int) -> None:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.merge(ChatResponseCache(
+                key=key,
+                response=response,
+                hits=0,
+                created_at=now,
+                last_used_at=now,
+                expires_at=now + timedelta(seconds=ttl),
+            ))
+            db.commit()
+
+            self._writes += 1
+            if self._writes % self.evict_every == 0:
+                self._evict(db, now)
+        finally:
+            db.close()
+
+    def _evict(self, db, now: datetime) -> None:
+        db.query(ChatResponseCache).filter(
+            ChatResponseCache.expires_at <= now
+        ).delete(synchronize_session=False)
+
+        # Keep only the max_entries most recently used
+        cutoff = db.query(ChatResponseCache.last_used_at).order_by(
+            ChatResponseCache.last_used_at.desc()
+        ).offset(self.max_entries).limit(1).scalar()
+        if cutoff is not None:
+            db.query(ChatResponseCache).filter(
+                ChatResponseCache.last_used_at <= cutoff
+            ).delete(synchronize_session=False)
+        db.commit()
+
+
+class ChatCache:
+    """Chat response cache with hit/miss metrics and per-user bypass."""
+
+    def __init__(self, store, ttl: int, bypass_users: set[str]):
+        self.store = store
+        self.ttl = ttl
+        self.bypass_users = bypass_users
+
+    def bypass(self, user_id: UUID) -> bool:
+        return self.store is None or str(user_id) in self.bypass_users
+
+    async def _call(self, fn, *args):
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def get(self, key: str, user_id: UUID) -> Optional[str]:
+        if self.bypass(user_id):
+            CACHE_LOOKUPS.inc((settings.chat_cache_backend, "bypassed"))
+            return None
+        try:
+            response = await self._call(self.store.get, key)
+        except Exception as e:
+            print(f"Chat cache read failed: {e}")
+            response = None
+        CACHE_LOOKUPS.inc((settings.chat_cache_backend, "hit" if response is not None else "miss"))
+        return response
+
+    async def set(self, key: str, user_id: UUID, response: str) -> None:
+        if self.bypass(user_id) or not response:
+            return
+        try:
+            await self._call(self.store.set, key, response, self.ttl)
+            CACHE_STORES.inc((settings.chat_cache_backend,))
+        except Exception as e:
+            print(f"Chat cache write failed: {e}")
+
+
+@lru_cache()
+def get_chat_cache() -> ChatCache:
+    stores = {"memory": MemoryStore, "database": DatabaseStore}
+    store_cls = stores.get(settings.chat_cache_backend)
+    store = store_cls(settings.chat_cache_max_entries) if store_cls else None
+    return ChatCache(store, settings.chat_cache_ttl_seconds, set(settings.chat_cache_bypass_users_list))
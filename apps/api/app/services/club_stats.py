@@ -0,0 +1,372 @@
+"""
+Incremental per-club statistics (ClubStats).
+
+Each ClubStats row keeps mergeable sufficient statistics - per metric count,
+sum and sum of squares - next to the derived averages, so a session's shots
+are added or removed with one grouped aggregate query and a row update rather
+than a rescan of the user's history. Min/max carry cannot be un-merged; they
+are re-read for the club only when a removed shot sat on the boundary.
+
+Rebuild everything with: python -m app.services.club_stats [--workers N] [--chunk-size N]
+"""
+import argparse
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.equipment import ClubStats, UserBag, UserClub
+from app.models.session import Session as SessionModel
+from app.models.shot import Shot
+from app.models.user import User
+from app.services.percentiles import get_sketches
+
+# ClubStats average column -> Shot column it averages
+AVERAGE_FIELDS = {
+    "avg_carry": "carry_distance",
+    "avg_total": "total_distance",
+    "avg_ball_speed": "ball_speed",
+    "avg_launch_angle": "launch_angle",
+    "avg_spin_rate": "spin_rate",
+    "avg_peak_height": "peak_height",
+    "avg_club_speed": "club_speed",
+    "avg_smash_factor": "smash_factor",
+    "avg_attack_angle": "attack_angle",
+    "avg_club_path": "club_path",
+    "avg_face_angle": "face_angle",
+    "avg_face_to_path": "face_to_path",
+    "avg_offline": "offline_distance",
+}
+METRICS = tuple(AVERAGE_FIELDS.values())
+
+# A valid shot finishing within this many meters of the target line is "good"
+GOOD_SHOT_MAX_OFFLINE = 10.0
+
+
+@dataclass
+class ClubMoments:
+    """Sufficient statistics for one club; mishits count towards `shots` only."""
+    shots: int = 0
+    good: int = 0
+    min_carry: Optional[float] = None
+    max_carry: Optional[float] = None
+    metrics: dict[str, list[float]] = field(default_factory=dict)  # metric -> [count, sum, sum of squares]
+
+    @classmethod
+    def from_state(cls, state: Optional[dict[str, Any]], min_carry=None, max_carry=None) -> "ClubMoments":
+        if not state:
+            return cls()
+        return cls(
+            shots=state["shots"],
+            good=state["good"],
+            min_carry=min_carry,
+            max_carry=max_carry,
+            metrics={m: list(v) for m, v in state["metrics"].items()},
+        )
+
+    @classmethod
+    def from_shot(cls, shot: Shot) -> "ClubMoments":
+        """The valid-shot contribution of one shot (shots=0: it is counted either way)."""
+        metrics = {}
+        for metric in METRICS:
+            value = getattr(shot, metric)
+            if value is not None:
+                metrics[metric] = [1, value, value * value]
+        offline = shot.offline_distance
+        return cls(
+            good=int(offline is not None and abs(offline) <= GOOD_SHOT_MAX_OFFLINE),
+            min_carry=shot.carry_distance,
+            max_carry=shot.carry_distance,
+            metrics=metrics,
+        )
+
+    def to_state(self) -> dict[str, Any]:
+        return {"shots": self.shots, "good": self.good, "metrics": self.metrics}
+
+    def merge(self, other: "ClubMoments", sign: int = 1) -> "ClubMoments":
+        """Add (sign=1) or remove (sign=-1) another set of moments. Removal leaves min/max to the caller."""
+        self.shots += sign * other.shots
+        self.good += sign * other.good
+        for metric, (count, total, squares) in other.metrics.items():
+            mine = self.metrics.setdefault(metric, [0, 0.0, 0.0])
+            mine[0] += sign * count
+            mine[1] += sign * total
+            mine[2] += sign * squares
+            if mine[0] <= 0:
+                del self.metrics[metric]
+        if sign > 0:
+            if other.min_carry is not None and (self.min_carry is None or other.min_carry < self.min_carry):
+                self.min_carry = other.min_carry
+            if other.max_carry is not None and (self.max_carry is None or other.max_carry > self.max_carry):
+                self.max_carry = other.max_carry
+        return self
+
+    def mean(self, metric: str) -> Optional[float]:
+        count, total, _ = self.metrics.get(metric, (0, 0.0, 0.0))
+        return total / count if count else None
+
+    def variance(self, metric: str) -> Optional[float]:
+        count, total, squares = self.metrics.get(metric, (0, 0.0, 0.0))
+        if count < 2:
+            return None
+        return max(0.0, (squares - total * total / count) / (count - 1))
+
+
+def _valid_shot():
+    return or_(Shot.is_mishit.is_(None), Shot.is_mishit.is_(False))
+
+
+def _moment_columns() -> list:
+    """Aggregate expressions producing ClubMoments, in _moments_from_row order."""
+    valid = _valid_shot()
+    columns = [
+        func.count(Shot.id),
+        func.sum(case((and_(valid, func.abs(Shot.offline_distance) <= GOOD_SHOT_MAX_OFFLINE), 1), else_=0)),
+        func.min(case((valid, Shot.carry_distance))),
+        func.max(case((valid, Shot.carry_distance))),
+    ]
+    for metric in METRICS:
+        value = case((valid, getattr(Shot, metric)))
+        columns += [func.count(value), func.sum(value), func.sum(value * value)]
+    return columns
+
+
+def _moments_from_row(row: Sequence[Any]) -> ClubMoments:
+    shots, good, min_carry, max_carry = row[:4]
+    metrics = {}
+    for i, metric in enumerate(METRICS):
+        count, total, squares = row[4 + 3 * i: 7 + 3 * i]
+        if count:
+            metrics[metric] = [count, float(total), float(squares)]
+    return ClubMoments(shots=shots, good=int(good or 0), min_carry=min_carry, max_carry=max_carry, metrics=metrics)
+
+
+def session_club_moments(db: Session, session_id: UUID) -> dict[str, ClubMoments]:
+    """Per-club moments of one session's shots, aggregated in the database."""
+    rows = db.query(Shot.club, *_moment_columns()).filter(
+        Shot.session_id == session_id
+    ).group_by(Shot.club).all()
+    return {row[0]: _moments_from_row(row[1:]) for row in rows}
+
+
+def _apply(stats: ClubStats, moments: ClubMoments) -> None:
+    """Store moments and everything derived from them on a ClubStats row."""
+    stats.moments = moments.to_state()
+    stats.total_shots = moments.shots
+    stats.good_shots = moments.good
+    stats.min_carry = moments.min_carry
+    stats.max_carry = moments.max_carry
+    for column, metric in AVERAGE_FIELDS.items():
+        setattr(stats, column, moments.mean(metric))
+
+    carry_var = moments.variance("carry_distance")
+    offline_var = moments.variance("offline_distance")
+    stats.std_carry = math.sqrt(carry_var) if carry_var is not None else None
+    # RMS distance from the shot-pattern centre, i.e. a ~68% circle for round patterns
+    stats.dispersion_radius = (
+        math.sqrt(carry_var + offline_var) if carry_var is not None and offline_var is not None else None
+    )
+
+
+def _linked_club_ids(
+    db: Session, user_ids: Sequence[UUID], club_labels: Optional[Sequence[str]] = None
+) -> dict[tuple[UUID, str], UUID]:
+    """(user_id, club_label) -> the bag club it maps to, primary bag first, in one query."""
+    query = db.query(UserBag.user_id, UserClub.club_label, UserClub.id).join(UserBag).filter(
+        UserBag.user_id.in_(user_ids),
+    )
+    if club_labels is not None:
+        query = query.filter(UserClub.club_label.in_(club_labels))
+    linked = {}
+    for user_id, club_label, club_id in query.order_by(UserBag.is_primary.desc()):
+        linked.setdefault((user_id, club_label), club_id)
+    return linked
+
+
+def _lock_club_stats(db: Session, user_id: UUID, club_labels: Sequence[str]) -> dict[str, ClubStats]:
+    """Fetch the user's ClubStats rows for these clubs for update, creating missing ones in one batch."""
+    while True:
+        locked = {
+            stats.club_label: stats
+            for stats in db.query(ClubStats).filter(
+                ClubStats.user_id == user_id,
+                ClubStats.club_label.in_(club_labels),
+            ).order_by(ClubStats.club_label).with_for_update()
+        }
+        missing = [label for label in club_labels if label not in locked]
+        if not missing:
+            return locked
+
+        linked = _linked_club_ids(db, [user_id], missing)
+        created = [
+            ClubStats(user_id=user_id, club_label=label, club_id=linked.get((user_id, label)))
+            for label in missing
+        ]
+        try:
+            with db.begin_nested():
+                db.add_all(created)
+        except IntegrityError:
+            # Another import created some of the rows first; lock again
+            continue
+        locked.update((stats.club_label, stats) for stats in created)
+        return locked
+
+
+def _reread_carry_extremes(
+    db: Session,
+    user_id: UUID,
+    club_label: str,
+    moments: ClubMoments,
+    exclude_session_id: Optional[UUID] = None,
+) -> None:
+    query = db.query(func.min(Shot.carry_distance), func.max(Shot.carry_distance)).join(
+        SessionModel, SessionModel.id == Shot.session_id
+    ).filter(
+        SessionModel.user_id == user_id,
+        Shot.club == club_label,
+        _valid_shot(),
+    )
+    if exclude_session_id:
+        query = query.filter(Shot.session_id != exclude_session_id)
+    moments.min_carry, moments.max_carry = query.one()
+
+
+def apply_club_moments(
+    db: Session,
+    user_id: UUID,
+    deltas: dict[str, ClubMoments],
+    sign: int = 1,
+    exclude_session_id: Optional[UUID] = None,
+) -> None:
+    """
+    Fold per-club deltas into the user's ClubStats (caller commits).
+
+    The affected rows are locked (in label order, so concurrent imports
+    cannot deadlock) and missing ones created with a constant number of
+    queries, however many clubs the session used.
+    On removal, pass exclude_session_id if the removed shots are still in
+    the database, so a min/max re-read does not see them. Peer percentiles
+    are restamped from the current sketches.
+    """
+    if not deltas:
+        return
+    sketches = get_sketches(db)
+    handicap = db.query(User.handicap_index).filter(User.id == user_id).scalar()
+
+    club_labels = sorted(deltas)
+    locked = _lock_club_stats(db, user_id, club_labels)
+    for club_label in club_labels:
+        delta = deltas[club_label]
+        stats = locked[club_label]
+        moments = ClubMoments.from_state(stats.moments, stats.min_carry, stats.max_carry).merge(delta, sign)
+
+        if moments.shots <= 0:
+            db.delete(stats)
+            continue
+
+        if sign < 0 and delta.min_carry is not None and (
+            moments.min_carry is None
+            or delta.min_carry <= moments.min_carry
+            or delta.max_carry >= moments.max_carry
+        ):
+            _reread_carry_extremes(db, user_id, club_label, moments, exclude_session_id)
+        _apply(stats, moments)
+        sketches.stamp(stats, handicap)
+
+
+def add_session_club_stats(session: SessionModel, db: Session) -> None:
+    """Count a newly stored session's shots into ClubStats (caller commits)."""
+    apply_club_moments(db, session.user_id, session_club_moments(db, session.id))
+
+
+def remove_session_club_stats(session: SessionModel, db: Session) -> None:
+    """Take a session's shots out of ClubStats before the session is deleted (caller commits)."""
+    apply_club_moments(
+        db, session.user_id, session_club_moments(db, session.id), sign=-1, exclude_session_id=session.id
+    )
+
+
+def update_shot_club_stats(shot: Shot, user_id: UUID, was_mishit: bool, db: Session) -> None:
+    """Move a shot in or out of its club's aggregates after its mishit flag changed (caller commits)."""
+    if bool(was_mishit) == bool(shot.is_mishit):
+        return
+    db.flush()  # min/max re-read must see the new flag
+    sign = -1 if shot.is_mishit else 1
+    apply_club_moments(db, user_id, {shot.club: ClubMoments.from_shot(shot)}, sign)
+
+
+def rebuild_club_stats(db: Session, user_ids: Sequence[UUID]) -> int:
+    """Recompute ClubStats for a set of users from their shots in one grouped query; returns rows written."""
+    rows = db.query(SessionModel.user_id, Shot.club, *_moment_columns()).join(
+        SessionModel, SessionModel.id == Shot.session_id
+    ).filter(
+        SessionModel.user_id.in_(user_ids)
+    ).group_by(SessionModel.user_id, Shot.club).all()
+
+    existing = {
+        (s.user_id, s.club_label): s
+        for s in db.query(ClubStats).filter(ClubStats.user_id.in_(user_ids)).with_for_update()
+    }
+    handicaps = dict(db.query(User.id, User.handicap_index).filter(User.id.in_(user_ids)))
+    linked = _linked_club_ids(db, user_ids)
+    sketches = get_sketches(db)
+
+    for row in rows:
+        key = (row[0], row[1])
+        stats = existing.pop(key, None)
+        if stats is None:
+            stats = ClubStats(user_id=row[0], club_label=row[1], club_id=linked.get(key))
+            db.add(stats)
+        _apply(stats, _moments_from_row(row[2:]))
+        sketches.stamp(stats, handicaps.get(row[0]))
+
+    # Clubs with no shots left
+    for stats in existing.values():
+        db.delete(stats)
+
+    db.commit()
+    return len(rows)
+
+
+def _rebuild_chunk(user_ids: list[UUID]) -> int:
+    db = SessionLocal()
+    try:
+        return rebuild_club_stats(db, user_ids)
+    finally:
+        db.close()
+
+
+def backfill_club_stats(workers: int = 4, chunk_size: int = 200) -> None:
+    """Rebuild every user's ClubStats, chunks of users in parallel."""
+    db = SessionLocal()
+    try:
+        user_ids = [uid for (uid,) in db.query(SessionModel.user_id).distinct()]
+    finally:
+        db.close()
+
+    chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+    print(f"Rebuilding club stats for {len(user_ids)} users in {len(chunks)} chunks")
+
+    start = time.perf_counter()
+    written = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_rebuild_chunk, chunk) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            written += future.result()
+            print(f"  {done}/{len(chunks)} chunks, {written} club rows")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild ClubStats from all shots")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+    backfill_club_stats(args.workers, args.chunk_size)
@@ -1,15 +1,40 @@
-from typing import Optional, Any
+from dataclasses import dataclass
+from typing import Optional, Any, AsyncIterator
 from sqlalchemy.orm import Session
 from uuid import UUID
 import statistics
-import os
-import httpx
-import json
 
 from app.models.session import Session as SessionModel
 from app.models.shot import Shot
 from app.models.log import SessionLog
 from app.models.coach import CoachReport, ChatMessage
+from app.services.session_stats import get_session_analysis
+from app.services.shot_analysis import (
+    ShotFrame,
+    analyze_frame,
+    score_strike,
+    score_face_control,
+    score_distance_control,
+    score_dispersion,
+)
+from app.services import llm
+from app.services.chat_cache import cache_key, get_chat_cache
+from app.services.llm import LLMUnavailable
+
+
+@dataclass
+class ChatPrompt:
+    """Everything needed to answer one chat turn, loaded up front from the database."""
+    message: str
+    context: Optional[dict]
+    context_str: str
+    messages: list[dict]  # history plus the new user message
+    user_id: UUID
+    language: str = "en"
+    
+    @property
+    def cache_key(self) -> str:
+        return cache_key(self.message, self.context_str, self.language, self.messages[:-1])
 
 
 class CoachEngine:
@@ -29,13 +54,10 @@ class CoachEngine:
     ) -> CoachReport:
         """Generate a coach report for a session."""
         
-        # Get shots and log
-        shots = db.query(Shot).filter(Shot.session_id == session.id).all()
+        # Analyze metrics (served from Session.computed_stats when current)
+        analysis = get_session_analysis(session, db)
         log = db.query(SessionLog).filter(SessionLog.session_id == session.id).first()
         
-        # Analyze metrics
-        analysis = self._analyze_session(shots)
-        
         # Generate report sections
         diagnosis = self._generate_diagnosis(analysis, log, language)
         interpretation = self._generate_interpretation(analysis, log, language)
@@ -65,94 +87,21 @@ class CoachEngine:
     
     def _analyze_session(self, shots: list[Shot]) -> dict[str, Any]:
         """Analyze session metrics."""
-        if not shots:
-            return {}
-        
-        # Filter non-mishits for analysis
-        valid_shots = [s for s in shots if not s.is_mishit]
-        
-        if not valid_shots:
-            return {"shot_count": len(shots), "mishit_count": len(shots)}
-        
-        # Group by club
-        clubs: dict[str, list[Shot]] = {}
-        for shot in valid_shots:
-            if shot.club not in clubs:
-                clubs[shot.club] = []
-            clubs[shot.club].append(shot)
-        
-        # Calculate metrics per club
-        club_metrics = {}
-        for club, club_shots in clubs.items():
-            carries = [s.carry_distance for s in club_shots if s.carry_distance]
-            smash_factors = [s.smash_factor for s in club_shots if s.smash_factor]
-            face_to_paths = [s.face_to_path for s in club_shots if s.face_to_path]
-            spin_axes = [s.spin_axis for s in club_shots if s.spin_axis]
-            offline = [s.offline_distance for s in club_shots if s.offline_distance]
-            
-            club_metrics[club] = {
-                "count": len(club_shots),
-                "avg_carry": statistics.mean(carries) if carries else None,
-                "carry_std": statistics.stdev(carries) if len(carries) > 1 else None,
-                "avg_smash": statistics.mean(smash_factors) if smash_factors else None,
-                "avg_face_to_path": statistics.mean(face_to_paths) if face_to_paths else None,
-                "face_to_path_std": statistics.stdev(face_to_paths) if len(face_to_paths) > 1 else None,
-                "avg_spin_axis": statistics.mean(spin_axes) if spin_axes else None,
-                "avg_offline": statistics.mean(offline) if offline else None,
-                "offline_std": statistics.stdev(offline) if len(offline) > 1 else None,
-            }
-        
-        # Calculate overall scores
-        all_smash = [s.smash_factor for s in valid_shots if s.smash_factor]
-        all_face_to_path = [s.face_to_path for s in valid_shots if s.face_to_path]
-        all_carry_std = [m["carry_std"] for m in club_metrics.values() if m.get("carry_std")]
-        all_offline_std = [m["offline_std"] for m in club_metrics.values() if m.get("offline_std")]
-        
-        # Score calculations (0-100 scale)
-        strike_score = self._calculate_strike_score(all_smash)
-        face_control_score = self._calculate_face_control_score(all_face_to_path)
-        distance_control_score = self._calculate_distance_control_score(all_carry_std)
-        dispersion_score = self._calculate_dispersion_score(all_offline_std)
-        
-        return {
-            "shot_count": len(shots),
-            "valid_shot_count": len(valid_shots),
-            "mishit_count": len(shots) - len(valid_shots),
-            "clubs_used": list(clubs.keys()),
-            "club_metrics": club_metrics,
-            "strike_score": strike_score,
-            "face_control_score": face_control_score,
-            "distance_control_score": distance_control_score,
-            "dispersion_score": dispersion_score,
-        }
+        return analyze_frame(ShotFrame.from_shots(shots))
     
     def _calculate_strike_score(self, smash_factors: list[float]) -> float:
-        if not smash_factors:
-            return 70.0
-        avg = statistics.mean(smash_factors)
-        # Baseline: 1.45 = 100, 1.35 = 70
-        return min(100, max(0, 70 + (avg - 1.35) * 300))
+        return score_strike(statistics.mean(smash_factors) if smash_factors else None)
     
     def _calculate_face_control_score(self, face_to_paths: list[float]) -> float:
-        if not face_to_paths:
-            return 70.0
-        avg_abs = statistics.mean([abs(f) for f in face_to_paths])
-        # Lower is better: 0° = 100, 4° = 60
-        return min(100, max(0, 100 - avg_abs * 10))
+        return score_face_control(
+            statistics.mean([abs(f) for f in face_to_paths]) if face_to_paths else None
+        )
     
     def _calculate_distance_control_score(self, carry_stds: list[float]) -> float:
-        if not carry_stds:
-            return 70.0
-        avg_std = statistics.mean(carry_stds)
-        # Lower std is better: 0m = 100, 10m = 60
-        return min(100, max(0, 100 - avg_std * 4))
+        return score_distance_control(statistics.mean(carry_stds) if carry_stds else None)
     
     def _calculate_dispersion_score(self, offline_stds: list[float]) -> float:
-        if not offline_stds:
-            return 70.0
-        avg_std = statistics.mean(offline_stds)
-        # Lower is better: 0m = 100, 15m = 60
-        return min(100, max(0, 100 - avg_std * 2.67))
+        return score_dispersion(statistics.mean(offline_stds) if offline_stds else None)
     
     def _generate_diagnosis(
         self, analysis: dict, log: Optional[SessionLog], language: str
@@ -257,18 +206,15 @@ class CoachEngine:
         
         return "Short session tomorrow: 20 balls, 7-iron only, with pause drill. Log energy and feel before starting."
     
-    def generate_chat_response(
+    def build_chat_prompt(
         self,
         message: str,
         context: Optional[dict],
         user_id: UUID,
         db: Session,
-    ) -> str:
-        """Generate a chat response using AI (Anthropic Claude) or fallback."""
-        
-        # Check for API key
-        anthropic_key = os.getenv("ANTHROPIC_API_KEY")
-        openai_key = os.getenv("OPENAI_API_KEY")
+        language: str = "en",
+    ) -> ChatPrompt:
+        """Load conversation history and player context for a chat turn."""
         
         # Get conversation history for context
         history = db.query(ChatMessage).filter(
@@ -280,25 +226,64 @@ class CoachEngine:
             for msg in reversed(history)
         ]
         
-        # Build context string from session data
-        context_str = self._build_context_string(context, user_id, db)
-        
-        # Try Anthropic Claude first
-        if anthropic_key:
-            try:
-                return self._call_anthropic(message, history_messages, context_str, anthropic_key)
-            except Exception as e:
-                print(f"Anthropic API error: {e}")
-        
-        # Try OpenAI as fallback
-        if openai_key:
-            try:
-                return self._call_openai(message, history_messages, context_str, openai_key)
-            except Exception as e:
-                print(f"OpenAI API error: {e}")
-        
-        # Fallback to rule-based responses
-        return self._generate_fallback_response(message, context)
+        # Last 6 messages for context, then the new question
+        messages = history_messages[-6:] + [{"role": "user", "content": message}]
+        
+        return ChatPrompt(
+            message=message,
+            context=context,
+            context_str=self._build_context_string(context, user_id, db),
+            messages=messages,
+            user_id=user_id,
+            language=language,
+        )
+    
+    async def generate_chat_response(self, prompt: ChatPrompt) -> str:
+        """Generate a chat response using AI (Anthropic Claude, hedged with OpenAI) or fallback."""
+        cache = get_chat_cache()
+        cached = await cache.get(prompt.cache_key, prompt.user_id)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await llm.complete(
+                lambda provider: self._system_prompt(provider.name, prompt.context_str, prompt.language),
+                prompt.messages,
+            )
+            await cache.set(prompt.cache_key, prompt.user_id, response)
+            return response
+        except LLMUnavailable as e:
+            if e.errors:
+                print(f"LLM providers unavailable: {e.errors!r}")
+        
+        # Fallback to rule-based responses (not cached, so answers recover with the provider)
+        return self._generate_fallback_response(prompt.message, prompt.context)
+    
+    async def stream_chat_response(self, prompt: ChatPrompt) -> AsyncIterator[str]:
+        """Stream a chat response token by token, falling back to a rule-based reply."""
+        cache = get_chat_cache()
+        cached = await cache.get(prompt.cache_key, prompt.user_id)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        try:
+            async for token in llm.stream(
+                lambda provider: self._system_prompt(provider.name, prompt.context_str, prompt.language),
+                prompt.messages,
+            ):
+                chunks.append(token)
+                yield token
+        except Exception as e:
+            if not isinstance(e, LLMUnavailable) or e.errors:
+                print(f"LLM streaming error: {e!r}")
+            if chunks:
+                return
+            yield self._generate_fallback_response(prompt.message, prompt.context)
+            return
+        
+        await cache.set(prompt.cache_key, prompt.user_id, "".join(chunks))
     
     def _build_context_string(self, context: Optional[dict], user_id: UUID, db: Session) -> str:
         """Build context string from user data for the AI."""
@@ -323,15 +308,18 @@ class CoachEngine:
         
         return "\n".join(parts) if parts else "No session data available yet."
     
-    def _call_anthropic(
-        self, 
-        message: str, 
-        history: list[dict], 
-        context: str, 
-        api_key: str
-    ) -> str:
-        """Call Anthropic Claude API."""
-        system_prompt = f"""You are an expert golf coach AI assistant for StrikeLab, a golf performance tracking app. 
+    def _system_prompt(self, provider: str, context: str, language: str = "en") -> str:
+        """System prompt for the given LLM provider."""
+        if provider == "openai":
+            prompt = f"""You are an expert golf coach AI assistant for StrikeLab. 
+You help golfers improve by analyzing data, suggesting drills, and providing personalized coaching.
+
+Player Context:
+{context}
+
+Be encouraging, specific, and concise (2-4 paragraphs). Use golf terminology appropriately."""
+        else:
+            prompt = f"""You are an expert golf coach AI assistant for StrikeLab, a golf performance tracking app. 
 You help golfers improve their game by analyzing their data, suggesting drills, and providing personalized coaching.
 
 Player Context:
@@ -345,72 +333,10 @@ Guidelines:
 - Use golf terminology appropriately
 - If asked about something outside golf, politely redirect to golf topics
 - Never make up statistics or data - only reference what's provided"""
-
-        # Build messages
-        messages = []
-        for msg in history[-6:]:  # Last 6 messages for context
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-        messages.append({"role": "user", "content": message})
-        
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                },
-                json={
-                    "model": "claude-3-haiku-20240307",  # Fast and cost-effective
-                    "max_tokens": 1024,
-                    "system": system_prompt,
-                    "messages": messages,
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["content"][0]["text"]
-    
-    def _call_openai(
-        self, 
-        message: str, 
-        history: list[dict], 
-        context: str, 
-        api_key: str
-    ) -> str:
-        """Call OpenAI API as fallback."""
-        system_prompt = f"""You are an expert golf coach AI assistant for StrikeLab. 
-You help golfers improve by analyzing data, suggesting drills, and providing personalized coaching.
-
-Player Context:
-{context}
-
-Be encouraging, specific, and concise (2-4 paragraphs). Use golf terminology appropriately."""
-
-        messages = [{"role": "system", "content": system_prompt}]
-        for msg in history[-6:]:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-        messages.append({"role": "user", "content": message})
-        
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": messages,
-                    "max_tokens": 1024,
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+        
+        if language == "no":
+            prompt += "\n\nRespond in Norwegian."
+        return prompt
     
     def _generate_fallback_response(self, message: str, context: Optional[dict]) -> str:
         """Generate a response without AI API (rule-based fallback)."""
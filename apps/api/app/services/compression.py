@@ -0,0 +1,179 @@
+"""
+Response compression.
+
+Shot lists and session stats are repetitive JSON that shrinks 10x or more,
+which matters to phones on range Wi-Fi far more than the CPU it costs here.
+Brotli is used when the client accepts it, gzip otherwise; bodies under the
+size threshold go out as is, since a few hundred bytes don't shrink enough
+to pay for the encoding.
+
+Streamed bodies are compressed chunk by chunk (each flushed, so clients see
+rows as they arrive); event streams, partial and bodiless responses, images
+and other already compressed types are passed through. A compressed body is
+a different byte sequence from the identity one, so a strong ETag on it is
+made weak; the routes' own ETags are weak already (make_etag).
+"""
+import zlib
+from typing import Optional
+
+import brotli
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+# Already compressed, or must reach the client unbuffered
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "application/gzip",
+    "application/zip",
+    "application/vnd.apache.parquet",
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+)
+
+# Statuses without a body worth compressing (or whose byte ranges refer to the identity body)
+PASSTHROUGH_STATUSES = (204, 206, 304)
+
+# Compress bodies at least this large on a worker thread instead of the event loop
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Content codings from an Accept-Encoding header, minus those refused with q=0."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush_mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if final:
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.process(data) + self._compressor.flush()
+
+
+class _Responder:
+    """
+    Wraps send for one response: holds the start message until the first body
+    chunk shows whether the response is worth compressing, then rewrites the
+    headers and encodes every chunk. encoding None only marks large bodies
+    with Vary.
+    """
+
+    def __init__(self, app, send, encoding: Optional[str], level: int, minimum_size: int):
+        self.app = app
+        self.send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start = None
+        self.started = False
+        self.passthrough = False
+        self.encoder = None
+
+    async def __call__(self, scope, receive):
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "").lower()
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in PASSTHROUGH_STATUSES
+                or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if self.passthrough or self.started:
+            if message_type == "http.response.body" and self.encoder is not None:
+                more_body = message.get("more_body", False)
+                message = {**message, "body": await self._encode(message.get("body", b""), final=not more_body)}
+            await self.send(message)
+            return
+
+        # First message after the start: decide, then send the held start
+        self.started = True
+        if message_type != "http.response.body":  # e.g. pathsend: the server streams the file itself
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not more_body and len(body) < self.minimum_size:
+            await self.send(self.start)
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is not None:
+            self.encoder = _BrotliEncoder(self.level) if self.encoding == "br" else _GzipEncoder(self.level)
+            body = await self._encode(body, final=not more_body)
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+        await self.send(self.start)
+        await self.send({**message, "body": body})
+
+    async def _encode(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await run_in_threadpool(self.encoder.compress, body, final)
+        return self.encoder.compress(body, final)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware negotiating br / gzip / identity from Accept-Encoding."""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if "br" in accepted:
+            encoding, level = "br", self.brotli_quality
+        elif "gzip" in accepted:
+            encoding, level = "gzip", self.gzip_level
+        else:
+            encoding, level = None, 0
+        await _Responder(self.app, send, encoding, level, self.minimum_size)(scope, receive)
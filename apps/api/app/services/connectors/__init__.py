@@ -3,6 +3,7 @@ from app.services.connectors.csv_importer import CSVImporter
 from app.services.connectors.trackman import TrackManConnector
 from app.services.connectors.topgolf import TopgolfConnector
 from app.services.connectors.foresight import ForesightConnector
+from app.services.connectors.ingest import bulk_insert_shots, save_normalized_session
 
 __all__ = [
     "BaseConnector",
@@ -12,4 +13,6 @@ __all__ = [
     "TrackManConnector",
     "TopgolfConnector",
     "ForesightConnector",
+    "bulk_insert_shots",
+    "save_normalized_session",
 ]
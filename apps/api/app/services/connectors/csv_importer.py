@@ -1,14 +1,48 @@
+import codecs
 import csv
 import io
 from datetime import datetime
-from typing import Optional
+from itertools import chain
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
 from uuid import UUID
 
 from sqlalchemy.orm import Session as DBSession
 
 from app.models.session import Session
-from app.models.shot import Shot
 from app.services.connectors.base import BaseConnector, NormalizedSession, NormalizedShot
+from app.services.connectors.ingest import DEFAULT_BATCH_SIZE, bulk_insert_shots
+from app.services.session_stats import build_computed_stats
+from app.services.shot_analysis import AnalysisAccumulator, ShotFrame
+from app.services.club_stats import add_session_club_stats
+from app.services.trends import record_session_snapshot
+
+
+class DecodedLineReader:
+    """
+    Iterate text lines from a binary file, reading and decoding it in chunks.
+    
+    Only one chunk plus a partial line is held at a time, so uploads of any
+    size can be fed to csv.reader without buffering the whole payload.
+    """
+    
+    def __init__(self, fileobj: BinaryIO, chunk_size: int = 64 * 1024, encoding: str = "utf-8-sig"):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.bytes_read = 0
+    
+    def __iter__(self) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        pending = ""
+        while chunk := self.fileobj.read(self.chunk_size):
+            self.bytes_read += len(chunk)
+            *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+            for line in lines:
+                yield line + "\n"
+        
+        tail = pending + decoder.decode(b"", final=True)
+        if tail:
+            yield tail
 
 
 class CSVImporter(BaseConnector):
@@ -61,18 +95,19 @@ class CSVImporter(BaseConnector):
     
     def extract_shots(self, data: str) -> list[NormalizedShot]:
         """Extract shots from CSV data."""
-        reader = csv.DictReader(io.StringIO(data))
+        return list(self.iter_shots(io.StringIO(data)))
+    
+    def iter_shots(self, lines: Iterable[str]) -> Iterator[NormalizedShot]:
+        """Lazily parse shots from an iterable of CSV lines."""
+        reader = csv.DictReader(lines)
         
         # Map header columns to our standard names
         column_map = self._build_column_map(reader.fieldnames or [])
         
-        shots = []
         for i, row in enumerate(reader, start=1):
             shot = self._parse_row(row, column_map, i)
             if shot:
-                shots.append(shot)
-        
-        return shots
+                yield shot
     
     def _build_column_map(self, headers: list[str]) -> dict[str, str]:
         """Build mapping from CSV headers to our standard field names."""
@@ -153,11 +188,34 @@ class CSVImporter(BaseConnector):
         db: DBSession,
     ) -> dict:
         """Import CSV content and create session with shots in database."""
+        return self.import_stream(
+            io.StringIO(csv_content),
+            user_id=user_id,
+            session_name=session_name,
+            session_type=session_type,
+            db=db,
+        )
+    
+    def import_stream(
+        self,
+        lines: Iterable[str],
+        user_id: UUID,
+        session_name: str,
+        session_type: str,
+        db: DBSession,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> dict:
+        """
+        Import CSV lines as a session, writing shots in bounded batches.
         
-        # Parse CSV
-        normalized = self.parse_raw(csv_content)
+        Stats are accumulated batch by batch, so memory use does not grow with
+        the number of rows. progress is called with the running shot count.
+        """
+        shots = self.iter_shots(lines)
+        first = next(shots, None)
         
-        if not normalized.shots:
+        if first is None:
             return {
                 "success": False,
                 "session_id": None,
@@ -166,46 +224,38 @@ class CSVImporter(BaseConnector):
                 "warnings": [],
             }
         
-        # Create session
         session = Session(
             user_id=user_id,
             source=self.source_name,
             session_type=session_type,
             name=session_name,
-            session_date=normalized.session_date,
-            raw_data=normalized.raw_data,
+            session_date=datetime.utcnow(),
         )
         db.add(session)
         db.flush()  # Get session ID
         
-        # Create shots
-        for ns in normalized.shots:
-            shot = Shot(
-                session_id=session.id,
-                shot_number=ns.shot_number,
-                club=ns.club,
-                carry_distance=ns.carry_distance,
-                total_distance=ns.total_distance,
-                ball_speed=ns.ball_speed,
-                club_speed=ns.club_speed,
-                smash_factor=ns.smash_factor,
-                launch_angle=ns.launch_angle,
-                spin_rate=ns.spin_rate,
-                spin_axis=ns.spin_axis,
-                face_angle=ns.face_angle,
-                face_to_path=ns.face_to_path,
-                attack_angle=ns.attack_angle,
-                offline_distance=ns.offline_distance,
-            )
-            db.add(shot)
+        stats = AnalysisAccumulator()
+        imported = 0
+        
+        def on_batch(batch: list[NormalizedShot]) -> None:
+            nonlocal imported
+            stats.add(ShotFrame.from_shots(batch))
+            imported += len(batch)
+            if progress:
+                progress(imported)
+        
+        bulk_insert_shots(db, session.id, chain([first], shots), batch_size, on_batch=on_batch)
         
+        session.raw_data = {"row_count": imported}
+        session.computed_stats = build_computed_stats(stats.result())
+        record_session_snapshot(session, stats, db)
+        add_session_club_stats(session, db)
         db.commit()
-        db.refresh(session)
         
         return {
             "success": True,
             "session_id": str(session.id),
-            "shots_imported": len(normalized.shots),
+            "shots_imported": imported,
             "errors": [],
             "warnings": [],
         }
@@ -0,0 +1,132 @@
+import csv
+import io
+import uuid
+from dataclasses import fields
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session as DBSession
+
+from app.models.session import Session
+from app.models.shot import Shot
+from app.services.connectors.base import NormalizedSession, NormalizedShot
+from app.services.session_stats import build_computed_stats
+from app.services.shot_analysis import AnalysisAccumulator, ShotFrame
+from app.services.club_stats import add_session_club_stats
+from app.services.trends import record_session_snapshot
+
+
+# Shot columns populated from NormalizedShot (field names match the model)
+SHOT_FIELDS = tuple(f.name for f in fields(NormalizedShot))
+SHOT_COLUMNS = ("id", "session_id", "created_at") + SHOT_FIELDS
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def batched(shots: Iterable[NormalizedShot], size: int) -> Iterator[list[NormalizedShot]]:
+    iterator = iter(shots)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _shot_rows(session_id: UUID, shots: list[NormalizedShot]) -> list[dict]:
+    created_at = datetime.utcnow()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "session_id": session_id,
+            "created_at": created_at,
+            **{name: getattr(ns, name) for name in SHOT_FIELDS},
+        }
+        for ns in shots
+    ]
+
+
+# PostgreSQL drivers with a COPY FROM STDIN API
+COPY_DRIVERS = ("psycopg2", "psycopg")
+
+
+def _copy_rows(db: DBSession, rows: list[dict]) -> None:
+    """Stream rows into shots with PostgreSQL COPY."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[c] is None else row[c] for c in SHOT_COLUMNS])
+    buffer.seek(0)
+    
+    statement = f"COPY shots ({', '.join(SHOT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(statement, buffer)
+        else:  # psycopg 3
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def bulk_insert_shots(
+    db: DBSession,
+    session_id: UUID,
+    shots: Iterable[NormalizedShot],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_batch: Optional[Callable[[list[NormalizedShot]], None]] = None,
+) -> int:
+    """
+    Insert shots for a session in batches, bypassing the ORM unit of work.
+    
+    Uses COPY on PostgreSQL and a single executemany INSERT per batch elsewhere.
+    Accepts any iterable so callers can stream shots without materializing them;
+    on_batch is called with each batch after it is written.
+    Returns the number of rows written; the caller commits.
+    """
+    use_copy = db.get_bind().dialect.driver in COPY_DRIVERS
+    written = 0
+    
+    for batch in batched(shots, batch_size):
+        rows = _shot_rows(session_id, batch)
+        if use_copy:
+            _copy_rows(db, rows)
+        else:
+            db.execute(insert(Shot), rows)
+        written += len(rows)
+        if on_batch:
+            on_batch(batch)
+    
+    return written
+
+
+def save_normalized_session(
+    normalized: NormalizedSession,
+    user_id: UUID,
+    db: DBSession,
+    name: Optional[str] = None,
+    session_type: Optional[str] = None,
+) -> Session:
+    """Persist a connector's NormalizedSession with its shots, cached stats and trend snapshot."""
+    stats = AnalysisAccumulator().add(ShotFrame.from_shots(normalized.shots))
+    session = Session(
+        user_id=user_id,
+        source=normalized.source,
+        session_type=session_type or normalized.session_type,
+        name=name or normalized.name,
+        notes=normalized.notes,
+        session_date=normalized.session_date,
+        raw_data=normalized.raw_data,
+        computed_stats=build_computed_stats(stats.result()),
+    )
+    db.add(session)
+    db.flush()  # Get session ID
+    
+    bulk_insert_shots(db, session.id, normalized.shots)
+    record_session_snapshot(session, stats, db)
+    add_session_club_stats(session, db)
+    
+    db.commit()
+    db.refresh(session)
+    
+    return session
@@ -0,0 +1,53 @@
+"""
+Conditional GET for data that rarely changes.
+
+Routes derive an ETag from a cheap version query (an updated_at timestamp,
+a row count) and answer a matching If-None-Match with an empty 304 before
+loading any rows. Cache-Control tells the client how long it may reuse its
+copy without asking.
+"""
+import hashlib
+
+from fastapi import Request, Response
+
+# Bump when response formats change, so clients don't revalidate old bodies
+ETAG_VERSION = 1
+
+# Per-user data that can change (shot edits, backfills): keep it, but revalidate every use
+PRIVATE_REVALIDATE = "private, no-cache"
+# Shared reference data: reuse for a few minutes, then revalidate
+PUBLIC_SHORT = "public, max-age=300"
+
+
+def make_etag(*parts) -> str:
+    """
+    A weak ETag for the given version parts. The tag names a version of the
+    data, not the bytes of one body: the same rows go out plain, gzip or
+    brotli encoded, so it can only promise semantic equivalence, and a 304
+    carries the same tag whichever encoding the 200 used. If-None-Match
+    compares weakly anyway, and nothing here serves ranges or If-Match.
+    """
+    raw = "|".join(str(part) for part in (ETAG_VERSION, *parts))
+    return 'W/"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in header.split(","))
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, cache_control)
+    return response
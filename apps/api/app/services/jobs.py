@@ -0,0 +1,470 @@
+"""
+Background job queue backed by the application database.
+
+Jobs are rows in the `jobs` table. A JobWorker claims queued rows with an
+atomic conditional UPDATE (plus SKIP LOCKED on PostgreSQL), so any number of
+API processes can share the queue without an external broker.
+
+While a job runs, its worker refreshes locked_at as a heartbeat. A job is
+reclaimed only when that heartbeat stops (the worker crashed or was killed),
+however long the job itself takes.
+
+CPU-bound job types run in a process pool and I/O-bound ones in threads.
+Uploads a job needs are stored in the database as well (job_upload_chunks),
+so a worker on any host can run any job. Between jobs the worker also runs
+periodic maintenance (peer percentile rebuilds).
+
+Run a standalone worker with: python -m app.services.jobs
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Callable, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal, engine
+from app.models.job import Job, JobUploadChunk
+from app.models.session import Session as SessionModel
+from app.services.coach_engine import CoachEngine
+from app.services.connectors.csv_importer import CSVImporter, DecodedLineReader
+from app.services.percentiles import refresh_percentiles_if_due
+
+settings = get_settings()
+
+# How often the worker checks whether periodic maintenance is due
+MAINTENANCE_CHECK_SECONDS = 600
+
+# Uploads are stored and read back in pieces of this size
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class PermanentJobError(Exception):
+    """Raised by handlers for failures that retrying cannot fix."""
+
+
+class JobProgress:
+    """
+    Publishes handler progress to the job row through its own connection.
+
+    Updates are throttled, and skipped on SQLite where the running import
+    holds the only write lock until it commits.
+    """
+
+    def __init__(self, job_id: UUID, min_interval: float = 1.0):
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self.enabled = engine.dialect.name != "sqlite"
+        self._last_update = 0.0
+
+    def update(self, fraction: float, **detail: Any) -> None:
+        now = time.monotonic()
+        if not self.enabled or now - self._last_update < self.min_interval:
+            return
+        self._last_update = now
+
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == self.job_id).update(
+                {"progress": min(fraction, 1.0), "progress_detail": detail},
+                synchronize_session=False,
+            )
+            db.commit()
+        except Exception as e:
+            print(f"Job progress update failed: {e}")
+        finally:
+            db.close()
+
+
+# ============ UPLOADS ============
+
+def store_upload(db: Session, src: BinaryIO) -> tuple[UUID, int]:
+    """
+    Copy an upload into job_upload_chunks; returns (upload_id, bytes stored).
+    
+    Not committed, so the chunks and the job that reads them (enqueue_job)
+    commit together.
+    """
+    upload_id = uuid4()
+    total_bytes = 0
+    seq = 0
+    # An empty upload still gets one (empty) chunk, so it can be told apart from a deleted one
+    chunk = src.read(UPLOAD_CHUNK_BYTES)
+    while True:
+        # Core inserts, so the ORM session doesn't keep every chunk in memory
+        db.execute(insert(JobUploadChunk).values(upload_id=upload_id, seq=seq, data=chunk))
+        total_bytes += len(chunk)
+        seq += 1
+        chunk = src.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+    return upload_id, total_bytes
+
+
+class UploadReader:
+    """Read-only binary file over a stored upload, holding one chunk at a time."""
+
+    def __init__(self, db: Session, upload_id: UUID):
+        self.db = db
+        self.upload_id = upload_id
+        self._seq = 0
+        self._chunk = b""
+        self._pos = 0
+
+    def _fetch(self, seq: int) -> Optional[bytes]:
+        return self.db.scalar(select(JobUploadChunk.data).where(
+            JobUploadChunk.upload_id == self.upload_id, JobUploadChunk.seq == seq
+        ))
+
+    def exists(self) -> bool:
+        return self._fetch(0) is not None
+
+    def read(self, size: int = -1) -> bytes:
+        """Up to size bytes (at most the rest of the current chunk); b"" at the end."""
+        while self._pos >= len(self._chunk):
+            chunk = self._fetch(self._seq)
+            if chunk is None:
+                return b""
+            self._chunk, self._pos = chunk, 0
+            self._seq += 1
+        end = len(self._chunk) if size < 0 else self._pos + size
+        data = self._chunk[self._pos:end]
+        self._pos += len(data)
+        return data
+
+
+def delete_upload(db: Session, upload_id: UUID) -> None:
+    db.query(JobUploadChunk).filter(JobUploadChunk.upload_id == upload_id).delete(synchronize_session=False)
+
+
+# ============ HANDLERS ============
+
+def run_csv_import(job: Job, db: Session, progress: JobProgress) -> dict:
+    payload = job.payload
+    upload = UploadReader(db, UUID(payload["upload_id"]))
+    if not upload.exists():
+        raise PermanentJobError("Uploaded file is no longer available")
+
+    total_bytes = payload.get("total_bytes") or 1
+    reader = DecodedLineReader(upload)
+    result = CSVImporter().import_stream(
+        reader,
+        user_id=job.user_id,
+        session_name=payload["session_name"],
+        session_type=payload["session_type"],
+        db=db,
+        progress=lambda shots: progress.update(
+            reader.bytes_read / total_bytes, shots_imported=shots
+        ),
+    )
+
+    if not result["success"]:
+        raise PermanentJobError("; ".join(result["errors"]))
+    return result
+
+
+def run_coach_report(job: Job, db: Session, progress: JobProgress) -> dict:
+    payload = job.payload
+    session = db.query(SessionModel).filter(
+        SessionModel.id == UUID(payload["session_id"]),
+        SessionModel.user_id == job.user_id,
+    ).first()
+    if not session:
+        raise PermanentJobError("Session not found")
+
+    report = CoachEngine().generate_report(
+        session=session,
+        user_id=job.user_id,
+        language=payload.get("language", "en"),
+        db=db,
+    )
+    return {"report_id": str(report.id)}
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    handler: Callable[[Job, Session, JobProgress], dict]
+    cpu_bound: bool  # run in the process pool rather than a thread
+
+
+JOB_HANDLERS: dict[str, JobSpec] = {
+    "csv_import": JobSpec(run_csv_import, cpu_bound=True),
+    "coach_report": JobSpec(run_coach_report, cpu_bound=False),
+}
+
+
+# ============ QUEUE ============
+
+def enqueue_job(
+    db: Session,
+    user_id: UUID,
+    job_type: str,
+    payload: dict[str, Any],
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """Add a job to the queue and wake the in-process worker, if any."""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    job = Job(
+        user_id=user_id,
+        job_type=job_type,
+        payload=payload,
+        max_attempts=max_attempts or settings.job_max_attempts,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    if _worker is not None:
+        _worker.wake()
+
+    return job
+
+
+def _claimable(now: datetime):
+    # A running job's locked_at is its last heartbeat
+    stale_before = now - timedelta(seconds=settings.job_timeout_seconds)
+    return or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.locked_at < stale_before),
+    )
+
+
+def claim_jobs(limit: int) -> list[tuple[UUID, str]]:
+    """Atomically mark up to `limit` runnable jobs as running and return them."""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        candidates = db.query(Job.id, Job.job_type).filter(
+            _claimable(now)
+        ).order_by(Job.created_at).limit(limit).with_for_update(skip_locked=True).all()
+
+        claimed = []
+        for job_id, job_type in candidates:
+            # Conditional update so two workers can never claim the same job
+            updated = db.query(Job).filter(Job.id == job_id, _claimable(now)).update(
+                {"status": "running", "locked_at": now, "attempts": Job.attempts + 1},
+                synchronize_session=False,
+            )
+            if updated:
+                claimed.append((job_id, job_type))
+
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def heartbeat_jobs(job_ids: list[UUID]) -> None:
+    """Refresh locked_at on jobs this worker is still running, so they aren't reclaimed."""
+    db = SessionLocal()
+    try:
+        db.query(Job).filter(Job.id.in_(job_ids), Job.status == "running").update(
+            {"locked_at": datetime.utcnow()}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(300, 5 * 2 ** (attempts - 1)))
+
+
+def _cleanup(job: Job, db: Session) -> None:
+    upload_id = (job.payload or {}).get("upload_id")
+    if upload_id:
+        delete_upload(db, UUID(upload_id))
+
+
+def execute_job(job_id: str) -> None:
+    """Run a claimed job and record its outcome. Safe to call in a child process."""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == UUID(job_id)).first()
+        if not job or job.status != "running":
+            return
+
+        try:
+            if job.attempts > job.max_attempts:
+                raise PermanentJobError("Job timed out")
+
+            result = JOB_HANDLERS[job.job_type].handler(job, db, JobProgress(job.id))
+            job.status = "succeeded"
+            job.result = result
+            job.error = None
+            job.progress = 1.0
+        except PermanentJobError as e:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)
+        except Exception as e:
+            db.rollback()
+            job.error = f"{type(e).__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.run_after = datetime.utcnow() + _retry_delay(job.attempts)
+            else:
+                job.status = "failed"
+
+        job.locked_at = None
+        if job.status in ("succeeded", "failed"):
+            job.finished_at = datetime.utcnow()
+            _cleanup(job, db)
+        db.commit()
+    finally:
+        db.close()
+
+
+# ============ WORKER ============
+
+def _init_worker_process() -> None:
+    # Drop pooled connections inherited from the parent process
+    engine.dispose(close=False)
+
+
+class JobWorker:
+    """Polls the queue and runs jobs with bounded concurrency."""
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._running: set[asyncio.Task] = set()
+        self._active_jobs: set[UUID] = set()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._maintenance: Optional[asyncio.Task] = None
+        self._next_maintenance = 0.0
+        self._next_heartbeat = 0.0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._maintenance:
+            await asyncio.gather(self._maintenance, return_exceptions=True)
+        if self._process_pool:
+            self._process_pool.shutdown(wait=True)
+
+    def wake(self) -> None:
+        """Thread-safe nudge to poll immediately (e.g. after enqueue)."""
+        if self._loop and self._wakeup and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                initializer=_init_worker_process,
+            )
+        return self._process_pool
+
+    async def _run(self) -> None:
+        while True:
+            free = self.concurrency - len(self._running)
+            if free > 0:
+                try:
+                    claimed = await asyncio.to_thread(claim_jobs, free)
+                except Exception as e:
+                    print(f"Job worker error: {e}")
+                    claimed = []
+
+                for job_id, job_type in claimed:
+                    task = asyncio.create_task(self._execute(job_id, job_type))
+                    self._running.add(task)
+                    task.add_done_callback(self._finished)
+
+            await self._heartbeat()
+            self._start_maintenance()
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _heartbeat(self) -> None:
+        if not self._active_jobs or time.monotonic() < self._next_heartbeat:
+            return
+        self._next_heartbeat = time.monotonic() + settings.job_heartbeat_seconds
+        try:
+            await asyncio.to_thread(heartbeat_jobs, list(self._active_jobs))
+        except Exception as e:
+            print(f"Job heartbeat failed: {e}")
+
+    def _start_maintenance(self) -> None:
+        """Kick off due maintenance in a thread, at most one run at a time."""
+        if not settings.percentile_refresh_hours or time.monotonic() < self._next_maintenance:
+            return
+        if self._maintenance and not self._maintenance.done():
+            return
+        self._next_maintenance = time.monotonic() + MAINTENANCE_CHECK_SECONDS
+        self._maintenance = asyncio.create_task(self._run_maintenance())
+
+    async def _run_maintenance(self) -> None:
+        try:
+            await asyncio.to_thread(refresh_percentiles_if_due)
+        except Exception as e:
+            print(f"Percentile refresh failed: {e}")
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _execute(self, job_id: UUID, job_type: str) -> None:
+        self._active_jobs.add(job_id)
+        try:
+            if JOB_HANDLERS[job_type].cpu_bound:
+                await self._loop.run_in_executor(self._get_process_pool(), execute_job, str(job_id))
+            else:
+                await asyncio.to_thread(execute_job, str(job_id))
+        except Exception as e:
+            # The job stays "running" and, without heartbeats, is reclaimed after job_timeout_seconds
+            print(f"Job {job_id} crashed: {e}")
+        finally:
+            self._active_jobs.discard(job_id)
+
+
+_worker: Optional[JobWorker] = None
+
+
+async def start_worker() -> JobWorker:
+    global _worker
+    _worker = JobWorker(settings.job_concurrency, settings.job_poll_interval)
+    await _worker.start()
+    return _worker
+
+
+async def stop_worker() -> None:
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+async def _run_forever() -> None:
+    await start_worker()
+    print(f"Job worker running (concurrency={settings.job_concurrency})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stop_worker()
+
+
+if __name__ == "__main__":
+    asyncio.run(_run_forever())
@@ -0,0 +1,283 @@
+"""
+Async LLM provider client for the coach chat.
+
+One pooled httpx.AsyncClient is shared by every request. Providers are
+hedged rather than tried serially: if the primary has not answered (or sent
+its first streamed token) within `llm_hedge_delay`, the next provider is
+started too and the first success wins. The whole call is bounded by
+`llm_timeout_budget`, after which callers fall back to rule-based replies.
+"""
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared, pooled HTTP client for all LLM providers."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    # Pooled connections belong to the loop that opened them
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client_loop = loop
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.llm_timeout_budget, connect=settings.llm_connect_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_connections,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class LLMUnavailable(Exception):
+    """Every provider failed or none is configured."""
+
+    def __init__(self, errors: list[BaseException]):
+        super().__init__(errors)
+        self.errors = errors  # empty when no provider is configured
+
+
+class LLMProvider(ABC):
+    """A chat completion API, called through the shared HTTP client."""
+
+    name: str = "unknown"
+
+    def __init__(self, api_key: str, base_url: str):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+
+    @abstractmethod
+    async def complete(self, system: str, messages: list[dict]) -> str:
+        """The whole reply."""
+        pass
+
+    @abstractmethod
+    def stream(self, system: str, messages: list[dict]) -> AsyncIterator[str]:
+        """The reply as text deltas (an async generator in subclasses)."""
+        pass
+
+    async def _sse_data(self, url: str, headers: dict, body: dict) -> AsyncIterator[dict]:
+        """POST a streaming request and yield each decoded SSE data payload."""
+        async with get_http_client().stream("POST", url, headers=headers, json=body) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                yield json.loads(data)
+
+
+class AnthropicProvider(LLMProvider):
+    name = "anthropic"
+    model = "claude-3-haiku-20240307"  # Fast and cost-effective
+
+    def _request(self, system: str, messages: list[dict], stream: bool) -> tuple[str, dict, dict]:
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json",
+        }
+        body = {
+            "model": self.model,
+            "max_tokens": 1024,
+            "system": system,
+            "messages": messages,
+            "stream": stream,
+        }
+        return f"{self.base_url}/v1/messages", headers, body
+
+    async def complete(self, system: str, messages: list[dict]) -> str:
+        url, headers, body = self._request(system, messages, stream=False)
+        response = await get_http_client().post(url, headers=headers, json=body)
+        response.raise_for_status()
+        return response.json()["content"][0]["text"]
+
+    async def stream(self, system: str, messages: list[dict]) -> AsyncIterator[str]:
+        url, headers, body = self._request(system, messages, stream=True)
+        async for event in self._sse_data(url, headers, body):
+            if event.get("type") == "content_block_delta":
+                text = event.get("delta", {}).get("text")
+                if text:
+                    yield text
+            elif event.get("type") == "message_stop":
+                return
+
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+    model = "gpt-4o-mini"
+
+    def _request(self, system: str, messages: list[dict], stream: bool) -> tuple[str, dict, dict]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        body = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system}] + messages,
+            "max_tokens": 1024,
+            "stream": stream,
+        }
+        return f"{self.base_url}/v1/chat/completions", headers, body
+
+    async def complete(self, system: str, messages: list[dict]) -> str:
+        url, headers, body = self._request(system, messages, stream=False)
+        response = await get_http_client().post(url, headers=headers, json=body)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, system: str, messages: list[dict]) -> AsyncIterator[str]:
+        url, headers, body = self._request(system, messages, stream=True)
+        async for event in self._sse_data(url, headers, body):
+            choices = event.get("choices") or [{}]
+            text = choices[0].get("delta", {}).get("content")
+            if text:
+                yield text
+
+
+def get_providers() -> list[LLMProvider]:
+    """Configured providers in preference order (Anthropic first, then OpenAI)."""
+    providers: list[LLMProvider] = []
+    anthropic_key = os.getenv("ANTHROPIC_API_KEY")
+    openai_key = os.getenv("OPENAI_API_KEY")
+    if anthropic_key:
+        providers.append(AnthropicProvider(anthropic_key, settings.anthropic_api_url))
+    if openai_key:
+        providers.append(OpenAIProvider(openai_key, settings.openai_api_url))
+    return providers
+
+
+async def _hedged(
+    calls: list[Callable[[], Awaitable[T]]],
+    hedge_delay: float,
+    discard: Optional[Callable[[T], Awaitable[None]]] = None,
+) -> T:
+    """
+    Run calls in order, starting the next one when the current leader fails or
+    has not finished within hedge_delay. Returns the first successful result.
+    """
+    remaining = list(calls)
+    pending: set[asyncio.Task] = set()
+    errors: list[BaseException] = []
+
+    def launch() -> None:
+        pending.add(asyncio.create_task(remaining.pop(0)()))
+
+    launch()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=hedge_delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                launch()  # Leader is slow: hedge with the next provider
+                continue
+
+            winner = None
+            for task in done:
+                pending.discard(task)
+                if task.exception() is not None:
+                    errors.append(task.exception())
+                    if remaining:
+                        launch()
+                elif winner is None:
+                    winner = task
+                elif discard:
+                    await discard(task.result())
+
+            if winner is not None:
+                return winner.result()
+
+        raise LLMUnavailable(errors)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def complete(system_for: Callable[[LLMProvider], str], messages: list[dict]) -> str:
+    """
+    Hedged completion across configured providers.
+
+    system_for builds the provider-specific system prompt. Raises
+    LLMUnavailable when no provider answers within the timeout budget.
+    """
+    providers = get_providers()
+    if not providers:
+        raise LLMUnavailable([])
+
+    calls = [
+        (lambda p=p: p.complete(system_for(p), messages))
+        for p in providers
+    ]
+    try:
+        return await asyncio.wait_for(
+            _hedged(calls, settings.llm_hedge_delay),
+            timeout=settings.llm_timeout_budget,
+        )
+    except asyncio.TimeoutError as e:
+        raise LLMUnavailable([e])
+
+
+async def stream(system_for: Callable[[LLMProvider], str], messages: list[dict]) -> AsyncIterator[str]:
+    """
+    Hedged token stream across configured providers.
+
+    Providers race to their first token; the winner streams the rest. Raises
+    LLMUnavailable before yielding anything if no provider starts in time.
+    """
+    providers = get_providers()
+    if not providers:
+        raise LLMUnavailable([])
+
+    async def first_token(p: LLMProvider):
+        tokens = p.stream(system_for(p), messages)
+        try:
+            return tokens, await tokens.__anext__()
+        except BaseException:
+            await tokens.aclose()
+            raise
+
+    async def discard(result) -> None:
+        await result[0].aclose()
+
+    calls = [(lambda p=p: first_token(p)) for p in providers]
+    try:
+        tokens, first = await asyncio.wait_for(
+            _hedged(calls, settings.llm_hedge_delay, discard),
+            timeout=settings.llm_timeout_budget,
+        )
+    except asyncio.TimeoutError as e:
+        raise LLMUnavailable([e])
+
+    try:
+        yield first
+        async for token in tokens:
+            yield token
+    finally:
+        await tokens.aclose()
@@ -0,0 +1,375 @@
+"""
+Per-request performance metrics.
+
+An ASGI middleware times every request and, through SQLAlchemy engine
+events, counts the queries it issues, their total time and the rows the
+driver reports. Everything is aggregated per route template in an
+in-process registry and exposed in the Prometheus text format at /metrics,
+along with connection pool waits and occupancy. Each worker process keeps
+its own counters, so scrape every worker.
+
+Route labels and cache counters say a fair amount about the deployment, so
+/metrics only answers scrapers presenting metrics_token or connecting from
+metrics_allowed_ips, and is a 404 until one of them is configured.
+
+Requests that are slow or issue many queries (the usual N+1 signature) are
+logged to strikelab.slow_requests with their slowest and most repeated
+statements.
+"""
+import bisect
+import ipaddress
+import logging
+import secrets
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Its own logger, so the slow request log can be routed or silenced on its own
+slow_request_log = logging.getLogger("strikelab.slow_requests")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+UNMATCHED_ROUTE = "unmatched"  # 404s and the like, so unknown paths can't blow up label cardinality
+
+_QUERY_START = "metrics_query_start"
+
+
+class _Metric:
+    def __init__(self, name: str, kind: str, help_text: str, labels: tuple[str, ...]):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _label_text(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{v}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class CounterMetric(_Metric):
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...]):
+        super().__init__(name, "counter", help_text, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{self._label_text(k)} {v}" for k, v in sorted(self._values.items())]
+
+
+class GaugeMetric(_Metric):
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, "gauge", help_text, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: tuple = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{self._label_text(k)} {v}" for k, v in sorted(self._values.items())]
+
+
+class HistogramMetric(_Metric):
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        super().__init__(name, "histogram", help_text, labels)
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = self._values.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{self._label_text(labels, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{self._label_text(labels)} {series[-2]}")
+                lines.append(f"{self.name}_count{self._label_text(labels)} {series[-1]}")
+        return lines
+
+
+REQUEST_DURATION = HistogramMetric(
+    "strikelab_http_request_duration_seconds", "Request latency",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = HistogramMetric(
+    "strikelab_http_request_db_queries", "Database queries issued per request",
+    ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+DB_SECONDS = CounterMetric(
+    "strikelab_db_query_seconds_total", "Time spent in database queries", ("method", "route"),
+)
+DB_ROWS = CounterMetric(
+    "strikelab_db_rows_total", "Rows returned or affected, as reported by the driver", ("method", "route"),
+)
+RESPONSE_BYTES = CounterMetric(
+    "strikelab_http_response_bytes_total", "Response body bytes sent", ("method", "route"),
+)
+
+POOL_WAIT = HistogramMetric(
+    "strikelab_db_pool_checkout_seconds", "Time spent waiting for a pooled database connection",
+    ("pool",), LATENCY_BUCKETS,
+)
+POOL_IN_USE = GaugeMetric(
+    "strikelab_db_pool_connections_in_use", "Connections checked out of the pool", ("pool",),
+)
+POOL_SATURATION = GaugeMetric(
+    "strikelab_db_pool_saturation", "Checked-out connections over pool_size + max_overflow", ("pool",),
+)
+POOL_TIMEOUTS = CounterMetric(
+    "strikelab_db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", ("pool",),
+)
+
+METRICS: list[_Metric] = [
+    REQUEST_DURATION, REQUEST_QUERIES, DB_SECONDS, DB_ROWS, RESPONSE_BYTES,
+    POOL_WAIT, POOL_IN_USE, POOL_SATURATION, POOL_TIMEOUTS,
+]
+
+
+def register(metric: _Metric) -> _Metric:
+    """Add a metric from another module to the /metrics output."""
+    METRICS.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache()
+def _allowed_networks() -> tuple:
+    return tuple(ipaddress.ip_network(ip, strict=False) for ip in settings.metrics_allowed_ips_list)
+
+
+def _client_allowed(host: Optional[str]) -> bool:
+    try:
+        address = ipaddress.ip_address(host or "")
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks())
+
+
+def require_scrape_access(request: Request) -> None:
+    """Dependency for /metrics: the configured bearer token or an allowed client address."""
+    if not settings.metrics_token and not settings.metrics_allowed_ips_list:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if request.client is not None and _client_allowed(request.client.host):
+        return
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if (
+        settings.metrics_token
+        and scheme.lower() == "bearer"
+        and secrets.compare_digest(token.encode(), settings.metrics_token.encode())
+    ):
+        return
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+class RequestStats:
+    """Database activity of one request, filled in by the engine event hooks."""
+
+    def __init__(self):
+        self.queries: list[tuple[str, float]] = []
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+# Mutated in place, so queries run in the threadpool (which copies the context) still land here
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info[_QUERY_START] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[_QUERY_START]
+    stats = _current.get()
+    if stats is None:  # job worker, CLI or startup queries
+        return
+    stats.queries.append((statement, elapsed))
+    stats.db_seconds += elapsed
+    stats.rows += max(cursor.rowcount, 0)
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class _MeteredPool:
+    """Mixin for QueuePool classes that records checkout waits and occupancy."""
+    metrics_name = "default"
+
+    def _do_get(self):
+        labels = (self.metrics_name,)
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(labels)
+            raise
+        finally:
+            POOL_WAIT.observe(labels, time.perf_counter() - start)
+        self._record_usage()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._record_usage()
+
+    def _record_usage(self) -> None:
+        labels = (self.metrics_name,)
+        in_use = self.checkedout()
+        POOL_IN_USE.set(labels, in_use)
+        POOL_SATURATION.set(labels, in_use / max(self.size() + max(self._max_overflow, 0), 1))
+
+
+def metered_pool(base: type[QueuePool], name: str) -> type[QueuePool]:
+    """A subclass of a QueuePool class reporting under the given pool label; pass as poolclass."""
+    return type(f"Metered{base.__name__}", (_MeteredPool, base), {"metrics_name": name})
+
+
+def _router_prefix(route, scope) -> str:
+    """
+    The include_router prefix in front of a matched route. scope["route"] is the
+    route as declared on its APIRouter, without the prefix, so the prefix is the
+    part of the request path before the suffix the route's own regex matches.
+    The match must give the same parameters routing resolved, so a literal
+    segment that equals a parameter value can't shift it.
+    """
+    path = scope["path"]
+    params = scope.get("path_params", {})
+    starts = [i for i, char in enumerate(path) if char == "/"] + [len(path)]
+    for start in starts:
+        match = route.path_regex.match(path[start:])
+        if match and all(
+            route.param_convertors[name].convert(value) == params.get(name)
+            for name, value in match.groupdict().items()
+        ):
+            return path[:start]
+    return ""
+
+
+def route_template(scope) -> str:
+    """The matched route's path with parameters as placeholders, e.g. /sessions/{session_id}/shots."""
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_regex"):
+        return UNMATCHED_ROUTE
+    # path_format drops converters ({path:path} -> {path})
+    return _router_prefix(route, scope) + route.path_format
+
+
+def _log_request(method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+    top = settings.slow_request_top_queries
+    lines = [
+        f"Slow request {method} {route} -> {status} in {elapsed * 1000:.0f}ms: "
+        f"{len(stats.queries)} queries, {stats.db_seconds * 1000:.0f}ms in database, {stats.rows} rows"
+    ]
+    for statement, seconds in sorted(stats.queries, key=lambda q: -q[1])[:top]:
+        lines.append(f"    {seconds * 1000:7.1f}ms  {' '.join(statement.split())[:200]}")
+    for statement, count in Counter(s for s, _ in stats.queries).most_common(top):
+        if count > 1:
+            lines.append(f"    repeated {count}x  {' '.join(statement.split())[:200]}")
+    # One record, so filtering the logger drops the statement lines with it
+    slow_request_log.warning("\n".join(lines))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are timed to their last byte."""
+
+    def __init__(self, app, skip_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        body_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+
+            route = route_template(scope)
+            labels = (scope["method"], route)
+            REQUEST_DURATION.observe(labels + (str(status),), elapsed)
+            REQUEST_QUERIES.observe(labels, len(stats.queries))
+            DB_SECONDS.inc(labels, stats.db_seconds)
+            DB_ROWS.inc(labels, stats.rows)
+            RESPONSE_BYTES.inc(labels, body_bytes)
+
+            if (
+                elapsed * 1000 >= settings.slow_request_ms
+                or len(stats.queries) >= settings.slow_request_queries
+            ):
+                _log_request(scope["method"], route, status, elapsed, stats)
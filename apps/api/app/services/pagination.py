@@ -0,0 +1,155 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are ordered by a sort column plus the primary key as tie-breaker and
+continue from the last row seen, so page N costs the same index range scan as
+page 1. Cursors are opaque URL-safe strings encoding that last (value, id).
+
+The helpers take a legacy Query on a sync Session; the *_async variants take
+a select() and run it on an AsyncSession.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Literal, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+# How list endpoints report totals: skip, exact COUNT, or planner estimate
+TotalMode = Literal["none", "exact", "estimate"]
+
+
+def encode_cursor(value: Any, row_id: UUID) -> str:
+    if isinstance(value, datetime):
+        payload = ["dt", value.isoformat(), str(row_id)]
+    else:
+        payload = ["n", value, str(row_id)]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        kind, value, row_id = json.loads(raw)
+        if kind == "dt":
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return value, UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_query(
+    query: Query | Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Query | Select:
+    """Seek past the cursor and fetch limit + 1 rows (the extra row signals another page)."""
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        key = tuple_(sort_column, id_column)
+        query = query.filter(key < (value, last_id) if descending else key > (value, last_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+
+    return query.limit(limit + 1)
+
+
+def keyset_page(
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> tuple[list, Optional[str]]:
+    """Return one page of query results and the cursor for the next page (None at the end)."""
+    rows = keyset_query(query, sort_column, id_column, cursor, limit, descending).all()
+    return _split_page(rows, sort_column, id_column, limit)
+
+
+async def keyset_rows_async(
+    db: AsyncSession,
+    statement: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> tuple[list, Optional[str]]:
+    """keyset_page for a select() of columns on an AsyncSession; returns Rows. Must select both key columns."""
+    result = await db.execute(keyset_query(statement, sort_column, id_column, cursor, limit, descending))
+    return _split_page(result.all(), sort_column, id_column, limit)
+
+
+def _split_page(rows: list, sort_column, id_column, limit: int) -> tuple[list, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def count_rows(query: Query, mode: TotalMode) -> Optional[int]:
+    """
+    Total rows matched by a query.
+
+    "estimate" reads the PostgreSQL planner's row estimate instead of counting,
+    which is constant time but approximate; other databases count exactly.
+    """
+    if mode == "none":
+        return None
+
+    query = query.order_by(None)
+    bind = query.session.get_bind()
+    if mode == "estimate" and bind.dialect.name == "postgresql":
+        plan = query.session.connection().exec_driver_sql(_explain_sql(query.statement, bind.dialect)).scalar()
+        return _planner_rows(plan)
+
+    return query.count()
+
+
+async def count_rows_async(db: AsyncSession, statement: Select, mode: TotalMode) -> Optional[int]:
+    """count_rows for a select() on an AsyncSession."""
+    if mode == "none":
+        return None
+
+    statement = statement.order_by(None)
+    dialect = db.bind.dialect
+    if mode == "estimate" and dialect.name == "postgresql":
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(_explain_sql(statement, dialect))
+        return _planner_rows(result.scalar())
+
+    return await db.scalar(select(func.count()).select_from(statement.subquery()))
+
+
+def _explain_sql(statement, dialect) -> str:
+    compiled = statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    return "EXPLAIN (FORMAT JSON) " + compiled.string
+
+
+def _planner_rows(plan) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int]) -> None:
+    """Pagination metadata for endpoints whose body is a bare list."""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
@@ -0,0 +1,219 @@
+"""
+Peer percentiles for ClubStats.
+
+A periodic batch job condenses every player's per-club averages into
+PercentileSketch rows: 101 quantiles per handicap band, club and metric.
+A percentile lookup is then a binary search over those quantiles, whatever
+the number of players. All ClubStats rows are restamped after each rebuild,
+and a single row is restamped whenever an import or edit updates it.
+
+Rebuild now with: python -m app.services.percentiles
+"""
+import bisect
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import numpy as np
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.equipment import ClubStats, PercentileSketch
+from app.models.user import User
+
+settings = get_settings()
+
+# Upper bounds of each handicap band; plus handicaps (< 0) get their own band
+HANDICAP_BOUNDARIES = [0, 5, 10, 15, 20, 28]
+HANDICAP_BANDS = ["plus", "0-5", "5-10", "10-15", "15-20", "20-28", "28+"]
+ALL_BAND = "all"  # every player; used when a band is too small or the handicap is unknown
+
+MIN_SHOTS = 20  # club averages over fewer shots are too noisy to rank
+MIN_PEERS = 20  # fewer players than this and a band gets no sketch
+
+QUANTILE_POINTS = np.linspace(0.0, 1.0, 101)
+
+# Sketch metric -> ClubStats column. Accuracy ranks a tighter dispersion higher.
+SKETCH_METRICS = {
+    "distance": "avg_carry",
+    "accuracy": "dispersion_radius",
+}
+
+_UPDATE_BATCH = 5000
+
+# pg_try_advisory_xact_lock key so only one process rebuilds at a time
+_REBUILD_LOCK_KEY = 0x5354524B
+
+
+def handicap_band(handicap: Optional[float]) -> Optional[str]:
+    if handicap is None:
+        return None
+    return HANDICAP_BANDS[bisect.bisect_right(HANDICAP_BOUNDARIES, handicap)]
+
+
+class SketchSet:
+    """In-memory sketches keyed by (band, club, metric)."""
+
+    def __init__(self, sketches: dict[tuple[str, str, str], list[float]]):
+        self.sketches = sketches
+
+    def percentile(self, band: Optional[str], club_label: str, metric: str, value: Optional[float]) -> Optional[int]:
+        if value is None:
+            return None
+        quantiles = self.sketches.get((band, club_label, metric)) or self.sketches.get((ALL_BAND, club_label, metric))
+        if not quantiles:
+            return None
+
+        # Midpoint of the tied range, so a value equal to the median is the 50th
+        rank = (bisect.bisect_left(quantiles, value) + bisect.bisect_right(quantiles, value)) / (2 * len(quantiles))
+        percentile = round(rank * 100)
+        return 100 - percentile if metric == "accuracy" else percentile
+
+    def percentiles(
+        self,
+        club_label: str,
+        handicap: Optional[float],
+        total_shots: Optional[int],
+        values: dict[str, Any],
+    ) -> dict[str, Optional[int]]:
+        """distance_percentile/accuracy_percentile for one player's club averages."""
+        if (total_shots or 0) < MIN_SHOTS:
+            return {"distance_percentile": None, "accuracy_percentile": None}
+        band = handicap_band(handicap)
+        return {
+            f"{metric}_percentile": self.percentile(band, club_label, metric, values.get(column))
+            for metric, column in SKETCH_METRICS.items()
+        }
+
+    def stamp(self, stats: ClubStats, handicap: Optional[float]) -> None:
+        values = {column: getattr(stats, column) for column in SKETCH_METRICS.values()}
+        for field, percentile in self.percentiles(stats.club_label, handicap, stats.total_shots, values).items():
+            setattr(stats, field, percentile)
+
+
+_cached: Optional[SketchSet] = None
+_loaded_at = 0.0
+
+
+def get_sketches(db: Session) -> SketchSet:
+    """Current sketches, reloaded from the database every percentile_cache_seconds."""
+    global _cached, _loaded_at
+    now = time.monotonic()
+    if _cached is None or now - _loaded_at > settings.percentile_cache_seconds:
+        rows = db.query(
+            PercentileSketch.handicap_band,
+            PercentileSketch.club_label,
+            PercentileSketch.metric,
+            PercentileSketch.quantiles,
+        ).all()
+        _cached = SketchSet({(band, club, metric): quantiles for band, club, metric, quantiles in rows})
+        _loaded_at = now
+    return _cached
+
+
+def build_sketches(rows) -> dict[tuple[str, str, str], tuple[list[float], int]]:
+    """(quantiles, sample count) per (band, club, metric) from ClubStats rows with the player's handicap_index."""
+    samples: dict[tuple[str, str, str], list[float]] = defaultdict(list)
+    for row in rows:
+        bands = [ALL_BAND]
+        band = handicap_band(row.handicap_index)
+        if band:
+            bands.append(band)
+        for metric, column in SKETCH_METRICS.items():
+            value = getattr(row, column)
+            if value is None:
+                continue
+            for b in bands:
+                samples[(b, row.club_label, metric)].append(value)
+
+    return {
+        key: (np.quantile(np.asarray(values), QUANTILE_POINTS).tolist(), len(values))
+        for key, values in samples.items()
+        if len(values) >= MIN_PEERS
+    }
+
+
+def rebuild_percentiles(db: Session) -> Optional[dict[str, int]]:
+    """Rebuild all sketches and restamp every ClubStats row; None if another process is already at it."""
+    global _cached, _loaded_at
+    if db.get_bind().dialect.name == "postgresql":
+        locked = db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _REBUILD_LOCK_KEY}).scalar()
+        if not locked:
+            return None
+
+    rows = db.query(
+        ClubStats.id,
+        ClubStats.club_label,
+        ClubStats.total_shots,
+        User.handicap_index,
+        *(getattr(ClubStats, column) for column in SKETCH_METRICS.values()),
+    ).join(User, User.id == ClubStats.user_id).all()
+
+    eligible = [row for row in rows if (row.total_shots or 0) >= MIN_SHOTS]
+    sketches = build_sketches(eligible)
+    built_at = datetime.utcnow()
+
+    db.query(PercentileSketch).delete(synchronize_session=False)
+    db.add_all([
+        PercentileSketch(
+            handicap_band=band,
+            club_label=club,
+            metric=metric,
+            quantiles=quantiles,
+            sample_count=sample_count,
+            built_at=built_at,
+        )
+        for (band, club, metric), (quantiles, sample_count) in sketches.items()
+    ])
+
+    sketch_set = SketchSet({key: quantiles for key, (quantiles, _) in sketches.items()})
+    stamped = [
+        {
+            "id": row.id,
+            **sketch_set.percentiles(row.club_label, row.handicap_index, row.total_shots, row._asdict()),
+        }
+        for row in rows
+    ]
+    for i in range(0, len(stamped), _UPDATE_BATCH):
+        # ORM bulk UPDATE by primary key
+        db.execute(update(ClubStats), stamped[i:i + _UPDATE_BATCH])
+    db.commit()
+
+    _cached, _loaded_at = sketch_set, time.monotonic()
+    return {"sketches": len(sketches), "club_stats": len(stamped)}
+
+
+def percentiles_due(db: Session) -> bool:
+    built_at = db.query(func.max(PercentileSketch.built_at)).scalar()
+    return built_at is None or built_at < datetime.utcnow() - timedelta(hours=settings.percentile_refresh_hours)
+
+
+def refresh_percentiles_if_due() -> None:
+    """Periodic entry point for the job worker."""
+    db = SessionLocal()
+    try:
+        if percentiles_due(db):
+            result = rebuild_percentiles(db)
+            if result:
+                print(f"Rebuilt {result['sketches']} percentile sketches for {result['club_stats']} club stats")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        result = rebuild_percentiles(db)
+        if result is None:
+            print("Another process is rebuilding percentiles")
+        else:
+            print(
+                f"Rebuilt {result['sketches']} percentile sketches for {result['club_stats']} "
+                f"club stats in {time.perf_counter() - start:.1f}s"
+            )
+    finally:
+        db.close()
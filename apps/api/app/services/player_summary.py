@@ -0,0 +1,85 @@
+"""
+Player summaries for friend comparison and leaderboards.
+
+Summaries are read from the precomputed rollups - the latest monthly
+MetricSnapshot and the Driver / 7 Iron ClubStats rows - so comparing or
+ranking any number of players is one query, whatever their shot history.
+"""
+from typing import Any, Literal, Union
+from uuid import UUID
+
+from sqlalchemy import Select, and_, func
+from sqlalchemy.orm import Session, aliased
+
+from app.models.equipment import ClubStats
+from app.models.training import MetricSnapshot
+from app.models.user import User
+
+SUMMARY_PERIOD = "monthly"
+
+# Summary field -> club label (as normalised by the connectors)
+SUMMARY_CLUBS = {
+    "driver_carry": "Driver",
+    "seven_iron_carry": "7 Iron",
+}
+
+# Leaderboard sort keys; handicap ranks low to high, everything else high to low
+LeaderboardMetric = Literal["strike_score", "overall_score", "driver_carry", "seven_iron_carry", "handicap"]
+
+
+def summary_query(db: Session, user_ids: Union[list[UUID], Select]):
+    """Users with their latest rollup scores and key club carries (None where not recorded yet)."""
+    latest = db.query(
+        MetricSnapshot.user_id,
+        func.max(MetricSnapshot.snapshot_date).label("snapshot_date"),
+    ).filter(
+        MetricSnapshot.snapshot_type == SUMMARY_PERIOD,
+        MetricSnapshot.user_id.in_(user_ids),
+    ).group_by(MetricSnapshot.user_id).subquery()
+
+    clubs = {name: aliased(ClubStats) for name in SUMMARY_CLUBS}
+
+    query = db.query(
+        User.id,
+        User.display_name,
+        User.handicap_index.label("handicap"),
+        MetricSnapshot.snapshot_date.label("metrics_month"),
+        MetricSnapshot.strike_score,
+        MetricSnapshot.overall_score,
+        *(stats.avg_carry.label(name) for name, stats in clubs.items()),
+    ).outerjoin(
+        latest, latest.c.user_id == User.id
+    ).outerjoin(MetricSnapshot, and_(
+        MetricSnapshot.user_id == User.id,
+        MetricSnapshot.snapshot_type == SUMMARY_PERIOD,
+        MetricSnapshot.snapshot_date == latest.c.snapshot_date,
+    ))
+    for name, stats in clubs.items():
+        query = query.outerjoin(stats, and_(
+            stats.user_id == User.id,
+            stats.club_label == SUMMARY_CLUBS[name],
+        ))
+
+    return query.filter(User.id.in_(user_ids))
+
+
+def get_summaries(db: Session, user_ids: list[UUID]) -> dict[UUID, dict[str, Any]]:
+    return {row.id: row._asdict() for row in summary_query(db, user_ids)}
+
+
+def rank_summaries(summaries: list[dict[str, Any]], metric: LeaderboardMetric) -> list[dict[str, Any]]:
+    """Sort by metric (players without it last) and assign competition ranks (1, 2, 2, 4)."""
+    ascending = metric == "handicap"
+    recorded = sorted(
+        (s for s in summaries if s[metric] is not None),
+        key=lambda s: s[metric],
+        reverse=not ascending,
+    )
+    unrecorded = sorted((s for s in summaries if s[metric] is None), key=lambda s: s["display_name"])
+
+    ranked = []
+    for position, summary in enumerate(recorded, start=1):
+        tied = ranked and ranked[-1][metric] == summary[metric]
+        ranked.append({**summary, "rank": ranked[-1]["rank"] if tied else position})
+    ranked += [{**summary, "rank": None} for summary in unrecorded]
+    return ranked
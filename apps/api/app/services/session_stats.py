@@ -0,0 +1,59 @@
+from typing import Optional, Any
+
+from sqlalchemy.orm import Session
+
+from app.models.session import Session as SessionModel
+from app.models.shot import Shot
+from app.services.shot_analysis import AnalysisAccumulator, ShotFrame
+from app.services.trends import record_session_snapshot
+
+
+# Bump when the analysis output or scoring changes so cached stats are recomputed
+STATS_VERSION = 1
+
+# Keys stored in Session.computed_stats that are not part of the report analysis
+_SUMMARY_ONLY_KEYS = ("stats_version", "avg_carry")
+
+
+def build_computed_stats(analysis: dict[str, Any]) -> dict[str, Any]:
+    """Turn a session analysis into the cached Session.computed_stats shape."""
+    club_metrics = analysis.get("club_metrics", {})
+    return {
+        **analysis,
+        "shot_count": analysis.get("shot_count", 0),
+        "avg_carry": {
+            club: metrics["avg_carry"]
+            for club, metrics in club_metrics.items()
+            if metrics.get("avg_carry") is not None
+        },
+        "stats_version": STATS_VERSION,
+    }
+
+
+def analysis_from_stats(stats: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """Recover the report analysis from cached stats, or None if missing or stale."""
+    if not stats or stats.get("stats_version") != STATS_VERSION:
+        return None
+    
+    analysis = {k: v for k, v in stats.items() if k not in _SUMMARY_ONLY_KEYS}
+    if analysis == {"shot_count": 0}:
+        return {}
+    return analysis
+
+
+def refresh_session_stats(session: SessionModel, db: Session) -> dict[str, Any]:
+    """Recompute a session's stats and trend snapshot from its shots (caller commits)."""
+    rows = db.query(*ShotFrame.COLUMNS).filter(Shot.session_id == session.id).all()
+    stats = AnalysisAccumulator().add(ShotFrame.from_rows(rows))
+    analysis = stats.result()
+    session.computed_stats = build_computed_stats(analysis)
+    record_session_snapshot(session, stats, db)
+    return analysis
+
+
+def get_session_analysis(session: SessionModel, db: Session) -> dict[str, Any]:
+    """Return the session analysis, reading shots only when the cache is missing or stale."""
+    cached = analysis_from_stats(session.computed_stats)
+    if cached is not None:
+        return cached
+    return refresh_session_stats(session, db)
@@ -0,0 +1,278 @@
+from typing import Optional, Any, Iterable, Sequence
+
+import numpy as np
+
+from app.models.shot import Shot
+
+
+# Metrics aggregated per club, in column order of the analysis matrix
+ANALYSIS_METRICS = (
+    "carry_distance",
+    "smash_factor",
+    "face_to_path",
+    "spin_axis",
+    "offline_distance",
+)
+
+_CARRY, _SMASH, _FACE_TO_PATH, _SPIN_AXIS, _OFFLINE = range(len(ANALYSIS_METRICS))
+
+
+def score_strike(avg_smash: Optional[float]) -> float:
+    if avg_smash is None:
+        return 70.0
+    # Baseline: 1.45 = 100, 1.35 = 70
+    return min(100, max(0, 70 + (avg_smash - 1.35) * 300))
+
+
+def score_face_control(avg_abs_face_to_path: Optional[float]) -> float:
+    if avg_abs_face_to_path is None:
+        return 70.0
+    # Lower is better: 0° = 100, 4° = 60
+    return min(100, max(0, 100 - avg_abs_face_to_path * 10))
+
+
+def score_distance_control(avg_carry_std: Optional[float]) -> float:
+    if avg_carry_std is None:
+        return 70.0
+    # Lower std is better: 0m = 100, 10m = 60
+    return min(100, max(0, 100 - avg_carry_std * 4))
+
+
+def score_dispersion(avg_offline_std: Optional[float]) -> float:
+    if avg_offline_std is None:
+        return 70.0
+    # Lower is better: 0m = 100, 15m = 60
+    return min(100, max(0, 100 - avg_offline_std * 2.67))
+
+
+class ShotFrame:
+    """
+    Columnar view of a set of shots.
+
+    Metrics are stored as contiguous float64 arrays (NaN for missing) so
+    per-club aggregates can be computed without walking ORM objects.
+    """
+
+    # Columns to select when loading a frame straight from the database
+    COLUMNS = (Shot.club, Shot.is_mishit) + tuple(getattr(Shot, m) for m in ANALYSIS_METRICS)
+
+    def __init__(self, clubs: np.ndarray, is_mishit: np.ndarray, values: np.ndarray):
+        self.clubs = clubs
+        self.is_mishit = is_mishit
+        self.values = values  # shape (n_shots, len(ANALYSIS_METRICS))
+
+    def __len__(self) -> int:
+        return len(self.clubs)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]]) -> "ShotFrame":
+        """Build a frame from (club, is_mishit, *ANALYSIS_METRICS) tuples."""
+        if not rows:
+            return cls(
+                np.empty(0, dtype=object),
+                np.empty(0, dtype=bool),
+                np.empty((0, len(ANALYSIS_METRICS)), dtype=np.float64),
+            )
+        columns = list(zip(*rows))
+        clubs = np.array(columns[0], dtype=object)
+        is_mishit = np.array([bool(m) for m in columns[1]], dtype=bool)
+        values = np.array(columns[2:], dtype=np.float64).T
+        return cls(clubs, is_mishit, np.ascontiguousarray(values))
+
+    @classmethod
+    def from_shots(cls, shots: Iterable[Any]) -> "ShotFrame":
+        """Build a frame from Shot objects or anything shaped like them (e.g. NormalizedShot)."""
+        return cls.from_rows([
+            (s.club, s.is_mishit) + tuple(getattr(s, m) for m in ANALYSIS_METRICS)
+            for s in shots
+        ])
+
+
+def _mean_or_none(total: float, count: int) -> Optional[float]:
+    return float(total / count) if count else None
+
+
+class AnalysisAccumulator:
+    """
+    Mergeable per-club sufficient statistics (count, mean, M2) behind analyze_frame.
+
+    Frames can be added batch by batch, so a session of any size can be analysed
+    in bounded memory and still produce the same result as a single pass.
+    """
+
+    def __init__(self):
+        width = len(ANALYSIS_METRICS)
+        self.shot_count = 0
+        self.valid_count = 0
+        self.club_index: dict[str, int] = {}  # insertion order = first appearance
+        self.club_shots = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros((0, width), dtype=np.int64)
+        self.means = np.zeros((0, width), dtype=np.float64)
+        self.m2 = np.zeros((0, width), dtype=np.float64)
+        self.abs_sums = np.zeros((0, width), dtype=np.float64)
+
+    def _grow(self, clubs: list[str]) -> np.ndarray:
+        """Register new clubs and return the accumulator row for each given club."""
+        for club in clubs:
+            if club not in self.club_index:
+                self.club_index[club] = len(self.club_index)
+        extra = len(self.club_index) - len(self.club_shots)
+        if extra:
+            width = len(ANALYSIS_METRICS)
+            self.club_shots = np.r_[self.club_shots, np.zeros(extra, dtype=np.int64)]
+            self.counts = np.vstack([self.counts, np.zeros((extra, width), dtype=np.int64)])
+            self.means = np.vstack([self.means, np.zeros((extra, width))])
+            self.m2 = np.vstack([self.m2, np.zeros((extra, width))])
+            self.abs_sums = np.vstack([self.abs_sums, np.zeros((extra, width))])
+        return np.array([self.club_index[c] for c in clubs], dtype=np.int64)
+
+    def add(self, frame: ShotFrame) -> "AnalysisAccumulator":
+        self.shot_count += len(frame)
+        valid = ~frame.is_mishit
+        valid_count = int(valid.sum())
+        if not valid_count:
+            return self
+        self.valid_count += valid_count
+
+        clubs = frame.clubs[valid]
+        values = frame.values[valid]
+
+        # Group by club, ordering groups by first appearance
+        uniques, first_index, inverse = np.unique(clubs, return_index=True, return_inverse=True)
+        group_order = np.argsort(first_index)
+        rank = np.empty_like(group_order)
+        rank[group_order] = np.arange(len(group_order))
+        group = rank[inverse]
+        rows = self._grow([str(c) for c in uniques[group_order]])
+
+        # Sort rows by group so every aggregate is a single reduceat over the matrix
+        order = np.argsort(group, kind="stable")
+        group = group[order]
+        values = values[order]
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+
+        # Zero readings count as missing, as in the original per-shot analysis
+        present = ~np.isnan(values) & (values != 0)
+        filled = np.where(present, values, 0.0)
+
+        counts = np.add.reduceat(present, starts, axis=0).astype(np.int64)
+        sums = np.add.reduceat(filled, starts, axis=0)
+        abs_sums = np.add.reduceat(np.abs(filled), starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, 0.0)
+        deviations = np.where(present, values - means[group], 0.0)
+        m2 = np.add.reduceat(deviations * deviations, starts, axis=0)
+
+        club_shots = np.diff(np.r_[starts, len(group)])
+        self._merge_rows(rows, club_shots, counts, means, m2, abs_sums)
+        return self
+
+    def _merge_rows(self, rows, club_shots, counts, means, m2, abs_sums) -> None:
+        """Merge per-club moments into the running totals (Chan et al.)."""
+        n_a = self.counts[rows]
+        total = n_a + counts
+        delta = means - self.means[rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(total > 0, counts / total, 0.0)
+            self.m2[rows] += m2 + np.where(total > 0, delta * delta * n_a * weight, 0.0)
+        self.means[rows] += delta * weight
+        self.counts[rows] = total
+        self.abs_sums[rows] += abs_sums
+        self.club_shots[rows] += club_shots
+
+    def merge(self, other: "AnalysisAccumulator") -> "AnalysisAccumulator":
+        """Fold another accumulator in, as if its shots had been added here."""
+        self.shot_count += other.shot_count
+        self.valid_count += other.valid_count
+        if other.club_index:
+            rows = self._grow(list(other.club_index))
+            self._merge_rows(rows, other.club_shots, other.counts, other.means, other.m2, other.abs_sums)
+        return self
+
+    def to_state(self) -> dict[str, Any]:
+        """JSON-serialisable state, restorable with from_state."""
+        return {
+            "shot_count": self.shot_count,
+            "valid_count": self.valid_count,
+            "clubs": list(self.club_index),
+            "club_shots": self.club_shots.tolist(),
+            "counts": self.counts.tolist(),
+            "means": self.means.tolist(),
+            "m2": self.m2.tolist(),
+            "abs_sums": self.abs_sums.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[dict[str, Any]]) -> "AnalysisAccumulator":
+        acc = cls()
+        if not state:
+            return acc
+        width = len(ANALYSIS_METRICS)
+        acc.shot_count = state["shot_count"]
+        acc.valid_count = state["valid_count"]
+        acc.club_index = {club: i for i, club in enumerate(state["clubs"])}
+        acc.club_shots = np.array(state["club_shots"], dtype=np.int64)
+        acc.counts = np.array(state["counts"], dtype=np.int64).reshape(-1, width)
+        acc.means = np.array(state["means"], dtype=np.float64).reshape(-1, width)
+        acc.m2 = np.array(state["m2"], dtype=np.float64).reshape(-1, width)
+        acc.abs_sums = np.array(state["abs_sums"], dtype=np.float64).reshape(-1, width)
+        return acc
+
+    def result(self) -> dict[str, Any]:
+        """Per-club aggregates and the four 0-100 scores."""
+        if not self.shot_count:
+            return {}
+        if not self.valid_count:
+            return {"shot_count": self.shot_count, "mishit_count": self.shot_count}
+
+        counts = self.counts
+        means = self.means
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stds = np.sqrt(self.m2 / (counts - 1))
+
+        club_metrics = {}
+        for club, i in self.club_index.items():
+            c = counts[i]
+            club_metrics[club] = {
+                "count": int(self.club_shots[i]),
+                "avg_carry": float(means[i, _CARRY]) if c[_CARRY] else None,
+                "carry_std": float(stds[i, _CARRY]) if c[_CARRY] > 1 else None,
+                "avg_smash": float(means[i, _SMASH]) if c[_SMASH] else None,
+                "avg_face_to_path": float(means[i, _FACE_TO_PATH]) if c[_FACE_TO_PATH] else None,
+                "face_to_path_std": float(stds[i, _FACE_TO_PATH]) if c[_FACE_TO_PATH] > 1 else None,
+                "avg_spin_axis": float(means[i, _SPIN_AXIS]) if c[_SPIN_AXIS] else None,
+                "avg_offline": float(means[i, _OFFLINE]) if c[_OFFLINE] else None,
+                "offline_std": float(stds[i, _OFFLINE]) if c[_OFFLINE] > 1 else None,
+            }
+
+        # Overall scores from session-wide and per-club aggregates
+        total_counts = counts.sum(axis=0)
+        avg_smash = _mean_or_none((means[:, _SMASH] * counts[:, _SMASH]).sum(), total_counts[_SMASH])
+        avg_abs_ftp = _mean_or_none(self.abs_sums[:, _FACE_TO_PATH].sum(), total_counts[_FACE_TO_PATH])
+
+        carry_stds = stds[counts[:, _CARRY] > 1, _CARRY]
+        carry_stds = carry_stds[carry_stds != 0]
+        offline_stds = stds[counts[:, _OFFLINE] > 1, _OFFLINE]
+        offline_stds = offline_stds[offline_stds != 0]
+
+        return {
+            "shot_count": self.shot_count,
+            "valid_shot_count": self.valid_count,
+            "mishit_count": self.shot_count - self.valid_count,
+            "clubs_used": list(self.club_index),
+            "club_metrics": club_metrics,
+            "strike_score": score_strike(avg_smash),
+            "face_control_score": score_face_control(avg_abs_ftp),
+            "distance_control_score": score_distance_control(_mean_or_none(carry_stds.sum(), len(carry_stds))),
+            "dispersion_score": score_dispersion(_mean_or_none(offline_stds.sum(), len(offline_stds))),
+        }
+
+
+def analyze_frame(frame: ShotFrame) -> dict[str, Any]:
+    """
+    Compute per-club aggregates and the four 0-100 scores in one grouped pass.
+
+    Produces the same shape as the original per-shot implementation, including
+    its treatment of zero readings as missing.
+    """
+    return AnalysisAccumulator().add(frame).result()
@@ -0,0 +1,198 @@
+"""
+Streaming shot export.
+
+Shots are read through a server-side cursor in fixed-size partitions and
+encoded partition by partition, so memory stays flat regardless of how many
+shots a user has.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterator, Optional, Sequence
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+from sqlalchemy.orm import Session
+
+from app.models.session import Session as SessionModel
+from app.models.shot import Shot
+
+PARTITION_SIZE = 10000
+
+# Exportable columns: every shot column plus the parent session's date and name
+EXPORT_COLUMNS = {c.name: c for c in Shot.__table__.columns}
+EXPORT_COLUMNS["session_date"] = SessionModel.__table__.c.session_date
+EXPORT_COLUMNS["session_name"] = SessionModel.__table__.c.name
+
+DEFAULT_COLUMNS = ("session_id", "session_date") + tuple(
+    name for name in Shot.__table__.columns.keys() if name not in ("notes", "created_at")
+)
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown column or format)."""
+
+
+@dataclass
+class ShotExportFilter:
+    user_id: UUID
+    clubs: Optional[list[str]] = None
+    session_id: Optional[UUID] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
+
+def resolve_columns(columns: Optional[str]) -> tuple[str, ...]:
+    """Parse a comma-separated column projection, defaulting to all shot data."""
+    if not columns:
+        return DEFAULT_COLUMNS
+    names = tuple(dict.fromkeys(c.strip() for c in columns.split(",") if c.strip()))
+    unknown = [n for n in names if n not in EXPORT_COLUMNS]
+    if unknown:
+        raise ExportError(f"Unknown columns: {', '.join(unknown)}")
+    return names
+
+
+def check_format(fmt: str) -> None:
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format: {fmt}")
+
+
+def _partitions(db: Session, columns: Sequence[str], filters: ShotExportFilter) -> Iterator[Sequence[Any]]:
+    """Yield lists of row tuples straight from a server-side cursor."""
+    query = select(*(EXPORT_COLUMNS[c].label(c) for c in columns)).select_from(Shot).join(
+        SessionModel, SessionModel.id == Shot.session_id
+    ).where(SessionModel.user_id == filters.user_id)
+
+    if filters.session_id:
+        query = query.where(Shot.session_id == filters.session_id)
+    if filters.clubs:
+        query = query.where(Shot.club.in_(filters.clubs))
+    if filters.date_from:
+        query = query.where(SessionModel.session_date >= filters.date_from)
+    if filters.date_to:
+        query = query.where(SessionModel.session_date <= filters.date_to)
+
+    query = query.order_by(SessionModel.session_date, Shot.session_id, Shot.shot_number)
+    result = db.execute(query.execution_options(stream_results=True, yield_per=PARTITION_SIZE))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _encode_ndjson(columns, partitions) -> Iterator[bytes]:
+    for rows in partitions:
+        yield "".join(
+            json.dumps({c: _json_value(v) for c, v in zip(columns, row)}) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+def _encode_csv(columns, partitions) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _arrow_schema(columns):
+    def arrow_type(column):
+        if isinstance(column.type, Boolean):
+            return pa.bool_()
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        return pa.string()  # strings, text and UUIDs
+    return pa.schema([(c, arrow_type(EXPORT_COLUMNS[c])) for c in columns])
+
+
+def _record_batch(schema, rows):
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [row[i] for row in rows]
+        if pa.types.is_string(field.type):
+            values = [None if v is None else str(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every batch."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _encode_arrow(columns, partitions, parquet: bool) -> Iterator[bytes]:
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    if parquet:
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    # Parquet gets one row group per partition
+    for rows in partitions:
+        writer.write_batch(_record_batch(schema, rows))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def stream_shots(
+    db: Session,
+    fmt: str,
+    columns: Sequence[str],
+    filters: ShotExportFilter,
+) -> Iterator[bytes]:
+    """Encode a user's shots in the requested format, one partition at a time."""
+    partitions = _partitions(db, columns, filters)
+    if fmt == "ndjson":
+        yield from _encode_ndjson(columns, partitions)
+    elif fmt == "csv":
+        yield from _encode_csv(columns, partitions)
+    else:
+        yield from _encode_arrow(columns, partitions, parquet=fmt == "parquet")
@@ -0,0 +1,225 @@
+"""
+Metric trend rollups.
+
+Every analysed session gets a "session" MetricSnapshot holding its scores and
+the AnalysisAccumulator state behind them. New sessions are folded into their
+"weekly" and "monthly" snapshots by merging that state, so rollup scores are
+exact without rereading shots, and a trend query reads one row per period.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.session import Session as SessionModel
+from app.models.training import MetricSnapshot
+from app.services.shot_analysis import AnalysisAccumulator
+
+PERIOD_TYPES = ("weekly", "monthly")
+
+SCORE_FIELDS = ("strike_score", "face_control_score", "distance_control_score", "dispersion_score")
+
+
+def period_start(when: datetime, period: str) -> datetime:
+    """Monday 00:00 of the week, or the 1st of the month."""
+    day = datetime(when.year, when.month, when.day)
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def shift_period(start: datetime, period: str, n: int) -> datetime:
+    """Start of the period n periods after (or before, if negative) start."""
+    if period == "weekly":
+        return start + timedelta(weeks=n)
+    month = start.year * 12 + start.month - 1 + n
+    return start.replace(year=month // 12, month=month % 12 + 1)
+
+
+def _apply_stats(snapshot: MetricSnapshot, stats: AnalysisAccumulator) -> None:
+    analysis = stats.result()
+    snapshot.stats = stats.to_state()
+    snapshot.shot_count = stats.shot_count
+
+    scores = [analysis.get(field) for field in SCORE_FIELDS]
+    for field, score in zip(SCORE_FIELDS, scores):
+        setattr(snapshot, field, score)
+    snapshot.overall_score = sum(scores) / len(scores) if None not in scores else None
+
+    snapshot.metrics_by_club = {
+        club: {
+            "count": metrics["count"],
+            "avg_carry": metrics["avg_carry"],
+            "carry_std": metrics["carry_std"],
+            "smash": metrics["avg_smash"],
+            "offline_std": metrics["offline_std"],
+        }
+        for club, metrics in analysis.get("club_metrics", {}).items()
+    }
+
+
+def _lock_period(db: Session, user_id: UUID, period: str, start: datetime) -> MetricSnapshot:
+    """Fetch a rollup row for update, creating it if this is the period's first session."""
+    query = db.query(MetricSnapshot).filter(
+        MetricSnapshot.user_id == user_id,
+        MetricSnapshot.snapshot_type == period,
+        MetricSnapshot.snapshot_date == start,
+    ).with_for_update()
+
+    snapshot = query.first()
+    if snapshot:
+        return snapshot
+
+    snapshot = MetricSnapshot(
+        user_id=user_id,
+        snapshot_type=period,
+        snapshot_date=start,
+        session_count=0,
+        shot_count=0,
+    )
+    try:
+        with db.begin_nested():
+            db.add(snapshot)
+    except IntegrityError:
+        # Another import created the period first
+        return query.one()
+    return snapshot
+
+
+def _fold_period(db: Session, user_id: UUID, period: str, start: datetime, stats: AnalysisAccumulator) -> None:
+    snapshot = _lock_period(db, user_id, period, start)
+    merged = AnalysisAccumulator.from_state(snapshot.stats).merge(stats)
+    snapshot.session_count = (snapshot.session_count or 0) + 1
+    _apply_stats(snapshot, merged)
+
+
+def _rebuild_period(db: Session, user_id: UUID, period: str, start: datetime) -> None:
+    """Re-merge a period from its session snapshots (after an edit or delete)."""
+    snapshot = _lock_period(db, user_id, period, start)
+    states = db.query(MetricSnapshot.stats).filter(
+        MetricSnapshot.user_id == user_id,
+        MetricSnapshot.snapshot_type == "session",
+        MetricSnapshot.snapshot_date >= start,
+        MetricSnapshot.snapshot_date < shift_period(start, period, 1),
+    ).all()
+
+    if not states:
+        db.delete(snapshot)
+        return
+
+    merged = AnalysisAccumulator()
+    for (state,) in states:
+        merged.merge(AnalysisAccumulator.from_state(state))
+    snapshot.session_count = len(states)
+    _apply_stats(snapshot, merged)
+
+
+def record_session_snapshot(session: SessionModel, stats: AnalysisAccumulator, db: Session) -> MetricSnapshot:
+    """
+    Write a session's snapshot and update its weekly and monthly rollups (caller commits).
+
+    A new session is merged straight into its rollups. A re-analysed session
+    replaces its previous contribution, so its rollups are rebuilt from their
+    session snapshots - still no shots are read.
+    """
+    snapshot = db.query(MetricSnapshot).filter(MetricSnapshot.session_id == session.id).first()
+    previous_date = snapshot.snapshot_date if snapshot else None
+    if snapshot is None:
+        snapshot = MetricSnapshot(user_id=session.user_id, session_id=session.id, snapshot_type="session")
+        db.add(snapshot)
+
+    snapshot.snapshot_date = session.session_date or datetime.utcnow()
+    snapshot.session_count = 1
+    _apply_stats(snapshot, stats)
+    db.flush()
+
+    for period in PERIOD_TYPES:
+        start = period_start(snapshot.snapshot_date, period)
+        if previous_date is None:
+            _fold_period(db, session.user_id, period, start, stats)
+            continue
+        _rebuild_period(db, session.user_id, period, start)
+        previous_start = period_start(previous_date, period)
+        if previous_start != start:
+            _rebuild_period(db, session.user_id, period, previous_start)
+
+    return snapshot
+
+
+def remove_session_snapshot(session: SessionModel, db: Session) -> None:
+    """Drop a session's snapshot and take it out of its rollups (caller commits)."""
+    snapshot = db.query(MetricSnapshot).filter(MetricSnapshot.session_id == session.id).first()
+    if snapshot is None:
+        return
+
+    when = snapshot.snapshot_date
+    db.delete(snapshot)
+    db.flush()
+    for period in PERIOD_TYPES:
+        _rebuild_period(db, session.user_id, period, period_start(when, period))
+
+
+def build_snapshots(
+    user_id: UUID,
+    sessions: Iterable[tuple[UUID, datetime, AnalysisAccumulator]],
+) -> list[MetricSnapshot]:
+    """
+    Fresh session snapshots and weekly/monthly rollups for one user, built in
+    memory from (session id, session date, stats) - for bulk rebuilds.
+    """
+    snapshots = []
+    periods: dict[tuple[str, datetime], list] = {}
+    for session_id, session_date, stats in sessions:
+        snapshot = MetricSnapshot(
+            user_id=user_id,
+            session_id=session_id,
+            snapshot_type="session",
+            snapshot_date=session_date,
+            session_count=1,
+        )
+        _apply_stats(snapshot, stats)
+        snapshots.append(snapshot)
+
+        for period in PERIOD_TYPES:
+            rollup = periods.setdefault((period, period_start(session_date, period)), [AnalysisAccumulator(), 0])
+            rollup[0].merge(stats)
+            rollup[1] += 1
+
+    for (period, start), (merged, session_count) in periods.items():
+        snapshot = MetricSnapshot(
+            user_id=user_id,
+            snapshot_type=period,
+            snapshot_date=start,
+            session_count=session_count,
+        )
+        _apply_stats(snapshot, merged)
+        snapshots.append(snapshot)
+
+    return snapshots
+
+
+def get_trend(
+    db: Session,
+    user_id: UUID,
+    period: str,
+    periods: int,
+    now: Optional[datetime] = None,
+) -> list[MetricSnapshot]:
+    """
+    Snapshots for the last `periods` weeks or months (or sessions), oldest first.
+
+    One indexed range read over the rollup rows; periods without sessions are
+    simply absent.
+    """
+    query = db.query(MetricSnapshot).filter(
+        MetricSnapshot.user_id == user_id,
+        MetricSnapshot.snapshot_type == period,
+    )
+    if period == "session":
+        rows = query.order_by(MetricSnapshot.snapshot_date.desc()).limit(periods).all()
+        return rows[::-1]
+
+    since = shift_period(period_start(now or datetime.utcnow(), period), period, 1 - periods)
+    return query.filter(MetricSnapshot.snapshot_date >= since).order_by(MetricSnapshot.snapshot_date).all()
@@ -0,0 +1 @@
+# StrikeLab Benchmarks
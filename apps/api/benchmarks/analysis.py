@@ -0,0 +1,147 @@
+"""
+Session analysis benchmark: per-shot statistics vs columnar NumPy engine.
+
+Run with: python -m benchmarks.analysis
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import random
+import statistics
+import time
+from typing import Any
+
+from app.models.shot import Shot
+from app.services.coach_engine import CoachEngine
+from app.services.shot_analysis import ShotFrame, analyze_frame
+
+
+CLUB_PROFILES = {
+    "Driver": (245, 1.42),
+    "3 Wood": (220, 1.44),
+    "5 Iron": (185, 1.38),
+    "7 Iron": (165, 1.36),
+    "PW": (125, 1.28),
+    "56 Wedge": (85, 1.18),
+}
+
+
+def make_shots(n: int, seed: int = 42) -> list[Shot]:
+    rng = random.Random(seed)
+    clubs = list(CLUB_PROFILES)
+    shots = []
+    for i in range(1, n + 1):
+        club = rng.choice(clubs)
+        carry, smash = CLUB_PROFILES[club]
+        shots.append(Shot(
+            shot_number=i,
+            club=club,
+            carry_distance=rng.gauss(carry, 6),
+            smash_factor=rng.gauss(smash, 0.02),
+            face_to_path=rng.gauss(0, 2) if rng.random() > 0.1 else None,
+            spin_axis=rng.gauss(0, 3),
+            offline_distance=rng.gauss(0, 8) if rng.random() > 0.05 else None,
+            is_mishit=rng.random() < 0.04,
+        ))
+    return shots
+
+
+def legacy_analyze(engine: CoachEngine, shots: list[Shot]) -> dict[str, Any]:
+    """The original per-shot implementation of CoachEngine._analyze_session."""
+    if not shots:
+        return {}
+    
+    valid_shots = [s for s in shots if not s.is_mishit]
+    
+    if not valid_shots:
+        return {"shot_count": len(shots), "mishit_count": len(shots)}
+    
+    clubs: dict[str, list[Shot]] = {}
+    for shot in valid_shots:
+        if shot.club not in clubs:
+            clubs[shot.club] = []
+        clubs[shot.club].append(shot)
+    
+    club_metrics = {}
+    for club, club_shots in clubs.items():
+        carries = [s.carry_distance for s in club_shots if s.carry_distance]
+        smash_factors = [s.smash_factor for s in club_shots if s.smash_factor]
+        face_to_paths = [s.face_to_path for s in club_shots if s.face_to_path]
+        spin_axes = [s.spin_axis for s in club_shots if s.spin_axis]
+        offline = [s.offline_distance for s in club_shots if s.offline_distance]
+        
+        club_metrics[club] = {
+            "count": len(club_shots),
+            "avg_carry": statistics.mean(carries) if carries else None,
+            "carry_std": statistics.stdev(carries) if len(carries) > 1 else None,
+            "avg_smash": statistics.mean(smash_factors) if smash_factors else None,
+            "avg_face_to_path": statistics.mean(face_to_paths) if face_to_paths else None,
+            "face_to_path_std": statistics.stdev(face_to_paths) if len(face_to_paths) > 1 else None,
+            "avg_spin_axis": statistics.mean(spin_axes) if spin_axes else None,
+            "avg_offline": statistics.mean(offline) if offline else None,
+            "offline_std": statistics.stdev(offline) if len(offline) > 1 else None,
+        }
+    
+    all_smash = [s.smash_factor for s in valid_shots if s.smash_factor]
+    all_face_to_path = [s.face_to_path for s in valid_shots if s.face_to_path]
+    all_carry_std = [m["carry_std"] for m in club_metrics.values() if m.get("carry_std")]
+    all_offline_std = [m["offline_std"] for m in club_metrics.values() if m.get("offline_std")]
+    
+    return {
+        "shot_count": len(shots),
+        "valid_shot_count": len(valid_shots),
+        "mishit_count": len(shots) - len(valid_shots),
+        "clubs_used": list(clubs.keys()),
+        "club_metrics": club_metrics,
+        "strike_score": engine._calculate_strike_score(all_smash),
+        "face_control_score": engine._calculate_face_control_score(all_face_to_path),
+        "distance_control_score": engine._calculate_distance_control_score(all_carry_std),
+        "dispersion_score": engine._calculate_dispersion_score(all_offline_std),
+    }
+
+
+def assert_equivalent(expected: Any, actual: Any, path: str = "") -> None:
+    if isinstance(expected, dict):
+        assert expected.keys() == actual.keys(), f"{path}: keys differ"
+        for key in expected:
+            assert_equivalent(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, float) and actual is not None:
+        assert math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9), f"{path}: {expected} != {actual}"
+    else:
+        assert expected == actual, f"{path}: {expected!r} != {actual!r}"
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes: tuple[int, ...] = (100, 1_000, 100_000)):
+    engine = CoachEngine()
+    
+    print(f"{'shots':>8}  {'legacy':>10}  {'columnar':>10}  {'agg only':>10}  {'speedup':>8}")
+    for n in sizes:
+        shots = make_shots(n)
+        repeat = 5 if n <= 10_000 else 2
+        
+        assert_equivalent(legacy_analyze(engine, shots), engine._analyze_session(shots))
+        
+        legacy = best_of(lambda: legacy_analyze(engine, shots), repeat)
+        columnar = best_of(lambda: engine._analyze_session(shots), repeat)
+        frame = ShotFrame.from_shots(shots)
+        analysis_only = best_of(lambda: analyze_frame(frame), repeat)
+        
+        print(
+            f"{n:>8}  {legacy * 1000:>8.2f}ms  {columnar * 1000:>8.2f}ms  "
+            f"{analysis_only * 1000:>8.2f}ms  {legacy / columnar:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,164 @@
+"""
+Async vs sync read routes: throughput and latency with many simultaneous
+clients.
+
+The sync side registers the original threadpool versions of the session
+list and shots endpoints next to the async ones, so both run in the same
+app against the same data. Reads the synthetic accounts seeded by
+python -m app.seed.synthetic; nothing is written.
+
+Run with: python -m benchmarks.async_routes [--clients 500] [--rounds 4]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Optional
+from uuid import UUID
+
+import httpx
+import numpy as np
+from fastapi import Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_db
+from app.main import app
+from app.models import User, Session as SessionModel, Shot
+from app.schemas.session import SessionListResponse, SessionResponse, ShotResponse
+from app.services.auth import Principal, create_access_token, get_current_principal
+from app.services.pagination import keyset_page
+from benchmarks.load_test import start_uvicorn
+
+SESSIONS_PER_USER = 20
+
+
+def sync_list_sessions(
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """GET /sessions as it was: a sync endpoint on the request threadpool."""
+    query = db.query(SessionModel).filter(SessionModel.user_id == current_user.id)
+    sessions, next_cursor = keyset_page(query, SessionModel.session_date, SessionModel.id, None, limit)
+    counts = dict(db.query(Shot.session_id, func.count(Shot.id)).filter(
+        Shot.session_id.in_([s.id for s in sessions])
+    ).group_by(Shot.session_id).all())
+    responses = []
+    for session in sessions:
+        response = SessionResponse.model_validate(session)
+        response.shot_count = counts.get(session.id, 0)
+        responses.append(response)
+    return SessionListResponse(sessions=responses, next_cursor=next_cursor)
+
+
+def sync_session_shots(
+    session_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """GET /sessions/{id}/shots as it was."""
+    session = db.query(SessionModel).filter(
+        SessionModel.id == session_id, SessionModel.user_id == current_user.id
+    ).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    shots, _ = keyset_page(
+        db.query(Shot).filter(Shot.session_id == session_id), Shot.shot_number, Shot.id, None, 500, descending=False
+    )
+    return [ShotResponse.model_validate(shot) for shot in shots]
+
+
+app.add_api_route("/bench/sync/sessions", sync_list_sessions, methods=["GET"])
+app.add_api_route("/bench/sync/sessions/{session_id}/shots", sync_session_shots, methods=["GET"])
+
+VARIANTS = {
+    "sync (threadpool)": ("/bench/sync/sessions?limit=20", "/bench/sync/sessions/{}/shots"),
+    "async": ("/sessions?limit=20&total=none", "/sessions/{}/shots"),
+}
+
+
+def load_users(prefix: str, users: int) -> list[dict]:
+    """Tokens and session ids for the synthetic accounts, without going through bcrypt."""
+    db = SessionLocal()
+    try:
+        rows = db.query(User.id).filter(User.email.like(f"{prefix}-%")).limit(users).all()
+        contexts = []
+        for (user_id,) in rows:
+            session_ids = [sid for (sid,) in db.query(SessionModel.id).filter(
+                SessionModel.user_id == user_id
+            ).order_by(SessionModel.session_date.desc()).limit(SESSIONS_PER_USER)]
+            if session_ids:
+                contexts.append({
+                    "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"},
+                    "sessions": session_ids,
+                })
+        return contexts
+    finally:
+        db.close()
+
+
+async def run_variant(client: httpx.AsyncClient, contexts: list[dict], paths: tuple[str, str], clients: int, rounds: int):
+    latencies: list[float] = []
+    errors = 0
+
+    async def one_client():
+        nonlocal errors
+        ctx = random.choice(contexts)
+        for i in range(rounds):
+            # Alternate a small list page and a full shot list
+            path = paths[0] if i % 2 == 0 else paths[1].format(random.choice(ctx["sessions"]))
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=ctx["headers"])
+                failed = response.status_code != 200
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    # Every client starts at once
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client() for _ in range(clients)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def run_benchmark(clients: int, rounds: int, users: int, prefix: str, url: Optional[str]):
+    contexts = load_users(prefix, users)
+    if not contexts:
+        print(f"No sessions found; seed them with python -m app.seed.synthetic --prefix {prefix}")
+        return
+
+    async def main():
+        limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+        if url:
+            client = httpx.AsyncClient(base_url=url, limits=limits, timeout=120.0)
+        else:
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120.0)
+        async with client:
+            print(f"{clients} simultaneous clients x {rounds} requests, {len(contexts)} users")
+            for label, paths in VARIANTS.items():
+                await run_variant(client, contexts, paths, min(clients, 20), 2)  # warm pools and caches
+                elapsed, latencies, errors = await run_variant(client, contexts, paths, clients, rounds)
+                p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+                print(
+                    f"  {label:<18} {len(latencies) / elapsed:7.0f} req/s  "
+                    f"p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  p99 {p99:7.1f}ms  errors {errors}"
+                )
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the sync and async read routes under concurrency")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=4, help="requests per client")
+    parser.add_argument("--users", type=int, default=100, help="synthetic accounts to read as")
+    parser.add_argument("--prefix", default="synth", help="email prefix used by app.seed.synthetic")
+    parser.add_argument("--uvicorn", action="store_true", help="serve the app with uvicorn on a local port")
+    args = parser.parse_args()
+    run_benchmark(args.clients, args.rounds, args.users, args.prefix, start_uvicorn() if args.uvicorn else None)
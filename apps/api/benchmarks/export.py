@@ -0,0 +1,103 @@
+"""
+Shot export benchmark: one JSON array of ShotResponse models vs the
+streaming exporter in each format.
+
+Writes to the database configured by DATABASE_URL; point it at a scratch
+database (e.g. sqlite:///bench.db) rather than a real one. Peak memory is
+Python heap as seen by tracemalloc (pyarrow buffers are not included).
+
+Run with: python -m benchmarks.export [shots]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import time
+import tracemalloc
+from uuid import uuid4
+
+from app.database import SessionLocal, engine, Base
+from app.models import User, Session as SessionModel, Shot
+from app.schemas.session import ShotResponse
+from app.services.connectors.ingest import save_normalized_session
+from app.services.shot_export import (
+    DEFAULT_COLUMNS,
+    ShotExportFilter,
+    check_format,
+    stream_shots,
+)
+from benchmarks.ingest import make_normalized_session
+
+
+def legacy_export(db, user_id) -> int:
+    """What GET /sessions/{id}/shots does, applied to the whole history."""
+    shots = db.query(Shot).join(SessionModel).filter(
+        SessionModel.user_id == user_id
+    ).order_by(SessionModel.session_date, Shot.shot_number).all()
+    payload = json.dumps([ShotResponse.model_validate(s).model_dump(mode="json") for s in shots])
+    return len(payload)
+
+
+def streamed_export(db, user_id, fmt: str) -> int:
+    filters = ShotExportFilter(user_id=user_id)
+    return sum(len(chunk) for chunk in stream_shots(db, fmt, DEFAULT_COLUMNS, filters))
+
+
+def measure(fn):
+    """Time an untraced run, then repeat it under tracemalloc for peak memory."""
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def run_benchmark(shots: int = 200_000):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"bench-{uuid4().hex[:8]}@strikelab.golf",
+            password_hash="!",
+            display_name="Export Bench",
+        )
+        db.add(user)
+        db.commit()
+        save_normalized_session(make_normalized_session(shots), user.id, db)
+
+        print(f"Exporting {shots} shots from {engine.url.get_backend_name()}")
+        runs = [("json array (legacy)", lambda: legacy_export(db, user.id))]
+        for fmt in ("ndjson", "csv", "arrow", "parquet"):
+            try:
+                check_format(fmt)
+            except ValueError as e:
+                print(f"  skipping {fmt}: {e}")
+                continue
+            runs.append((fmt, lambda fmt=fmt: streamed_export(db, user.id, fmt)))
+
+        for label, fn in runs:
+            elapsed, size, peak = measure(fn)
+            db.expunge_all()
+            print(
+                f"  {label:<20} {elapsed:>6.2f}s  {shots / elapsed:>9,.0f} shots/sec  "
+                f"{size / 1e6:>7.1f} MB out  peak {peak / 1e6:>7.1f} MB"
+            )
+
+        # Clean up benchmark data
+        db.query(Shot).filter(
+            Shot.session_id.in_(db.query(SessionModel.id).filter(SessionModel.user_id == user.id))
+        ).delete(synchronize_session=False)
+        db.query(SessionModel).filter(SessionModel.user_id == user.id).delete()
+        db.query(User).filter(User.id == user.id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
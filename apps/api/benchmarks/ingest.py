@@ -0,0 +1,125 @@
+"""
+Shot ingestion benchmark: ORM unit of work vs bulk insert path.
+
+Writes to the database configured by DATABASE_URL; point it at a scratch
+database (e.g. sqlite:///bench.db) rather than a real one.
+
+Run with: python -m benchmarks.ingest [rows]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from app.database import SessionLocal, engine, Base
+from app.models import User, Session as SessionModel, Shot
+from app.services.connectors.base import NormalizedSession, NormalizedShot
+from app.services.connectors.ingest import save_normalized_session
+
+
+def make_normalized_session(n: int, seed: int = 7) -> NormalizedSession:
+    rng = random.Random(seed)
+    clubs = ["Driver", "3 Wood", "5 Iron", "7 Iron", "PW", "56 Wedge"]
+    shots = [
+        NormalizedShot(
+            shot_number=i,
+            club=rng.choice(clubs),
+            carry_distance=rng.uniform(80, 260),
+            total_distance=rng.uniform(90, 280),
+            ball_speed=rng.uniform(40, 75),
+            club_speed=rng.uniform(30, 52),
+            smash_factor=rng.uniform(1.2, 1.48),
+            launch_angle=rng.uniform(10, 28),
+            spin_rate=rng.uniform(2000, 10000),
+            spin_axis=rng.uniform(-5, 5),
+            face_to_path=rng.uniform(-3, 3),
+            offline_distance=rng.uniform(-15, 15),
+        )
+        for i in range(1, n + 1)
+    ]
+    return NormalizedSession(
+        source="csv",
+        session_type="range",
+        session_date=datetime.utcnow(),
+        name="Ingest benchmark",
+        shots=shots,
+    )
+
+
+def legacy_import(normalized: NormalizedSession, user_id, db) -> None:
+    """The original CSVImporter.import_csv write path (one ORM object per row)."""
+    session = SessionModel(
+        user_id=user_id,
+        source=normalized.source,
+        session_type=normalized.session_type,
+        name=normalized.name,
+        session_date=normalized.session_date,
+        raw_data=normalized.raw_data,
+    )
+    db.add(session)
+    db.flush()
+    
+    for ns in normalized.shots:
+        shot = Shot(
+            session_id=session.id,
+            shot_number=ns.shot_number,
+            club=ns.club,
+            carry_distance=ns.carry_distance,
+            total_distance=ns.total_distance,
+            ball_speed=ns.ball_speed,
+            club_speed=ns.club_speed,
+            smash_factor=ns.smash_factor,
+            launch_angle=ns.launch_angle,
+            spin_rate=ns.spin_rate,
+            spin_axis=ns.spin_axis,
+            face_angle=ns.face_angle,
+            face_to_path=ns.face_to_path,
+            attack_angle=ns.attack_angle,
+            offline_distance=ns.offline_distance,
+        )
+        db.add(shot)
+    
+    db.commit()
+
+
+def run_benchmark(rows: int = 50_000):
+    Base.metadata.create_all(bind=engine)
+    normalized = make_normalized_session(rows)
+    
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"bench-{uuid4().hex[:8]}@strikelab.golf",
+            password_hash="!",
+            display_name="Ingest Bench",
+        )
+        db.add(user)
+        db.commit()
+        
+        print(f"Importing {rows} shots into {engine.url.get_backend_name()}")
+        for label, fn in (
+            ("orm (legacy)", lambda: legacy_import(normalized, user.id, db)),
+            ("bulk", lambda: save_normalized_session(normalized, user.id, db)),
+        ):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<14} {elapsed:>7.2f}s  {rows / elapsed:>10,.0f} rows/sec")
+        
+        # Clean up benchmark data
+        db.query(Shot).filter(
+            Shot.session_id.in_(db.query(SessionModel.id).filter(SessionModel.user_id == user.id))
+        ).delete(synchronize_session=False)
+        db.query(SessionModel).filter(SessionModel.user_id == user.id).delete()
+        db.delete(user)
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,124 @@
+"""
+Coach chat LLM benchmark: per-call sync clients with serial failover vs the
+pooled, hedged async client, against the local mock LLM server.
+
+Run with: python -m benchmarks.llm_chat
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import uvicorn
+
+from app.config import get_settings
+from app.services import llm
+from benchmarks.mock_llm import app as mock_app, BEHAVIOUR
+
+SYSTEM = "You are an expert golf coach."
+MESSAGES = [{"role": "user", "content": "How do I stop slicing my driver?"}]
+
+
+def start_mock_server() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(mock_app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def legacy_chat(base_url: str) -> str:
+    """The original serial failover: a fresh client per provider, 30s timeout each."""
+    try:
+        with httpx.Client(timeout=30.0) as client:
+            response = client.post(
+                f"{base_url}/v1/messages",
+                json={"model": "m", "max_tokens": 1024, "system": SYSTEM, "messages": MESSAGES},
+            )
+            response.raise_for_status()
+            return response.json()["content"][0]["text"]
+    except Exception:
+        pass
+    with httpx.Client(timeout=30.0) as client:
+        response = client.post(
+            f"{base_url}/v1/chat/completions",
+            json={"model": "m", "messages": [{"role": "system", "content": SYSTEM}] + MESSAGES},
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+
+async def first_token_latency() -> float:
+    start = time.perf_counter()
+    tokens = llm.stream(lambda p: SYSTEM, MESSAGES)
+    await tokens.__anext__()
+    elapsed = time.perf_counter() - start
+    await tokens.aclose()
+    return elapsed
+
+
+def configure(anthropic_latency: float, anthropic_fail: bool = False, openai_latency: float = 0.2) -> None:
+    BEHAVIOUR["anthropic"].update(latency=anthropic_latency, fail=anthropic_fail)
+    BEHAVIOUR["openai"].update(latency=openai_latency, fail=False)
+
+
+def run_benchmark(concurrency: int = 100):
+    base_url = start_mock_server()
+    os.environ.setdefault("ANTHROPIC_API_KEY", "mock")
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    settings = get_settings()
+    settings.anthropic_api_url = base_url
+    settings.openai_api_url = base_url
+
+    async def main():
+        print(f"Hedge delay {settings.llm_hedge_delay}s, budget {settings.llm_timeout_budget}s")
+        scenarios = (
+            ("healthy primary (0.2s)", dict(anthropic_latency=0.2)),
+            ("failing primary", dict(anthropic_latency=0.2, anthropic_fail=True)),
+            ("slow primary (8s)", dict(anthropic_latency=8.0)),
+        )
+        for label, behaviour in scenarios:
+            configure(**behaviour)
+
+            start = time.perf_counter()
+            await asyncio.to_thread(legacy_chat, base_url)
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await llm.complete(lambda p: SYSTEM, MESSAGES)
+            hedged = time.perf_counter() - start
+
+            ttft = await first_token_latency()
+            print(f"  {label:<24} serial {legacy:>6.2f}s  hedged {hedged:>6.2f}s  first token {ttft:>6.2f}s")
+
+        # Throughput: many concurrent chats against a healthy provider
+        configure(anthropic_latency=0.2)
+        with ThreadPoolExecutor(max_workers=40) as pool:  # Starlette's default thread limit
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                loop.run_in_executor(pool, legacy_chat, base_url) for _ in range(concurrency)
+            ])
+            legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*[llm.complete(lambda p: SYSTEM, MESSAGES) for _ in range(concurrency)])
+        pooled = time.perf_counter() - start
+        print(f"  {concurrency} concurrent chats     threads {legacy:>5.2f}s  async pooled {pooled:>5.2f}s")
+
+        await llm.close_http_client()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
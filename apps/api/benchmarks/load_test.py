@@ -0,0 +1,203 @@
+"""
+API load test: mixed traffic from many logged-in users, with p50/p95/p99
+latency per endpoint.
+
+Logs in as the synthetic accounts (seed them first with
+python -m app.seed.synthetic) and replays a weighted mix of requests from
+a traffic profile with a fixed number of concurrent clients. Requests go
+in-process over ASGI by default, through a local uvicorn server with
+--uvicorn, or to any running deployment with --url.
+
+Run with: python -m benchmarks.load_test [--profile mixed] [--requests 2000] [--concurrency 20]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Optional
+
+import httpx
+import numpy as np
+import uvicorn
+
+from app.main import app
+from app.seed.synthetic import SYNTHETIC_PASSWORD
+
+# Endpoint name -> path builder over one user's context (session and friend ids)
+ENDPOINTS: dict[str, Callable[[dict], str]] = {
+    "auth.me": lambda ctx: "/auth/me",
+    "sessions.list": lambda ctx: "/sessions?limit=20",
+    "sessions.get": lambda ctx: f"/sessions/{random.choice(ctx['sessions'])}",
+    "sessions.shots": lambda ctx: f"/sessions/{random.choice(ctx['sessions'])}/shots",
+    "trends.weekly": lambda ctx: "/trends?period=weekly&periods=12",
+    "trends.monthly": lambda ctx: "/trends?period=monthly&periods=12",
+    "equipment.stats": lambda ctx: "/equipment/stats",
+    "coach.reports": lambda ctx: "/coach/reports",
+    "courses.tee_times": lambda ctx: "/courses/tee-times",
+    "friends.list": lambda ctx: "/friends",
+    "friends.leaderboard": lambda ctx: "/friends/leaderboard?metric=strike_score",
+    "friends.compare": lambda ctx: f"/friends/compare/{random.choice(ctx['friends'])}",
+}
+
+# Endpoints that need a session or a friend to point at
+NEEDS = {
+    "sessions.get": "sessions", "sessions.shots": "sessions", "friends.compare": "friends",
+}
+
+# Relative request weights per traffic profile
+PROFILES: dict[str, dict[str, int]] = {
+    # Opening the app and looking through recent practice
+    "browse": {
+        "auth.me": 2, "sessions.list": 6, "sessions.get": 4, "sessions.shots": 3,
+        "coach.reports": 2, "courses.tee_times": 1,
+    },
+    # Dashboards and progress views
+    "analytics": {
+        "trends.weekly": 4, "trends.monthly": 3, "equipment.stats": 3, "sessions.shots": 2,
+    },
+    # Friend comparison and leaderboards
+    "social": {
+        "friends.list": 3, "friends.leaderboard": 4, "friends.compare": 4, "auth.me": 1,
+    },
+    "mixed": {
+        "auth.me": 2, "sessions.list": 5, "sessions.get": 3, "sessions.shots": 3,
+        "trends.weekly": 2, "trends.monthly": 2, "equipment.stats": 2, "coach.reports": 1,
+        "courses.tee_times": 1, "friends.list": 1, "friends.leaderboard": 2, "friends.compare": 1,
+    },
+}
+
+
+def start_uvicorn() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def make_client(url: Optional[str], concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        return httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=60.0)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[name].append(time.perf_counter() - start)
+        if response is None or response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> None:
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"\n{total} requests in {elapsed:.1f}s  {total / elapsed:,.0f} req/sec\n")
+        print(f"  {'endpoint':<22} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name in sorted(self.latencies):
+            ms = np.asarray(self.latencies[name]) * 1000
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            print(
+                f"  {name:<22} {len(ms):>6} {self.errors[name]:>6} "
+                f"{p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {ms.max():>8.1f}"
+            )
+
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, email: str) -> Optional[dict]:
+    """Log in and collect the ids the profile's paths need."""
+    response = await recorder.request(
+        client, "auth.login", "POST", "/auth/login",
+        json={"email": email, "password": SYNTHETIC_PASSWORD},
+    )
+    if response is None or response.status_code != 200:
+        return None
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    sessions = await client.get("/sessions?limit=50&total=none", headers=headers)
+    friends = await client.get("/friends", headers=headers)
+    return {
+        "headers": headers,
+        "sessions": [s["id"] for s in sessions.json()["sessions"]],
+        "friends": [f["id"] for f in friends.json()],
+    }
+
+
+async def run_load(
+    profile: str,
+    requests: int,
+    concurrency: int,
+    users: int,
+    prefix: str,
+    url: Optional[str],
+) -> None:
+    recorder = Recorder()
+    weights = PROFILES[profile]
+    async with make_client(url, concurrency) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited_login(i: int):
+            async with semaphore:
+                return await login(client, recorder, f"{prefix}-{i}@strikelab.golf")
+
+        contexts = [ctx for ctx in await asyncio.gather(*(limited_login(i) for i in range(users))) if ctx]
+        if not contexts:
+            print(f"No accounts could log in; seed them with python -m app.seed.synthetic --prefix {prefix}")
+            return
+        print(f"Logged in {len(contexts)} users; profile '{profile}', {requests} requests, {concurrency} concurrent")
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                ctx = random.choice(contexts)
+                names = [n for n in weights if ctx.get(NEEDS.get(n), True)]
+                name = random.choices(names, weights=[weights[n] for n in names])[0]
+                await recorder.request(client, name, "GET", ENDPOINTS[name](ctx), headers=ctx["headers"])
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    # Login latency is bcrypt-bound and measured separately from the steady-state mix
+    logins = recorder.latencies.pop("auth.login")
+    recorder.errors.pop("auth.login", None)
+    print(f"Logins: {len(logins)}, p50 {np.percentile(logins, 50) * 1000:.0f} ms")
+    recorder.report(elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive the API with mixed traffic and report latency percentiles")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50, help="synthetic accounts to log in as")
+    parser.add_argument("--prefix", default="synth", help="email prefix used by app.seed.synthetic")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--uvicorn", action="store_true", help="serve the app with uvicorn on a local port")
+    target.add_argument("--url", help="base URL of a running server")
+    args = parser.parse_args()
+
+    base_url = start_uvicorn() if args.uvicorn else args.url
+    target_name = base_url or "in-process ASGI"
+    print(f"Target: {target_name}")
+    asyncio.run(run_load(args.profile, args.requests, args.concurrency, args.users, args.prefix, base_url))
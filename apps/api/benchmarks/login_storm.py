@@ -0,0 +1,129 @@
+"""
+Login storm benchmark: latency of an ordinary endpoint while a burst of
+logins is being verified, with bcrypt in the request threadpool (the
+original sync login) vs on the dedicated bcrypt executor.
+
+Writes to the database configured by DATABASE_URL; point it at a scratch
+database (e.g. sqlite:///bench.db) rather than a real one.
+
+Run with: python -m benchmarks.login_storm [logins]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+from uuid import uuid4
+
+import httpx
+import numpy as np
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal, engine, Base, get_db
+from app.main import app
+from app.models import User
+from app.schemas.user import UserLogin
+from app.services.auth import HASH_PENDING, HASH_WORKERS, create_access_token, hash_password, verify_password
+from app.services.connectors.ingest import save_normalized_session
+from benchmarks.ingest import make_normalized_session
+
+PASSWORD = "storm-password"
+PROBES = 100
+LOGIN_CONCURRENCY = 40  # Starlette's default request thread limit
+
+
+def legacy_login(data: UserLogin, db: Session = Depends(get_db)):
+    """The original login: a sync endpoint running bcrypt on a request thread."""
+    user = db.query(User).filter(User.email == data.email).first()
+    if not user or not verify_password(data.password, user.password_hash):
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    return {"access_token": create_access_token({"sub": str(user.id)})}
+
+
+app.add_api_route("/bench/legacy-login", legacy_login, methods=["POST"])
+
+
+async def probe(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event) -> tuple[list[float], int]:
+    """Sequential GET /sessions until the storm ends (at least PROBES of them); also the peak bcrypt queue."""
+    latencies, peak_pending = [], 0
+    while not stop.is_set() or len(latencies) < PROBES:
+        peak_pending = max(peak_pending, int(HASH_PENDING.value()))
+        start = time.perf_counter()
+        response = await client.get("/sessions?limit=20", headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies, peak_pending
+
+
+async def storm(client: httpx.AsyncClient, path: str, email: str, logins: int) -> float:
+    semaphore = asyncio.Semaphore(LOGIN_CONCURRENCY)
+
+    async def one():
+        async with semaphore:
+            response = await client.post(path, json={"email": email, "password": PASSWORD})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - start
+
+
+def _summary(latencies: list[float]) -> str:
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return f"p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  p99 {p99:7.1f}ms"
+
+
+def run_benchmark(logins: int = 120):
+    Base.metadata.create_all(bind=engine)
+    settings = get_settings()
+
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"storm-{uuid4().hex[:8]}@strikelab.golf",
+            password_hash=hash_password(PASSWORD),
+            display_name="Login Storm",
+        )
+        db.add(user)
+        db.commit()
+        save_normalized_session(make_normalized_session(100), user.id, db)
+        user_id, email = user.id, user.email
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300.0) as client:
+            print(
+                f"{logins} logins, {LOGIN_CONCURRENCY} at a time, bcrypt cost {settings.password_hash_rounds}, "
+                f"{HASH_WORKERS} bcrypt threads"
+            )
+            stop = asyncio.Event()
+            stop.set()
+            latencies, _ = await probe(client, headers, stop)
+            print(f"  {'no logins':<30} GET /sessions {_summary(latencies)}")
+
+            for label, path in (
+                ("sync login (request threads)", "/bench/legacy-login"),
+                ("async login (bcrypt executor)", "/auth/login"),
+            ):
+                stop = asyncio.Event()
+                probes = asyncio.ensure_future(probe(client, headers, stop))
+                elapsed = await storm(client, path, email, logins)
+                stop.set()
+                latencies, peak = await probes
+                print(
+                    f"  {label:<30} GET /sessions {_summary(latencies)}  "
+                    f"logins {logins / elapsed:5.1f}/s  peak bcrypt queue {peak}"
+                )
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 120)
@@ -0,0 +1,94 @@
+"""
+Local mock of the Anthropic and OpenAI chat APIs.
+
+Serves /v1/messages and /v1/chat/completions, streaming or not, with
+configurable latency and failures so the coach chat can be exercised
+without real API keys. Point the API at it with:
+
+    ANTHROPIC_API_URL=http://127.0.0.1:8100 OPENAI_API_URL=http://127.0.0.1:8100
+
+Run with: uvicorn benchmarks.mock_llm:app --port 8100
+
+Behaviour per provider is read from MOCK_<PROVIDER>_LATENCY (seconds before
+the first byte), MOCK_<PROVIDER>_TOKEN_DELAY and MOCK_<PROVIDER>_FAIL, or set
+directly on BEHAVIOUR when running in-process.
+"""
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def _behaviour(provider: str) -> dict:
+    prefix = f"MOCK_{provider.upper()}_"
+    return {
+        "latency": float(os.getenv(prefix + "LATENCY", "0.05")),
+        "token_delay": float(os.getenv(prefix + "TOKEN_DELAY", "0.01")),
+        "fail": os.getenv(prefix + "FAIL", "false").lower() == "true",
+    }
+
+
+BEHAVIOUR = {
+    "anthropic": _behaviour("anthropic"),
+    "openai": _behaviour("openai"),
+}
+
+REPLY = (
+    "Your strike is solid but face control is costing you. Hit ten 7-irons with "
+    "an alignment stick outside the ball and keep face-to-path inside two degrees."
+)
+
+app = FastAPI(title="Mock LLM")
+
+
+def _tokens(provider: str) -> list[str]:
+    words = f"[{provider}] {REPLY}".split(" ")
+    return [w + " " for w in words[:-1]] + [words[-1]]
+
+
+async def _respond(provider: str, body: dict, complete, stream_events):
+    behaviour = BEHAVIOUR[provider]
+    await asyncio.sleep(behaviour["latency"])
+    if behaviour["fail"]:
+        return JSONResponse({"error": "mock failure"}, status_code=500)
+
+    if not body.get("stream"):
+        return JSONResponse(complete(f"[{provider}] {REPLY}"))
+
+    async def events():
+        for chunk in stream_events(_tokens(provider)):
+            if chunk.startswith("data: ") and behaviour["token_delay"]:
+                await asyncio.sleep(behaviour["token_delay"])
+            yield chunk
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/messages")
+async def anthropic_messages(request: Request):
+    def complete(text: str) -> dict:
+        return {"type": "message", "role": "assistant", "content": [{"type": "text", "text": text}]}
+
+    def stream_events(tokens: list[str]):
+        yield "event: message_start\ndata: " + json.dumps({"type": "message_start"}) + "\n\n"
+        for token in tokens:
+            event = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}
+            yield "event: content_block_delta\ndata: " + json.dumps(event) + "\n\n"
+        yield "event: message_stop\ndata: " + json.dumps({"type": "message_stop"}) + "\n\n"
+
+    return await _respond("anthropic", await request.json(), complete, stream_events)
+
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    def complete(text: str) -> dict:
+        return {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]}
+
+    def stream_events(tokens: list[str]):
+        for token in tokens:
+            yield "data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": token}}]}) + "\n\n"
+        yield "data: [DONE]\n\n"
+
+    return await _respond("openai", await request.json(), complete, stream_events)
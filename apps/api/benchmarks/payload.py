@@ -0,0 +1,101 @@
+"""
+Response size benchmark: bytes on the wire for session shot lists and
+session lists with ?fields= projection, ?exclude_none=true and each
+Accept-Encoding, plus the time the request takes in-process (so the CPU
+spent compressing shows up).
+
+Reads the synthetic accounts seeded by python -m app.seed.synthetic;
+nothing is written.
+
+Run with: python -m benchmarks.payload [--users 20] [--prefix synth]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.main import app
+from benchmarks.async_routes import load_users
+
+REPEATS = 10
+
+# What the mobile range view draws
+MOBILE_SHOT_FIELDS = "shot_number,club,carry_distance,total_distance,offline_distance,is_mishit"
+MOBILE_SESSION_FIELDS = "id,name,session_type,session_date,shot_count"
+
+SHAPES = {
+    "full": "",
+    "exclude_none": "exclude_none=true",
+    "fields": "fields={fields}",
+    "fields+exclude_none": "fields={fields}&exclude_none=true",
+}
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def _path(base: str, shape: str, fields: str) -> str:
+    query = SHAPES[shape].format(fields=fields)
+    if not query:
+        return base
+    return f"{base}{'&' if '?' in base else '?'}{query}"
+
+
+async def measure(client: httpx.AsyncClient, contexts: list[dict], path: str, encoding: str) -> tuple[float, float]:
+    """Mean wire bytes and mean latency over the users' requests."""
+    wire_bytes = 0
+    requests = 0
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for ctx in contexts:
+            response = await client.get(
+                path.format(session=ctx["sessions"][0]),
+                headers={**ctx["headers"], "Accept-Encoding": encoding},
+            )
+            response.raise_for_status()
+            wire_bytes += response.num_bytes_downloaded
+            requests += 1
+    return wire_bytes / requests, (time.perf_counter() - start) / requests
+
+
+def run_benchmark(users: int, prefix: str):
+    contexts = load_users(prefix, users)
+    if not contexts:
+        print(f"No sessions found; seed them with python -m app.seed.synthetic --prefix {prefix}")
+        return
+
+    endpoints = [
+        ("shots", "/sessions/{session}/shots", MOBILE_SHOT_FIELDS),
+        ("sessions", "/sessions?limit=50&total=none", MOBILE_SESSION_FIELDS),
+    ]
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{len(contexts)} users, mean of {REPEATS} requests each")
+            for label, base, fields in endpoints:
+                print(f"  {label}")
+                full_bytes = None
+                for shape in SHAPES:
+                    path = _path(base, shape, fields)
+                    await measure(client, contexts[:1], path, "identity")  # warm caches
+                    for encoding in ENCODINGS:
+                        wire_bytes, latency = await measure(client, contexts, path, encoding)
+                        full_bytes = full_bytes or wire_bytes
+                        print(
+                            f"    {shape:<20} {encoding:<9} {wire_bytes / 1024:>8.1f} KiB "
+                            f"{wire_bytes / full_bytes:>6.1%}  {latency * 1000:>6.1f}ms"
+                        )
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare response sizes by projection and encoding")
+    parser.add_argument("--users", type=int, default=20, help="synthetic accounts to read as")
+    parser.add_argument("--prefix", default="synth", help="email prefix used by app.seed.synthetic")
+    args = parser.parse_args()
+    run_benchmark(args.users, args.prefix)
@@ -0,0 +1,211 @@
+"""
+Response serialization benchmark: per-row model_validate plus response_model
+validation vs selecting the response columns and encoding them with orjson.
+
+Registers the validated versions of the list endpoints next to the lean
+ones, checks both return the same JSON and times each in-process.
+
+Writes to the database configured by DATABASE_URL; point it at a scratch
+database (e.g. sqlite:///bench.db) rather than a real one.
+
+Run with: python -m benchmarks.serialization [shots]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+import httpx
+from fastapi import Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal, engine, Base, get_async_db
+from app.main import app
+from app.models import User, Session as SessionModel, Shot, CoachReport, ChatMessage, MetricSnapshot, ClubStats
+from app.routers.sessions import _shot_counts
+from app.schemas.coach import CoachReportResponse, ChatMessageResponse
+from app.schemas.session import SessionListResponse, SessionResponse, ShotResponse
+from app.services.auth import Principal, create_access_token, get_current_principal
+from app.services.connectors.ingest import save_normalized_session
+from benchmarks.ingest import make_normalized_session
+
+SESSIONS = 50
+REPORTS = 200
+MESSAGES = 200
+REPEATS = 30
+
+
+async def _entities(db: AsyncSession, statement, sort_column, id_column, limit: int, descending: bool = True):
+    order = (sort_column.desc(), id_column.desc()) if descending else (sort_column, id_column)
+    return (await db.scalars(statement.order_by(*order).limit(limit))).all()
+
+
+async def validated_shots(
+    session_id: UUID,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    shots = await _entities(
+        db, select(Shot).where(Shot.session_id == session_id), Shot.shot_number, Shot.id, limit, descending=False
+    )
+    return [ShotResponse.model_validate(shot) for shot in shots]
+
+
+async def validated_sessions(
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    sessions = await _entities(
+        db, select(SessionModel).where(SessionModel.user_id == current_user.id),
+        SessionModel.session_date, SessionModel.id, limit,
+    )
+    shot_counts = await _shot_counts(db, [session.id for session in sessions])
+    responses = []
+    for session in sessions:
+        response = SessionResponse.model_validate(session)
+        response.shot_count = shot_counts.get(session.id, 0)
+        responses.append(response)
+    return SessionListResponse(sessions=responses, total=None, next_cursor=None)
+
+
+async def validated_reports(
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    reports = await _entities(
+        db, select(CoachReport).where(CoachReport.user_id == current_user.id),
+        CoachReport.created_at, CoachReport.id, limit,
+    )
+    return [CoachReportResponse.model_validate(r) for r in reports]
+
+
+async def validated_chat(
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    messages = await _entities(
+        db, select(ChatMessage).where(ChatMessage.user_id == current_user.id),
+        ChatMessage.created_at, ChatMessage.id, limit,
+    )
+    return [ChatMessageResponse.model_validate(m) for m in reversed(messages)]
+
+
+app.add_api_route("/bench/validated/shots/{session_id}", validated_shots, response_model=list[ShotResponse])
+app.add_api_route("/bench/validated/sessions", validated_sessions, response_model=SessionListResponse)
+app.add_api_route("/bench/validated/reports", validated_reports, response_model=list[CoachReportResponse])
+app.add_api_route("/bench/validated/chat", validated_chat, response_model=list[ChatMessageResponse])
+
+
+def seed(shots: int) -> tuple[UUID, UUID]:
+    db = SessionLocal()
+    try:
+        user = User(email=f"serial-{uuid4().hex[:8]}@strikelab.golf", password_hash="!", display_name="Serialization")
+        db.add(user)
+        db.commit()
+        big_session = save_normalized_session(make_normalized_session(shots), user.id, db).id
+        for i in range(SESSIONS - 1):
+            save_normalized_session(make_normalized_session(20, seed=i), user.id, db)
+
+        now = datetime.utcnow()
+        db.add_all(
+            CoachReport(
+                session_id=big_session, user_id=user.id, report_type="session", language="en",
+                diagnosis="Strike quality needs attention. " * 8, interpretation="Low point is drifting. " * 8,
+                prescription="Gate drill, 3 x 10 balls. " * 4, validation="Centered strikes above 70%.",
+                next_best_move="Film face-on.", linked_metrics={"strike_score": 68.5, "clubs": ["7 Iron", "PW"]},
+                created_at=now - timedelta(minutes=i),
+            )
+            for i in range(REPORTS)
+        )
+        db.add_all(
+            ChatMessage(
+                user_id=user.id, role="user" if i % 2 else "assistant",
+                content="How do I stop hitting it thin with my irons? " * 6, context={"session": str(big_session)},
+                created_at=now - timedelta(seconds=i),
+            )
+            for i in range(MESSAGES)
+        )
+        db.commit()
+        return user.id, big_session
+    finally:
+        db.close()
+
+
+def cleanup(user_id: UUID) -> None:
+    db = SessionLocal()
+    try:
+        db.query(ChatMessage).filter(ChatMessage.user_id == user_id).delete()
+        db.query(CoachReport).filter(CoachReport.user_id == user_id).delete()
+        db.query(MetricSnapshot).filter(MetricSnapshot.user_id == user_id).delete()
+        db.query(ClubStats).filter(ClubStats.user_id == user_id).delete()
+        db.query(Shot).filter(
+            Shot.session_id.in_(db.query(SessionModel.id).filter(SessionModel.user_id == user_id))
+        ).delete(synchronize_session=False)
+        db.query(SessionModel).filter(SessionModel.user_id == user_id).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _strip_paging(body):
+    # The validated list stand-in doesn't page or count
+    if isinstance(body, dict):
+        body = {**body, "total": None, "next_cursor": None}
+    return body
+
+
+def run_benchmark(shots: int = 2000):
+    Base.metadata.create_all(bind=engine)
+    user_id, session_id = seed(shots)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    endpoints = [
+        (f"shots ({shots})", f"/bench/validated/shots/{session_id}?limit=5000",
+         f"/sessions/{session_id}/shots?limit=5000"),
+        (f"sessions ({SESSIONS})", "/bench/validated/sessions?limit=50", "/sessions?limit=50&total=none"),
+        ("reports (50)", "/bench/validated/reports?limit=50", "/coach/reports?limit=50"),
+        ("chat (50)", "/bench/validated/chat?limit=50", "/coach/chat?limit=50"),
+    ]
+
+    async def timed(client, path):
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            await client.get(path, headers=headers)
+        return (time.perf_counter() - start) / REPEATS, response
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{engine.url.get_backend_name()}, mean of {REPEATS} requests")
+            print(f"  {'endpoint':<16} {'validated':>10} {'lean':>10} {'speedup':>8}  same JSON")
+            for label, validated_path, lean_path in endpoints:
+                validated, validated_response = await timed(client, validated_path)
+                lean, lean_response = await timed(client, lean_path)
+                same = _strip_paging(json.loads(validated_response.content)) == _strip_paging(
+                    json.loads(lean_response.content)
+                )
+                print(
+                    f"  {label:<16} {validated * 1000:>8.1f}ms {lean * 1000:>8.1f}ms "
+                    f"{validated / lean:>7.1f}x  {'yes' if same else 'NO'}"
+                )
+
+    try:
+        asyncio.run(main())
+    finally:
+        cleanup(user_id)
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
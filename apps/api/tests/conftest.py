@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+# Settings are read when the app is imported, so point it at a scratch SQLite database first
+_db_dir = tempfile.mkdtemp(prefix="strikelab-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_db_dir, 'test.db')}",
+    DEBUG="false",
+    RUN_JOB_WORKER="false",
+    SLOW_REQUEST_MS="100000",
+    SLOW_REQUEST_QUERIES="100000",
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models import User, Session as SessionModel, Shot
+from app.services.auth import create_access_token
+
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(bind=engine)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def seed_player():
+    """Factory for a new user with sessions of 7 iron shots; returns (auth headers, session ids)."""
+
+    def seed(sessions: int = 1, shots_per_session: int = 3) -> tuple[dict, list]:
+        db = SessionLocal()
+        try:
+            user = User(email=f"player-{uuid4().hex[:12]}@strikelab.golf", password_hash="!", display_name="Player")
+            db.add(user)
+            db.flush()
+            now = datetime.utcnow()
+            session_ids = []
+            for i in range(sessions):
+                session = SessionModel(
+                    user_id=user.id, source="csv", name=f"Session {i}", session_date=now - timedelta(days=i)
+                )
+                db.add(session)
+                db.flush()
+                db.add_all(
+                    Shot(session_id=session.id, shot_number=n, club="7 Iron", carry_distance=150.0 + n)
+                    for n in range(1, shots_per_session + 1)
+                )
+                session_ids.append(session.id)
+            db.commit()
+            return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}, session_ids
+        finally:
+            db.close()
+
+    return seed
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import auth
+
+
+@pytest.fixture
+def small_hash_queue(monkeypatch):
+    monkeypatch.setattr(auth.settings, "password_hash_max_pending", 2)
+    monkeypatch.setattr(auth.settings, "password_hash_rounds", 4)
+
+
+def test_register_and_login(client, small_hash_queue):
+    account = {"email": "bcrypt@strikelab.golf", "password": "dialed-in", "display_name": "Bcrypt"}
+    assert client.post("/auth/register", json=account).status_code == 200
+    login = client.post("/auth/login", json={"email": account["email"], "password": "dialed-in"})
+    assert login.status_code == 200
+    wrong = client.post("/auth/login", json={"email": account["email"], "password": "sliced-it"})
+    assert wrong.status_code == 401
+
+
+def test_saturated_hash_queue_sheds_load(monkeypatch, small_hash_queue):
+    release = threading.Event()
+
+    def blocked_verify(plain_password: str, hashed_password: str) -> bool:
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(auth, "verify_password", blocked_verify)
+
+    async def burst():
+        in_flight = [asyncio.create_task(auth.verify_password_async("pw", "hash")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(HTTPException) as rejected:
+                await auth.verify_password_async("pw", "hash")
+        finally:
+            release.set()
+        assert await asyncio.gather(*in_flight) == [True, True]
+        return rejected.value
+
+    rejected = asyncio.run(burst())
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
+    assert auth.HASH_PENDING.value() == 0
+
+
+def test_register_returns_503_when_saturated(client, small_hash_queue):
+    auth.HASH_PENDING.inc(amount=2)
+    try:
+        response = client.post(
+            "/auth/register",
+            json={"email": "shed@strikelab.golf", "password": "dialed-in", "display_name": "Shed"},
+        )
+    finally:
+        auth.HASH_PENDING.dec(amount=2)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
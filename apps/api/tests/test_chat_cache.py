@@ -0,0 +1,19 @@
+from app.services.chat_cache import cache_key
+
+HISTORY = [
+    {"role": "user", "content": "My driver goes right"},
+    {"role": "assistant", "content": "Check your grip first."},
+]
+
+
+def test_repeat_question_shares_a_key():
+    assert cache_key("How do I fix my slice?", "hcp 12", "en", []) == cache_key(
+        "how do i fix my  slice", "hcp 12", "en", []
+    )
+
+
+def test_prior_turns_are_part_of_the_key():
+    fresh = cache_key("What next?", "hcp 12", "en", [])
+    assert cache_key("What next?", "hcp 12", "en", HISTORY) != fresh
+    other_history = [HISTORY[0], {"role": "assistant", "content": "Weaken your grip."}]
+    assert cache_key("What next?", "hcp 12", "en", HISTORY) != cache_key("What next?", "hcp 12", "en", other_history)
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.services.compression import CompressionMiddleware, accepted_encodings
+
+
+@pytest.fixture
+def shots_path(seed_player):
+    headers, (session_id,) = seed_player(shots_per_session=50)
+    return f"/sessions/{session_id}/shots", headers
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("br, gzip", "br"),
+    ("gzip, deflate", "gzip"),
+    ("gzip, br;q=0", "gzip"),
+    ("identity", None),
+])
+def test_encoding_negotiation(client, shots_path, accept, expected):
+    path, headers = shots_path
+    response = client.get(path, headers={**headers, "Accept-Encoding": accept})
+    assert response.status_code == 200
+    assert response.headers.get("Content-Encoding") == expected
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(response.json()) == 50  # decoded by the client
+
+
+def test_compressed_length_is_what_is_sent(client, shots_path):
+    path, headers = shots_path
+    identity = client.get(path, headers={**headers, "Accept-Encoding": "identity"})
+    gzipped = client.get(path, headers={**headers, "Accept-Encoding": "gzip"})
+    assert int(gzipped.headers["Content-Length"]) == gzipped.num_bytes_downloaded
+    assert gzipped.num_bytes_downloaded < identity.num_bytes_downloaded / 3
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get("/health", headers={"Accept-Encoding": "br, gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" not in response.headers.get("Vary", "")
+
+
+def _request(body: bytes, minimum_size: int) -> httpx.Response:
+    app = Starlette(routes=[Route("/", lambda request: PlainTextResponse(body))])
+    transport = httpx.ASGITransport(app=CompressionMiddleware(app, minimum_size=minimum_size))
+
+    async def get():
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    return asyncio.run(get())
+
+
+def test_minimum_size_threshold():
+    assert "Content-Encoding" not in _request(b"x" * 99, minimum_size=100).headers
+    response = _request(b"x" * 100, minimum_size=100)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.text == "x" * 100
+
+
+def test_accepted_encodings_skips_refused_codings():
+    assert accepted_encodings("gzip;q=0.5, br;q=0, deflate") == {"gzip", "deflate"}
@@ -0,0 +1,97 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app import database
+
+
+def request(method: str) -> Request:
+    return Request({"type": "http", "method": method, "path": "/", "headers": []})
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Separate engines standing in for a replica (the same SQLite file, so they see the same rows)."""
+    url = database.settings.database_url
+    sync_replica = create_engine(url)
+    async_replica = create_async_engine(database._async_url(url))
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=sync_replica))
+    monkeypatch.setattr(database, "AsyncReplicaSessionLocal", async_sessionmaker(async_replica))
+    yield sync_replica, async_replica
+    sync_replica.dispose()
+    asyncio.run(async_replica.dispose())
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("method, on_replica", [
+    ("GET", True), ("HEAD", True), ("POST", False), ("PATCH", False), ("DELETE", False),
+])
+def test_get_db_reads_from_the_replica(replica, method, on_replica):
+    sync_replica, _ = replica
+    sessions = database.get_db(request(method))
+    db = next(sessions)
+    try:
+        assert db.get_bind() is (sync_replica if on_replica else database.engine)
+        assert db.info[database.STATEMENT_TIMEOUT] == database.settings.db_statement_timeout_ms
+    finally:
+        sessions.close()
+
+
+def test_get_primary_db_always_uses_the_primary(replica):
+    sessions = database.get_primary_db()
+    db = next(sessions)
+    try:
+        assert db.get_bind() is database.engine
+    finally:
+        sessions.close()
+
+
+@pytest.mark.parametrize("method, on_replica", [("GET", True), ("POST", False)])
+def test_get_async_db_reads_from_the_replica(replica, method, on_replica):
+    _, async_replica = replica
+
+    async def bind():
+        sessions = database.get_async_db(request(method))
+        db = await sessions.__anext__()
+        try:
+            return db.bind
+        finally:
+            await sessions.aclose()
+
+    assert asyncio.run(bind()) is (async_replica if on_replica else database.async_engine)
+
+
+def test_reads_and_writes_reach_their_engines(client, seed_player, replica):
+    _, async_replica = replica
+    headers, (session_id,) = seed_player()
+    with count_statements(async_replica.sync_engine) as replica_reads:
+        shots = client.get(f"/sessions/{session_id}/shots", headers=headers)
+    assert shots.status_code == 200
+    assert replica_reads
+
+    with count_statements(database.engine) as primary_statements, \
+            count_statements(async_replica.sync_engine) as replica_statements:
+        patched = client.patch(
+            f"/sessions/{session_id}/shots/{shots.json()[0]['id']}", headers=headers, json={"notes": "thin"}
+        )
+    assert patched.status_code == 200
+    assert any(statement.startswith("UPDATE shots") for statement in primary_statements)
+    assert replica_statements == []
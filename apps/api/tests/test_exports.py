@@ -0,0 +1,32 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def test_parquet_export_round_trips(client, seed_player):
+    headers, session_ids = seed_player(sessions=2, shots_per_session=3)
+    response = client.get("/export/shots?format=parquet&columns=session_id,shot_number,carry_distance", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/vnd.apache.parquet"
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names == ["session_id", "shot_number", "carry_distance"]
+    assert table.num_rows == 6
+    assert set(table.column("session_id").to_pylist()) == {str(s) for s in session_ids}
+
+
+def test_arrow_export_streams_record_batches(client, seed_player):
+    headers, _ = seed_player(shots_per_session=4)
+    response = client.get("/export/shots?format=arrow&columns=shot_number,is_mishit", headers=headers)
+    assert response.status_code == 200
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema.field("is_mishit").type == pa.bool_()
+    assert sorted(table.column("shot_number").to_pylist()) == [1, 2, 3, 4]
+
+
+def test_unknown_format_and_columns_are_rejected(client, seed_player):
+    headers, _ = seed_player()
+    assert client.get("/export/shots?format=xlsx", headers=headers).status_code == 400
+    assert client.get("/export/shots?columns=shot_number,grip", headers=headers).status_code == 400
@@ -0,0 +1,35 @@
+def test_unchanged_shots_revalidate_with_304(client, seed_player):
+    headers, (session_id,) = seed_player()
+    first = client.get(f"/sessions/{session_id}/shots", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    revalidated = client.get(f"/sessions/{session_id}/shots", headers={**headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+
+    # A different projection is a different representation
+    projected = client.get(
+        f"/sessions/{session_id}/shots?fields=shot_number", headers={**headers, "If-None-Match": etag}
+    )
+    assert projected.status_code == 200
+
+
+def test_shot_edit_changes_the_etag(client, seed_player):
+    headers, (session_id,) = seed_player()
+    first = client.get(f"/sessions/{session_id}/shots", headers=headers)
+    etag = first.headers["ETag"]
+    shot_id = first.json()[0]["id"]
+
+    patched = client.patch(
+        f"/sessions/{session_id}/shots/{shot_id}", headers=headers, json={"is_mishit": True, "mishit_type": "thin"}
+    )
+    assert patched.status_code == 200
+
+    after = client.get(f"/sessions/{session_id}/shots", headers={**headers, "If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+    assert after.json()[0]["is_mishit"] is True
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.models import Session as SessionModel, Shot, CoachReport, ChatMessage
+from app.schemas.coach import ChatMessageResponse, CoachReportResponse
+from app.schemas.session import SessionResponse, ShotResponse
+
+
+def orm_json(schema, items):
+    """What FastAPI renders for response_model=list[schema] from ORM objects."""
+    return [schema.model_validate(item).model_dump(mode="json") for item in items]
+
+
+def test_shots_match_the_orm_path(client, seed_player):
+    headers, (session_id,) = seed_player(shots_per_session=5)
+    db = SessionLocal()
+    try:
+        shot = db.query(Shot).filter(Shot.session_id == session_id, Shot.shot_number == 2).one()
+        shot.spin_rate, shot.is_mishit, shot.mishit_type = 6512.25, True, "thin"
+        db.commit()
+        shots = db.query(Shot).filter(Shot.session_id == session_id).order_by(Shot.shot_number)
+        expected = orm_json(ShotResponse, shots)
+    finally:
+        db.close()
+
+    response = client.get(f"/sessions/{session_id}/shots", headers=headers)
+    assert response.json() == expected
+    assert list(response.json()[0]) == list(ShotResponse.model_fields)
+
+
+def test_sessions_match_the_orm_path(client, seed_player):
+    headers, session_ids = seed_player(sessions=3, shots_per_session=2)
+    db = SessionLocal()
+    try:
+        sessions = [db.get(SessionModel, session_id) for session_id in session_ids]
+        expected = []
+        for session in sessions:
+            item = SessionResponse.model_validate(session)
+            item.shot_count = 2
+            expected.append(item.model_dump(mode="json"))
+    finally:
+        db.close()
+
+    response = client.get("/sessions", headers=headers)
+    assert response.json()["sessions"] == expected
+
+
+def test_reports_and_chat_match_the_orm_path(client, seed_player):
+    headers, (session_id,) = seed_player()
+    db = SessionLocal()
+    try:
+        user_id = db.get(SessionModel, session_id).user_id
+        now = datetime.utcnow().replace(microsecond=0)
+        db.add(CoachReport(
+            session_id=session_id, user_id=user_id, diagnosis="Face open at impact",
+            linked_metrics={"face_to_path": {"mean": 2.75, "shots": 40}, "clubs": ["7 Iron"]},
+            created_at=now,
+        ))
+        db.add_all(
+            ChatMessage(user_id=user_id, role=role, content=f"{role} says hi", created_at=now + timedelta(seconds=i))
+            for i, role in enumerate(("user", "assistant"))
+        )
+        db.commit()
+        reports = orm_json(CoachReportResponse, db.query(CoachReport).filter(CoachReport.user_id == user_id))
+        messages = orm_json(
+            ChatMessageResponse,
+            db.query(ChatMessage).filter(ChatMessage.user_id == user_id).order_by(ChatMessage.created_at),
+        )
+    finally:
+        db.close()
+
+    assert client.get("/coach/reports", headers=headers).json() == reports
+    assert client.get("/coach/chat", headers=headers).json() == messages
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import llm
+from benchmarks import mock_llm
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Both providers pointed at the in-process mock; tests adjust mock_llm.BEHAVIOUR."""
+    for provider in ("anthropic", "openai"):
+        monkeypatch.setitem(mock_llm.BEHAVIOUR, provider, {"latency": 0.0, "token_delay": 0.0, "fail": False})
+    monkeypatch.setattr(llm.settings, "llm_hedge_delay", 0.1)
+    monkeypatch.setattr(llm.settings, "llm_timeout_budget", 5.0)
+    monkeypatch.setattr(llm, "get_providers", lambda: [
+        llm.AnthropicProvider("test-key", "http://mock"),
+        llm.OpenAIProvider("test-key", "http://mock"),
+    ])
+
+    monkeypatch.setattr(
+        llm, "get_http_client", lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_llm.app))
+    )
+    return mock_llm.BEHAVIOUR
+
+
+def system_for(provider: llm.LLMProvider) -> str:
+    return "You are a golf coach."
+
+
+MESSAGES = [{"role": "user", "content": "How do I fix my slice?"}]
+
+
+def complete() -> str:
+    return asyncio.run(llm.complete(system_for, MESSAGES))
+
+
+def stream() -> str:
+    async def collect():
+        return "".join([token async for token in llm.stream(system_for, MESSAGES)])
+
+    return asyncio.run(collect())
+
+
+def test_provider_is_abstract():
+    with pytest.raises(TypeError):
+        llm.LLMProvider("key", "http://mock")
+
+
+def test_complete_uses_the_primary(providers):
+    assert complete().startswith("[anthropic]")
+
+
+def test_complete_fails_over_when_the_primary_errors(providers):
+    providers["anthropic"]["fail"] = True
+    assert complete().startswith("[openai]")
+
+
+def test_complete_hedges_a_slow_primary(providers):
+    providers["anthropic"]["latency"] = 2.0
+    start = time.perf_counter()
+    assert complete().startswith("[openai]")
+    assert time.perf_counter() - start < 1.0
+
+
+def test_complete_raises_when_every_provider_fails(providers):
+    providers["anthropic"]["fail"] = True
+    providers["openai"]["fail"] = True
+    with pytest.raises(llm.LLMUnavailable) as error:
+        complete()
+    assert len(error.value.errors) == 2
+
+
+def test_stream_falls_back_to_the_next_provider(providers):
+    providers["anthropic"]["fail"] = True
+    assert stream() == f"[openai] {mock_llm.REPLY}"
+
+
+def test_stream_hedges_a_slow_first_token(providers):
+    providers["anthropic"]["latency"] = 2.0
+    start = time.perf_counter()
+    assert stream() == f"[openai] {mock_llm.REPLY}"
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,60 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services import metrics
+
+
+@pytest.fixture
+def scrape_settings(monkeypatch):
+    def configure(token: str = "", allowed_ips: str = ""):
+        monkeypatch.setattr(metrics.settings, "metrics_token", token)
+        monkeypatch.setattr(metrics.settings, "metrics_allowed_ips", allowed_ips)
+        metrics._allowed_networks.cache_clear()
+
+    yield configure
+    metrics._allowed_networks.cache_clear()
+
+
+def test_metrics_hidden_until_configured(client, scrape_settings):
+    scrape_settings()
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_requires_the_token(client, scrape_settings):
+    scrape_settings(token="scrape-me")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert "strikelab_http_request_duration_seconds" in response.text
+
+
+def test_metrics_allows_listed_networks(client, scrape_settings):
+    scrape_settings(allowed_ips="10.0.0.0/8")
+    assert not metrics._client_allowed("192.168.1.5")
+    assert metrics._client_allowed("10.1.2.3")
+    # TestClient's peer is not an IP address, so it is not on the list
+    assert client.get("/metrics").status_code == 401
+
+
+def test_route_label_includes_the_router_prefix(client):
+    client.get("/sessions/sessions/shots")
+    client.get(f"/sessions/{uuid4()}/shots")
+    rendered = metrics.render_metrics()
+    assert 'route="/sessions/{session_id}/shots"' in rendered
+    assert 'route="/{session_id}/shots"' not in rendered
+    assert 'route="/sessions/sessions/shots"' not in rendered
+
+
+def test_slow_requests_are_logged_as_one_record(client, seed_player, monkeypatch, caplog):
+    headers, (session_id,) = seed_player()
+    monkeypatch.setattr(metrics.settings, "slow_request_queries", 1)
+    with caplog.at_level("WARNING", logger="strikelab.slow_requests"):
+        assert client.get(f"/sessions/{session_id}/shots", headers=headers).status_code == 200
+    records = [r for r in caplog.records if r.name == "strikelab.slow_requests"]
+    assert len(records) == 1
+    summary, *statements = records[0].getMessage().splitlines()
+    assert summary.startswith("Slow request GET /sessions/{session_id}/shots -> 200")
+    assert statements
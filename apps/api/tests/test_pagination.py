@@ -0,0 +1,46 @@
+from app.services.pagination import encode_cursor
+
+
+def test_shot_pages_have_no_gaps_or_duplicates(client, seed_player):
+    headers, (session_id,) = seed_player(shots_per_session=23)
+    shot_numbers = []
+    cursor = None
+    pages = 0
+    while True:
+        path = f"/sessions/{session_id}/shots?limit=5&total=exact"
+        response = client.get(path + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "23"
+        shot_numbers += [shot["shot_number"] for shot in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 5
+    assert shot_numbers == list(range(1, 24))
+
+
+def test_session_pages_follow_next_cursor(client, seed_player):
+    headers, session_ids = seed_player(sessions=7, shots_per_session=0)
+    seen = []
+    cursor = None
+    while True:
+        response = client.get("/sessions?limit=3" + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+        body = response.json()
+        seen += [session["id"] for session in body["sessions"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    # Newest first, each session exactly once
+    assert seen == [str(session_id) for session_id in session_ids]
+
+
+def test_malformed_cursor_is_rejected(client, seed_player):
+    headers, (session_id,) = seed_player()
+    for cursor in ("not-a-cursor", encode_cursor(1, session_id)[:-4]):
+        response = client.get(f"/sessions/{session_id}/shots?cursor={cursor}", headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+    assert client.get("/sessions?cursor=%%%", headers=headers).status_code == 400
@@ -0,0 +1,255 @@
+"""
+Query plans of the router hot paths.
+
+Migrates the PostgreSQL database at TEST_POSTGRES_URL, seeds a synthetic
+dataset large enough for the planner to prefer indexes, runs EXPLAIN on each
+router query and fails if any of them plans a sequential scan over a hot
+table. Skipped without TEST_POSTGRES_URL; point it at a scratch database,
+the seeded rows are removed afterwards.
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import (
+    User, FriendLink, Session as SessionModel, Shot, SessionLog,
+    CoachReport, ChatMessage, TeeTime, Course, Job,
+)
+from app.services.connectors.base import NormalizedShot
+from app.services.connectors.ingest import batched, bulk_insert_shots
+from app.services.pagination import encode_cursor, keyset_query
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to a scratch PostgreSQL database")
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tables that must never be read with a sequential scan on a hot path
+HOT_TABLES = {
+    "sessions", "shots", "coach_reports", "chat_messages",
+    "session_logs", "tee_times", "friend_links", "jobs",
+}
+
+USERS = 150
+SESSIONS_PER_USER = 30
+SHOTS_PER_SESSION = 100
+CLUBS = ["Driver", "3 Wood", "5 Iron", "7 Iron", "9 Iron", "PW", "56 Wedge"]
+
+
+def migrate(url: str) -> None:
+    config = Config(os.path.join(API_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(API_DIR, "alembic"))
+    # alembic/env.py reads DATABASE_URL, which points the rest of the suite at SQLite
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("DATABASE_URL", url)
+        command.upgrade(config, "head")
+
+
+def _insert(db, model, rows: list[dict]) -> None:
+    for batch in batched(rows, 5000):
+        db.execute(insert(model), batch)
+
+
+def seed(db, users: int, rng: random.Random) -> list:
+    """Insert users with sessions, shots, reports, chat, logs, tee times, jobs and friends."""
+    now = datetime.utcnow()
+    user_ids = [uuid4() for _ in range(users)]
+    _insert(db, User, [
+        {
+            "id": uid,
+            "email": f"plan-{uid.hex[:12]}@strikelab.golf",
+            "password_hash": "!",
+            "display_name": "Plan Check",
+        }
+        for uid in user_ids
+    ])
+
+    course_id = uuid4()
+    _insert(db, Course, [{"id": course_id, "name": "Plan Check GC", "country": "NO"}])
+
+    sessions, reports, chats, logs, tee_times, links, jobs = [], [], [], [], [], [], []
+    for uid in user_ids:
+        for i in range(SESSIONS_PER_USER):
+            sid = uuid4()
+            when = now - timedelta(days=i, minutes=rng.randint(0, 600))
+            sessions.append({
+                "id": sid, "user_id": uid, "source": "csv", "session_type": "range",
+                "name": f"Session {i}", "session_date": when, "created_at": when,
+            })
+            reports.append({"id": uuid4(), "session_id": sid, "user_id": uid, "created_at": when})
+            logs.append({"id": uuid4(), "session_id": sid, "user_id": uid, "created_at": when})
+            for role in ("user", "assistant"):
+                chats.append({"id": uuid4(), "user_id": uid, "role": role, "content": "...", "created_at": when})
+        for d in range(5):
+            tee_times.append({
+                "id": uuid4(), "user_id": uid, "course_id": course_id,
+                "tee_time": now + timedelta(days=d * 7 - 14),
+            })
+        for d in range(5):
+            jobs.append({
+                "id": uuid4(), "user_id": uid, "job_type": "csv_import", "status": "succeeded",
+                "run_after": now, "created_at": now - timedelta(days=d),
+            })
+        for friend in rng.sample(user_ids, 5):
+            if friend != uid:
+                links.append({"id": uuid4(), "user_id": uid, "friend_id": friend, "status": "accepted"})
+
+    for model, rows in (
+        (SessionModel, sessions), (CoachReport, reports), (SessionLog, logs),
+        (ChatMessage, chats), (TeeTime, tee_times), (FriendLink, links), (Job, jobs),
+    ):
+        _insert(db, model, rows)
+
+    for s in sessions:
+        bulk_insert_shots(db, s["id"], (
+            NormalizedShot(
+                shot_number=n,
+                club=rng.choice(CLUBS),
+                carry_distance=rng.uniform(80, 260),
+                smash_factor=rng.uniform(1.2, 1.48),
+            )
+            for n in range(1, SHOTS_PER_SESSION + 1)
+        ))
+
+    db.commit()
+    db.connection().exec_driver_sql("ANALYZE")
+    return user_ids
+
+
+def router_queries(db, user_id, session_ids, friend_id):
+    """The queries issued by the routers, built the same way the routers build them."""
+    session_id = session_ids[0]
+    sessions = db.query(SessionModel).filter(SessionModel.user_id == user_id)
+    shots = db.query(Shot).filter(Shot.session_id == session_id)
+    reports = db.query(CoachReport).filter(CoachReport.user_id == user_id)
+    chat = db.query(ChatMessage).filter(ChatMessage.user_id == user_id)
+
+    # A cursor from deep in each listing, to check page N plans like page 1
+    last_session = sessions.order_by(SessionModel.session_date).first()
+    last_shot = shots.order_by(Shot.shot_number.desc()).first()
+    last_report = reports.order_by(CoachReport.created_at).first()
+    last_message = chat.order_by(ChatMessage.created_at).first()
+
+    return {
+        "sessions.list": keyset_query(sessions, SessionModel.session_date, SessionModel.id, None, 50),
+        "sessions.list (cursor)": keyset_query(
+            sessions, SessionModel.session_date, SessionModel.id,
+            encode_cursor(last_session.session_date, last_session.id), 50,
+        ),
+        "sessions.list (type)": keyset_query(
+            sessions.filter(SessionModel.session_type == "range"),
+            SessionModel.session_date, SessionModel.id, None, 50,
+        ),
+        "sessions.shot_counts": db.query(Shot.session_id, func.count(Shot.id)).filter(
+            Shot.session_id.in_(session_ids[:20])
+        ).group_by(Shot.session_id),
+        "sessions.shots": keyset_query(shots, Shot.shot_number, Shot.id, None, 500, descending=False),
+        "sessions.shots (cursor)": keyset_query(
+            shots, Shot.shot_number, Shot.id,
+            encode_cursor(last_shot.shot_number, last_shot.id), 500, descending=False,
+        ),
+        "coach.reports": keyset_query(reports, CoachReport.created_at, CoachReport.id, None, 50),
+        "coach.reports (cursor)": keyset_query(
+            reports, CoachReport.created_at, CoachReport.id,
+            encode_cursor(last_report.created_at, last_report.id), 50,
+        ),
+        "coach.reports (session)": keyset_query(
+            reports.filter(CoachReport.session_id == session_id),
+            CoachReport.created_at, CoachReport.id, None, 50,
+        ),
+        "coach.chat": keyset_query(chat, ChatMessage.created_at, ChatMessage.id, None, 50),
+        "coach.chat (cursor)": keyset_query(
+            chat, ChatMessage.created_at, ChatMessage.id,
+            encode_cursor(last_message.created_at, last_message.id), 50,
+        ),
+        "logs.get": db.query(SessionLog).filter(
+            SessionLog.session_id == session_id, SessionLog.user_id == user_id
+        ),
+        "courses.tee_times": db.query(TeeTime).filter(
+            TeeTime.user_id == user_id, TeeTime.tee_time >= datetime.utcnow()
+        ).order_by(TeeTime.tee_time),
+        "friends.list": db.query(FriendLink).filter(
+            FriendLink.user_id == user_id, FriendLink.status == "accepted"
+        ),
+        "friends.remove (reverse)": db.query(FriendLink).filter(
+            FriendLink.user_id == friend_id, FriendLink.friend_id == user_id
+        ),
+        "jobs.list": db.query(Job).filter(
+            Job.user_id == user_id
+        ).order_by(Job.created_at.desc()).limit(20),
+    }
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def explain(db, query) -> dict:
+    compiled = query.statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = db.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + compiled.string
+    ).scalar()
+    plan = result if isinstance(result, list) else json.loads(result)
+    return plan[0]["Plan"]
+
+
+def cleanup(db, user_ids) -> None:
+    session_ids = db.query(SessionModel.id).filter(SessionModel.user_id.in_(user_ids))
+    db.query(Shot).filter(Shot.session_id.in_(session_ids)).delete(synchronize_session=False)
+    for model in (CoachReport, SessionLog, ChatMessage, TeeTime, Job):
+        db.query(model).filter(model.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(FriendLink).filter(FriendLink.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(SessionModel).filter(SessionModel.user_id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(Course).filter(Course.name == "Plan Check GC").delete(synchronize_session=False)
+    db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+@pytest.fixture(scope="module")
+def plan_db():
+    migrate(POSTGRES_URL)
+    engine = create_engine(POSTGRES_URL)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(11)
+    user_ids = seed(db, USERS, rng)
+    try:
+        yield db, rng.choice(user_ids)
+    finally:
+        db.rollback()
+        cleanup(db, user_ids)
+        db.close()
+        engine.dispose()
+
+
+def test_router_queries_use_indexes(plan_db):
+    db, user_id = plan_db
+    session_ids = [
+        sid for (sid,) in db.query(SessionModel.id).filter(
+            SessionModel.user_id == user_id
+        ).order_by(SessionModel.session_date.desc())
+    ]
+    friend_id = db.query(FriendLink.friend_id).filter(FriendLink.user_id == user_id).limit(1).scalar()
+
+    seq_scans = {}
+    for name, query in router_queries(db, user_id, session_ids, friend_id).items():
+        tables = sorted({
+            node["Relation Name"] for node in _plan_nodes(explain(db, query))
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in HOT_TABLES
+        })
+        if tables:
+            seq_scans[name] = tables
+
+    assert seq_scans == {}
@@ -0,0 +1,30 @@
+def test_fields_projects_the_shot_list(client, seed_player):
+    headers, (session_id,) = seed_player()
+    response = client.get(f"/sessions/{session_id}/shots?fields=shot_number,carry_distance", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        {"shot_number": 1, "carry_distance": 151.0},
+        {"shot_number": 2, "carry_distance": 152.0},
+        {"shot_number": 3, "carry_distance": 153.0},
+    ]
+
+
+def test_exclude_none_drops_null_values(client, seed_player):
+    headers, (session_id,) = seed_player()
+    full = client.get(f"/sessions/{session_id}/shots", headers=headers).json()
+    lean = client.get(f"/sessions/{session_id}/shots?exclude_none=true", headers=headers).json()
+    assert full[0]["spin_rate"] is None
+    assert lean == [{key: value for key, value in shot.items() if value is not None} for shot in full]
+
+
+def test_fields_and_exclude_none_on_the_session_list(client, seed_player):
+    headers, (session_id,) = seed_player()
+    response = client.get("/sessions?fields=id,notes,shot_count&exclude_none=true", headers=headers)
+    assert response.json()["sessions"] == [{"id": str(session_id), "shot_count": 3}]
+
+
+def test_unknown_fields_are_rejected(client, seed_player):
+    headers, (session_id,) = seed_player()
+    response = client.get(f"/sessions/{session_id}/shots?fields=shot_number,swing_thought", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: swing_thought"
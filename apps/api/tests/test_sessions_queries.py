@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def count_queries():
+    # Listen on the Engine class so statements from any engine (sync or async) are counted
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_list_sessions_query_count_is_constant(client, seed_player):
+    headers, _ = seed_player(sessions=60, shots_per_session=3)
+    # The first request also loads the principal; keep it out of the counts
+    assert client.get("/sessions?limit=1", headers=headers).status_code == 200
+
+    counts = {}
+    for limit in (5, 50):
+        with count_queries() as statements:
+            response = client.get(f"/sessions?limit={limit}", headers=headers)
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["sessions"]) == limit
+        assert all(session["shot_count"] == 3 for session in body["sessions"])
+        counts[limit] = len(statements)
+
+    assert counts[5] == counts[50]
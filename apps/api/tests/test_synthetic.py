@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import Session as SessionModel, Shot, User
+from app.seed.synthetic import CLUBS, generate_shots, seed_chunk, seed_users
+
+
+def test_generated_shots_scale_with_handicap():
+    scratch = generate_shots(np.random.default_rng(1), 0.0, ["7 Iron"], 2000)
+    hacker = generate_shots(np.random.default_rng(1), 30.0, ["7 Iron"], 2000)
+    assert [shot.shot_number for shot in scratch] == list(range(1, 2001))
+
+    def mean_carry(shots):
+        return sum(shot.carry_distance for shot in shots) / len(shots)
+
+    assert mean_carry(hacker) < mean_carry(scratch)
+    assert sum(shot.is_mishit for shot in hacker) > sum(shot.is_mishit for shot in scratch)
+
+
+def test_seed_chunk_writes_sessions_and_shots(client):
+    db = SessionLocal()
+    try:
+        users = seed_users(db, 2, "synth-test", random.Random(3))
+        db.commit()
+    finally:
+        db.close()
+
+    written = seed_chunk(users, sessions=3, shots=10, days=30, seed=3)
+
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for user_id, _ in users]
+        assert db.query(func.count(User.id)).filter(User.email.like("synth-test-%")).scalar() == 2
+        sessions = db.query(SessionModel).filter(SessionModel.user_id.in_(user_ids)).all()
+        assert len(sessions) == 6
+        shots = db.query(Shot).filter(Shot.session_id.in_([s.id for s in sessions])).all()
+        assert len(shots) == written > 0
+        assert {shot.club for shot in shots} <= set(CLUBS)
+    finally:
+        db.close()